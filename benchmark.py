@@ -0,0 +1,308 @@
+# benchmark.py
+"""Benchmark the loaders and dashboard metrics on synthetic data.
+
+Generates synthetic exports at multiples of the current ~19k cases, times
+each pipeline step and writes the results to JSON. Passing an earlier
+results file reports the change per step and fails on regressions; runs
+whose approximate resolution percentiles break their error bound fail too.
+
+    python benchmark.py --scales 10 100 --output bench.json
+    python benchmark.py --scales 10 100 --baseline bench.json
+"""
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+import metrics
+import sql_backend
+from fiscal_calendar import period_windows
+from synthetic_data import write_dataset
+from utilities import (
+    DATE_CSV,
+    apply_schema,
+    load_csv,
+    prepare_issue_data,
+    read_csv,
+    read_issue_csv,
+    stream_issue_parquet,
+)
+
+# Size of the 6 May 2025 export; --scales are multiples of this
+BASE_CASES = 19_000
+REGRESSION_THRESHOLD = 0.20
+BOUND_WINDOWS = 50
+
+
+def time_step(fn, repeat):
+    """Best and median wall time of `fn()` over `repeat` runs, and its result."""
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = fn()
+        timings.append(time.perf_counter() - started)
+    return min(timings), statistics.median(timings), result
+
+
+def percentile_bound_ratio(rows, histograms, windows):
+    """Largest error of the histogram percentiles over `windows`, as a
+    fraction of resolution_error_bound (above 1 breaks it).
+
+    The exact percentiles are recomputed from `rows` (resolution_case_rows
+    output) with numpy's inverted CDF, i.e. the nearest rank.
+    """
+    label = rows.columns[0]
+    worst = 0.0
+    for start, end in windows:
+        window = rows[rows["date"].between(start, end)]
+        hist = metrics.window_histograms(histograms, start, end)
+        approx = metrics.histogram_percentiles(hist)
+        codes = histograms["names"].searchsorted(window[label].to_numpy(dtype=str))
+        for code, hours in window.groupby(codes)["resolution_hours"]:
+            exact = np.percentile(
+                hours, metrics.RESOLUTION_PERCENTILES, method="inverted_cdf"
+            )
+            bound = metrics.resolution_error_bound(exact)
+            worst = max(worst, (np.abs(approx[code] - exact) / bound).max())
+    return worst
+
+
+def benchmark_scale(paths, df_date, repeat=3, trace_memory=False):
+    """Time every pipeline step on one generated dataset."""
+    results = {}
+
+    def record(step, fn, n=repeat):
+        best, median, result = time_step(fn, n)
+        results[step] = {"best_s": best, "median_s": median}
+        return result
+
+    def load():
+        raw = read_issue_csv(paths["issue"])
+        return prepare_issue_data(raw, df_date)[0]
+
+    def load_streaming():
+        parquet_path = f"{paths['issue']}.parquet"
+        stream_issue_parquet(paths["issue"], parquet_path)
+        raw = apply_schema(pd.read_parquet(parquet_path))
+        return prepare_issue_data(raw, df_date)[0]
+
+    def record_load(step, fn):
+        if trace_memory:
+            tracemalloc.start()
+        result = record(step, fn, n=1)
+        if trace_memory:
+            results[step]["peak_mib"] = tracemalloc.get_traced_memory()[1] / 2**20
+            tracemalloc.stop()
+        return result
+
+    issues = record_load("load", load)
+    record_load("load_streaming", load_streaming)
+
+    categories = read_csv(paths["category"])
+    departments = read_csv(paths["department"])
+    rollup = record(
+        "rollup",
+        lambda: metrics.build_daily_rollup(issues, df_date, categories, departments),
+        n=1,
+    )
+
+    max_date = issues["Opening Date"].max()
+    window = period_windows([max_date], "This Quarter").iloc[0]
+    start, end = window["current_start"], window["current_end"]
+    all_start = issues["Opening Date"].min()
+
+    period = record("filter", lambda: metrics.slice_period(issues, start, end))
+    everything = metrics.slice_period(issues, all_start, max_date)
+
+    record("kpis_slice", lambda: metrics.period_kpis(everything))
+    record("kpis_rollup", lambda: metrics.rollup_kpis(rollup, all_start, max_date))
+    record("aging", lambda: metrics.aging_summary(period, max_date))
+    record("monthly_trend", lambda: metrics.monthly_trend(everything))
+    record("daily_trend", lambda: metrics.case_trend(everything, "D"))
+    record("distress_merge", lambda: metrics.top_categories(everything, categories))
+    index = metrics.case_mapping_index(categories, "Category Name")
+    record("distress_index", lambda: metrics.top_mapped(index, everything))
+    record(
+        "distress_rollup",
+        lambda: metrics.rollup_counts(
+            rollup, "category", all_start, max_date, priority="Distress"
+        ),
+    )
+    cube = record(
+        "district_cube",
+        lambda: metrics.build_district_cube(metrics.district_day_counts(issues)),
+        n=1,
+    )
+    record(
+        "district_summary",
+        lambda: metrics.district_summary(cube, all_start, max_date, max_date),
+    )
+    facts = record(
+        "department_facts",
+        lambda: metrics.build_department_facts(
+            metrics.department_case_rows(
+                issues, metrics.case_mapping_index(departments, "Department")
+            )
+        ),
+        n=1,
+    )
+    record(
+        "department_sla",
+        lambda: metrics.department_summary(facts, all_start, max_date, max_date, {}),
+    )
+
+    rows = record(
+        "resolution_rows",
+        lambda: metrics.resolution_case_rows(issues, index, "Category Name"),
+        n=1,
+    )
+    histograms = record(
+        "resolution_histograms",
+        lambda: metrics.build_resolution_histograms(rows),
+        n=1,
+    )
+    record(
+        "percentiles_hist",
+        lambda: metrics.resolution_percentiles(
+            histograms, all_start, max_date, exact=False
+        ),
+    )
+    record(
+        "percentiles_exact",
+        lambda: metrics.resolution_percentiles(
+            histograms, all_start, max_date, exact=True
+        ),
+    )
+    rng = np.random.default_rng(0)
+    span = (max_date - all_start).days
+    windows = [(all_start, max_date), (start, end)] + [
+        (all_start + pd.Timedelta(days=int(a)), all_start + pd.Timedelta(days=int(b)))
+        for a, b in np.sort(rng.integers(0, span + 1, (BOUND_WINDOWS, 2)), axis=1)
+    ]
+    results["percentiles_hist"]["bound_ratio"] = percentile_bound_ratio(
+        rows, histograms, windows
+    )
+
+    database = f"{paths['issue']}.sqlite"
+    mappings = {"category": categories, "department": departments}
+    record(
+        "database_build",
+        lambda: sql_backend.build_database(database, issues, mappings),
+        n=1,
+    )
+    conn = sql_backend.connect(database)
+    try:
+        record("kpis_sql", lambda: sql_backend.sql_kpis(conn, all_start, max_date))
+        record("aging_sql", lambda: sql_backend.sql_aging(conn, start, end, max_date))
+        record(
+            "monthly_trend_sql",
+            lambda: sql_backend.sql_trend(conn, all_start, max_date),
+        )
+        record(
+            "distress_sql",
+            lambda: sql_backend.sql_top_mapped(conn, "category", all_start, max_date),
+        )
+    finally:
+        conn.close()
+    return len(issues), results
+
+
+def run_benchmarks(scales, repeat=3, workdir=None, trace_memory=False, seed=0):
+    df_date = load_csv(DATE_CSV, parse_dates=["date"], date_format="%d-%m-%Y")
+    runs = []
+    if workdir:
+        os.makedirs(workdir, exist_ok=True)
+    with tempfile.TemporaryDirectory(dir=workdir) as directory:
+        for scale in scales:
+            cases = int(BASE_CASES * scale)
+            paths = write_dataset(directory, cases, seed=seed)
+            rows, steps = benchmark_scale(paths, df_date, repeat, trace_memory)
+            for step, timing in steps.items():
+                runs.append(
+                    {"scale": scale, "cases": cases, "rows": rows, "step": step}
+                    | timing
+                )
+                peak = (
+                    f" {timing['peak_mib']:10.1f} MiB" if "peak_mib" in timing else ""
+                )
+                if "bound_ratio" in timing:
+                    peak += f" {timing['bound_ratio']:10.2f} of the error bound"
+                print(
+                    f"{scale:>6}x {cases:>11,} cases  {step:<16}"
+                    f" {timing['best_s'] * 1000:10.2f} ms{peak}",
+                    flush=True,
+                )
+    return {
+        "generated": pd.Timestamp.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "pandas": pd.__version__,
+        "base_cases": BASE_CASES,
+        "results": runs,
+    }
+
+
+def compare(report, baseline, threshold=REGRESSION_THRESHOLD):
+    """Print the change of each step against `baseline`; return regressions."""
+    before = {(r["scale"], r["step"]): r["best_s"] for r in baseline["results"]}
+    regressions = []
+    for run in report["results"]:
+        key = (run["scale"], run["step"])
+        if key not in before:
+            continue
+        change = run["best_s"] / before[key] - 1
+        flag = " REGRESSION" if change > threshold else ""
+        print(f"{run['scale']:>6}x {run['step']:<16} {change:+8.1%}{flag}")
+        if flag:
+            regressions.append(key)
+    return regressions
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--scales",
+        type=float,
+        nargs="+",
+        default=[10, 100],
+        help=f"dataset sizes as multiples of {BASE_CASES:,} cases (e.g. 10 100 1000)",
+    )
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--output", default="benchmark_results.json")
+    parser.add_argument("--baseline", help="earlier results JSON to compare with")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=REGRESSION_THRESHOLD,
+        help="slowdown vs the baseline that counts as a regression",
+    )
+    parser.add_argument("--memory", action="store_true", help="trace load memory")
+    parser.add_argument("--workdir", help="where to write the synthetic CSVs")
+    args = parser.parse_args()
+
+    report = run_benchmarks(
+        args.scales, args.repeat, workdir=args.workdir, trace_memory=args.memory
+    )
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"Results written to {args.output}")
+
+    # Approximate percentiles must stay within RESOLUTION_ACCURACY of exact
+    broken = [run for run in report["results"] if run.get("bound_ratio", 0) > 1 + 1e-9]
+    for run in broken:
+        print(f"{run['scale']:>6}x {run['step']:<16} breaks the error bound")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            if compare(report, json.load(f), args.threshold):
+                sys.exit(1)
+    if broken:
+        sys.exit(1)
@@ -0,0 +1,216 @@
+# figures.py
+import pandas as pd
+import plotly.express as px
+import plotly.graph_objects as go
+
+from metrics import AGING_LABELS, SLA_PERCENTILES, TREND_FREQUENCIES
+
+
+def overview_figures(metrics, trend_freq="M"):
+    """Charts and tables of the Overview tab, from compute_dashboard_metrics."""
+    aging_counts = pd.Series(metrics["aging"]["counts"])
+
+    # Create a bar chart for Aging of Pending Issues
+    aging_bar = go.Figure(
+        go.Bar(
+            x=aging_counts.values,
+            y=aging_counts.index,
+            orientation="h",
+            marker=dict(color="indianred"),
+            text=aging_counts.values,
+            textposition="auto",
+        )
+    )
+
+    aging_bar.update_layout(
+        xaxis_title="Number of Cases",
+        yaxis_title="Aging Category",
+        yaxis=dict(categoryorder="array", categoryarray=AGING_LABELS),
+        height=400,
+        margin=dict(l=80, r=20, t=60, b=40),
+    )
+
+    priority_counts = pd.Series(metrics["priority"], dtype="int64")
+    priority_percentage = (priority_counts / priority_counts.sum() * 100).round(2)
+
+    # Create plotly table for more insights to bar chart
+
+    min_aging = metrics["aging"]["min"]
+    max_aging = metrics["aging"]["max"]
+    aging_over_360 = metrics["aging"]["tails"][360]
+
+    aging_table = go.Figure(
+        data=[
+            go.Table(
+                header=dict(
+                    values=["<b>Metric</b>", "<b>Value</b>"],
+                    fill_color="#f8f9fa",
+                    align="center",
+                    height=40,
+                    font=dict(color="#333333", size=14),
+                    line=dict(width=1, color="#f0f0f0"),
+                ),
+                cells=dict(
+                    values=[
+                        [
+                            "Lowest aging (days)",
+                            "Highest aging (days)",
+                            "Cases with aging > 360 days",
+                        ],
+                        [min_aging, max_aging, aging_over_360],
+                    ],
+                    fill_color="white",
+                    align="center",
+                    height=36,
+                    font=dict(color="#333333", size=14),
+                    line=dict(width=1, color="#f0f0f0"),
+                ),
+            )
+        ]
+    )
+
+    aging_table.update_layout(
+        margin=dict(l=10, r=10, t=50, b=50),
+        plot_bgcolor="white",
+        paper_bgcolor="white",
+        height=500,
+    )
+
+    # Temp dataframe for Pie Chart
+    chart_data = pd.DataFrame(
+        {
+            "priority": priority_counts.index,
+            "count": priority_counts.values,
+            "percent": priority_percentage.values,
+        }
+    )
+
+    priority_pie = px.pie(
+        chart_data,
+        names="priority",
+        values="count",
+        hover_data=["count", "percent"],
+        color_discrete_sequence=px.colors.qualitative.Pastel,
+    )
+    priority_pie.update_traces(
+        texttemplate="%{percent:.2%}",  # ensures consistent display like 10.0%
+        customdata=chart_data[["count"]].to_numpy(),
+        hovertemplate="<b>%{label}</b><br>Cases: %{customdata[0]}",
+    )
+
+    # Create line chart for Resolved cases vs Cases Registered over time
+
+    trend_label = TREND_FREQUENCIES[trend_freq]
+    trend_summary = pd.DataFrame(metrics["trend"])
+
+    trend_melted = trend_summary.melt(
+        id_vars=trend_label,
+        value_vars=["Registered Cases", "Resolved Cases"],
+        var_name="Type",
+        value_name="Number of Cases",
+    )
+
+    trend_line = px.line(
+        trend_melted,
+        x=trend_label,
+        y="Number of Cases",
+        color="Type",
+        markers=True,
+    )
+    trend_line.update_layout(
+        xaxis_title=trend_label,
+        yaxis_title="Number of Cases",
+        xaxis=dict(
+            range=[trend_melted[trend_label].min(), trend_melted[trend_label].max()]
+        ),
+    )
+
+    # Creating a distress summary table
+
+    distress_summary = pd.DataFrame(
+        metrics["distress"], columns=["Category Name", "Frequency of Occurance"]
+    )
+
+    return {
+        "aging_bar": aging_bar,
+        "aging_table": aging_table,
+        "priority_pie": priority_pie,
+        "trend_line": trend_line,
+        "distress_summary": distress_summary,
+    }
+
+
+def district_figures(summary):
+    """Charts of the District-wise tab, from metrics.district_summary."""
+    by_district = summary.reset_index()
+
+    # Registered vs resolved cases side by side for each district
+    cases_bar = px.bar(
+        by_district,
+        x="District",
+        y=["Registered", "Resolved"],
+        barmode="group",
+        color_discrete_sequence=px.colors.qualitative.Pastel,
+    )
+    cases_bar.update_layout(
+        xaxis_title="District",
+        yaxis_title="Number of Cases",
+        legend_title_text="",
+    )
+
+    # Pending cases of each district, stacked by aging bucket
+    aging_bar = px.bar(
+        by_district,
+        x="District",
+        y=AGING_LABELS,
+        color_discrete_sequence=["#f4a582", "#d6604d", "indianred"],
+    )
+    aging_bar.update_layout(
+        xaxis_title="District",
+        yaxis_title="Pending Cases",
+        legend_title_text="Aging",
+    )
+
+    return {"cases_bar": cases_bar, "aging_bar": aging_bar}
+
+
+def department_figures(summary):
+    """Charts of the Department-wise tab, from metrics.department_summary."""
+    by_department = summary.reset_index()
+
+    # Resolution time percentiles side by side, against each timeline
+    percentile_bar = px.bar(
+        by_department,
+        x="Department",
+        y=[f"P{q} (days)" for q in SLA_PERCENTILES],
+        barmode="group",
+        color_discrete_sequence=px.colors.qualitative.Pastel,
+    )
+    percentile_bar.add_scatter(
+        x=by_department["Department"],
+        y=by_department["SLA (days)"],
+        mode="markers",
+        marker=dict(symbol="line-ew-open", size=18, color="indianred"),
+        name="SLA",
+    )
+    percentile_bar.update_layout(
+        xaxis_title="Department",
+        yaxis_title="Resolution Time (days)",
+        legend_title_text="",
+    )
+
+    # Pending cases of each department, stacked by aging bucket
+    backlog = by_department[by_department["Pending"] > 0]
+    backlog_bar = px.bar(
+        backlog,
+        x="Department",
+        y=AGING_LABELS,
+        color_discrete_sequence=["#f4a582", "#d6604d", "indianred"],
+    )
+    backlog_bar.update_layout(
+        xaxis_title="Department",
+        yaxis_title="Pending Cases",
+        legend_title_text="Aging",
+    )
+
+    return {"percentile_bar": percentile_bar, "backlog_bar": backlog_bar}
@@ -0,0 +1,116 @@
+# fiscal_calendar.py
+import numpy as np
+import pandas as pd
+
+# Scenarios with a comparison period, and the label shown next to their KPIs
+COMPARISON_LABELS = {
+    "This Month": "vs PM",
+    "This Quarter": "vs PQ",
+    "This Year": "vs PY",
+}
+
+
+def indian_financial_quarter(date):
+    # Shift months so Apr=1, May=2,... Mar=12. Works on a single Timestamp as
+    # well as on a DatetimeIndex or a Series' .dt accessor
+    shifted_month = (date.month - 4) % 12 + 1
+    quarter = (shifted_month - 1) // 3 + 1
+    return quarter
+
+
+def indian_financial_year(date):
+    # Named after the year it ends in (Apr 2024 - Mar 2025 is 2025), matching
+    # fiscal_year in Dim_Date
+    return date.year + (date.month >= 4)
+
+
+def _month_start(year, month):
+    # Vectorized Timestamp(year, month, 1); month may fall outside 1-12
+    months = (np.asarray(year) * 12 + np.asarray(month) - 1).astype("int64")
+    return pd.DatetimeIndex((months - (1970 * 12)).astype("datetime64[M]"))
+
+
+def calendar_ordinals(dates, freq="M"):
+    """Integer month ("M"), Monday-start week ("W") or day ("D") numbers.
+
+    Counted from January 1970 (months), the week of 29 Dec 1969 (weeks) or
+    1 Jan 1970 (days), so consecutive periods get consecutive integers.
+    Missing dates map to -1.
+    """
+    values = np.asarray(dates, dtype="datetime64[ns]")
+    if freq == "M":
+        ordinals = values.astype("datetime64[M]").astype("int64")
+    elif freq == "W":
+        ordinals = (values.astype("datetime64[D]").astype("int64") + 3) // 7
+    elif freq == "D":
+        ordinals = values.astype("datetime64[D]").astype("int64")
+    else:
+        raise ValueError(f"Unknown calendar frequency {freq!r}")
+    return np.where(np.isnat(values), -1, ordinals).astype("int32")
+
+
+def ordinal_starts(ordinals, freq="M"):
+    """First day of each period numbered by calendar_ordinals."""
+    ordinals = np.asarray(ordinals, dtype="int64")
+    if freq == "M":
+        return pd.DatetimeIndex(ordinals.astype("datetime64[M]"))
+    if freq == "W":
+        return pd.DatetimeIndex((ordinals * 7 - 3).astype("datetime64[D]"))
+    if freq == "D":
+        return pd.DatetimeIndex(ordinals.astype("datetime64[D]"))
+    raise ValueError(f"Unknown calendar frequency {freq!r}")
+
+
+def period_windows(as_of, scenario):
+    """Current and comparison windows of `scenario` for every as-of date.
+
+    `as_of` is any array of dates (each playing the role of max_date in
+    process_date_ranges) and `scenario` one of COMPARISON_LABELS. Returns a
+    frame indexed by as-of date with current_start, current_end, prev_start
+    and prev_end:
+
+    - "This Month": month to date, against the previous month up to the same
+      day (capped at that month's last day)
+    - "This Quarter": Indian financial quarter to date, against the whole
+      previous quarter
+    - "This Year": calendar year to date, against the same number of days
+      into the previous year, less one
+    """
+    as_of = pd.DatetimeIndex(as_of).normalize()
+    year = as_of.year.to_numpy()
+    month = as_of.month.to_numpy()
+
+    if scenario == "This Month":
+        current_start = _month_start(year, month)
+        prev_start = _month_start(year, month - 1)
+        prev_days = (current_start - prev_start).days.to_numpy()
+        prev_end = prev_start + pd.to_timedelta(
+            np.minimum(as_of.day.to_numpy(), prev_days) - 1, unit="D"
+        )
+
+    elif scenario == "This Quarter":
+        # Financial quarters start in Apr, Jul, Oct and Jan, so the start
+        # month never leaves the calendar year of the as-of date
+        quarter_month = month - (month - 4) % 3
+        current_start = _month_start(year, quarter_month)
+        prev_start = _month_start(year, quarter_month - 3)
+        prev_end = current_start - pd.Timedelta(days=1)
+
+    elif scenario == "This Year":
+        current_start = _month_start(year, 1)
+        prev_start = _month_start(year - 1, 1)
+        days_into_year = (as_of - current_start).days.to_numpy() - 1
+        prev_end = prev_start + pd.to_timedelta(days_into_year, unit="D")
+
+    else:
+        raise ValueError(f"No comparison period for scenario {scenario!r}")
+
+    return pd.DataFrame(
+        {
+            "current_start": current_start,
+            "current_end": as_of,
+            "prev_start": prev_start,
+            "prev_end": prev_end,
+        },
+        index=as_of,
+    )
@@ -1,383 +1,496 @@
 import streamlit as st
-import plotly.express as px
-import plotly.graph_objects as go
 import pandas as pd
 from datetime import datetime
 import streamlit_shadcn_ui as ui
+import sql_backend
+from figures import department_figures, district_figures, overview_figures
+from instrumentation import finish_trace, stage, start_trace
+from metrics import (
+    DISTRICT_UNKNOWN,
+    RESOLUTION_ACCURACY,
+    TREND_FREQUENCIES,
+    compute_dashboard_metrics,
+    department_summary,
+    district_summary,
+    resolution_percentiles,
+    slice_period,
+)
 from utilities import (
+    DATABASE_PATH,
+    ISSUE_TABLE_COLUMNS,
+    SQL_BACKEND,
+    current_database,
+    database_table,
+    discover_partitions,
     initialize_page,
+    partitions_version,
+    prune_partitions,
+    issue_data_version,
     create_sidebar,
+    paged_dataframe,
     read_date_data,
     read_category_data,
     read_department_data,
+    read_case_mappings,
     read_issue_data,
+    read_daily_rollup,
+    read_department_facts,
+    read_district_cube,
+    read_partition_date_range,
+    read_partitioned_data,
+    read_resolution_histograms,
+    read_sla_days,
+    read_snapshot,
+    profiling_enabled,
+    render_profile_panel,
 )
-
+from view_cache import VIEW_CACHE
 
 # 1. Page setup
 initialize_page()
-
-
-st.title("Kisan Mitra Helpline Dashboard v1.2")
-
-# 2. Load data
-df_date = read_date_data()
-df_category = read_category_data()
-df_dept = read_department_data()
-(
-    df_issues,
-    na_opening_dates,
-    na_resolution_dates,
-    all_records,
-    min_date_raw,
-    max_date_raw,
-) = read_issue_data(df_date)
-
-(
-    current_start,
-    current_end,
-    prev_start,
-    prev_end,
-    comparison_label,
-    prev_custom_start,
-) = create_sidebar(df_issues, df_date, min_date_raw, max_date_raw)
-
-
-df_filtered_issues = df_issues[
-    (df_issues["Opening Date"] >= current_start)
-    & (df_issues["Opening Date"] <= current_end)
-].copy()
-
-df_prev_filtered = (
-    df_issues[
-        (df_issues["Opening Date"] >= prev_start)
-        & (df_issues["Opening Date"] <= prev_end)
-    ].copy()
-    if prev_start and prev_end
-    else pd.DataFrame()
-)
-
-
-############################################
-# Metrics, Charts and Other Computations
-############################################
-
-
-total_cases = df_filtered_issues["Case No"].nunique()
-
-# Filter only resolved issues to calculate resolution days
-resolved_issues = df_filtered_issues[df_filtered_issues["Status"] == "Resolved"].copy()
-
-resolved_issues = df_filtered_issues[df_filtered_issues["Status"] == "Resolved"].copy()
-resolved_issues["resolution days"] = (
-    resolved_issues["Resolution Date Time"] - resolved_issues["Opening Date Time"]
-).dt.days
-
-avg_resolution_days = round(resolved_issues["resolution days"].mean(), 2)
-
-closed_issues_count = len(df_filtered_issues[df_filtered_issues["Status"] == "Closed"])
-
-pending_issues = df_filtered_issues[
-    ~df_filtered_issues["Status"].isin(["Resolved", "Closed"])
-].copy()
-
-
-# Calculate resolution rate
-resolution_rate = round(
-    df_filtered_issues[df_filtered_issues["Status"] == "Resolved"]["Case No"].nunique()
-    / total_cases
-    * 100,
-    2,
-)
-
-# Calculate Aging of Pending Issues
-pending_issues["Aging Days"] = (
-    pd.Timestamp.today().normalize() - pending_issues["Opening Date"]
-).dt.days
-
-
-def categorize_aging(days):
-    if days < 7:
-        return "< 7 days"
-    elif 7 <= days <= 30:
-        return "7–30 days"
-    else:
-        return "> 30 days"
-
-
-pending_issues["Aging Category"] = pending_issues["Aging Days"].apply(categorize_aging)
-
-aging_order = ["< 7 days", "7–30 days", "> 30 days"]
-aging_counts = (
-    pending_issues["Aging Category"].value_counts().reindex(aging_order, fill_value=0)
-)
-
-# Create a bar chart for Aging of Pending Issues
-aging_bar = go.Figure(
-    go.Bar(
-        x=aging_counts.values,
-        y=aging_counts.index,
-        orientation="h",
-        marker=dict(color="indianred"),
-        text=aging_counts.values,
-        textposition="auto",
+start_trace(profiling_enabled())
+
+# A rerun cut short by a widget change (Streamlit raises to stop the
+# script) or by an error still releases its trace
+try:
+    st.title("Kisan Mitra Helpline Dashboard v1.2")
+
+    # 2. Load data
+    with stage("load data"):
+        df_date = read_date_data()
+        # Per-state monthly exports, when there are any, are only loaded once the
+        # sidebar has picked a period (see below); SQLite serves a single export
+        partitions = discover_partitions()
+        use_sql = SQL_BACKEND and not partitions
+        if partitions:
+            min_date_raw, max_date_raw = read_partition_date_range(partitions)
+            data_version = partitions_version(partitions)
+        elif use_sql:
+            # Views are answered by SQLite, so this process never holds the issue
+            # or mapping frames; only the database's meta is read here
+            database = current_database()
+            if database.get("stale"):
+                st.info(
+                    "Newer data is being loaded into the database; until then the"
+                    " figures are those of the previous data."
+                )
+            df_issues = df_category = df_dept = rollup = mappings = None
+            na_opening_dates = database["null_opening_dates"]
+            na_resolution_dates = database["null_resolution_dates"]
+            all_records = database["total_records"]
+            min_date_raw = pd.Timestamp(database["true_min_date"])
+            max_date_raw = pd.Timestamp(database["true_max_date"])
+            data_version = database["data_version"]
+        else:
+            data_version = issue_data_version()
+            df_category = read_category_data()
+            df_dept = read_department_data()
+            (
+                df_issues,
+                na_opening_dates,
+                na_resolution_dates,
+                all_records,
+                min_date_raw,
+                max_date_raw,
+            ) = read_issue_data(df_date, data_version)
+            rollup = read_daily_rollup(df_date, data_version)
+            mappings = read_case_mappings()
+
+    with stage("sidebar"):
+        (
+            current_start,
+            current_end,
+            prev_start,
+            prev_end,
+            comparison_label,
+            prev_custom_start,
+        ) = create_sidebar(None, df_date, min_date_raw, max_date_raw)
+
+    if partitions:
+        # Only the months of the selected and comparison windows are read
+        with stage("load partitions"):
+            selected = prune_partitions(
+                partitions, current_start, current_end, prev_start, prev_end
+            )
+            if not selected:
+                # A custom range can fall in months that were never exported
+                st.info("No data was exported for the selected period.")
+                st.stop()
+            data = read_partitioned_data(df_date, selected)
+            df_issues = data["issues"]
+            df_category = data["category"]
+            df_dept = data["department"]
+            rollup = data["rollup"]
+            mappings = data["mappings"]
+            na_opening_dates = data["null_opening_dates"]
+            na_resolution_dates = data["null_resolution_dates"]
+            all_records = data["total_records"]
+            data_version = partitions_version(selected)
+
+    with stage("filter"):
+        if use_sql:
+            issue_table = database_table("issues", (current_start, current_end))
+            issue_rows = sql_backend.count_rows(
+                DATABASE_PATH, "issues", (current_start, current_end)
+            )
+        else:
+            issue_table = slice_period(df_issues, current_start, current_end)
+            issue_rows = len(issue_table)
+
+    ############################################
+    # Metrics, Charts and Other Computations
+    ############################################
+
+    # Only the selected section is computed and rendered, so looking at the
+    # KPIs never pays for the other sections (st.tabs would run all of them)
+    section = ui.tabs(
+        options=["Overview", "District-wise Analysis", "Department-wise Analysis"],
+        default_value="Overview",
+        key="section",
     )
-)
-
-aging_bar.update_layout(
-    xaxis_title="Number of Cases",
-    yaxis_title="Aging Category",
-    yaxis=dict(
-        categoryorder="array", categoryarray=["< 7 days", "7–30 days", "> 30 days"]
-    ),
-    height=400,
-    margin=dict(l=80, r=20, t=60, b=40),
-)
 
+    if section == "Overview":
+        # All numbers come from the headless metrics engine; this page only renders.
+        # The trend granularity radio sits in the Overview tab, so its value is read
+        # from the session state of the previous run
+        trend_freq = st.session_state.get("trend_granularity", "M")
+        # Standard scenarios are served from the precomputed snapshot while it is
+        # current; Custom ranges and other granularities are computed live
+        scenario = st.session_state.get("time_period_selector")
+        bounds = (current_start, current_end, prev_start, prev_end)
+        with stage("metrics"):
+            # Snapshots cover the single export only
+            metrics = (
+                None if partitions else read_snapshot(scenario, bounds, trend_freq)
+            )
+            if metrics is None and use_sql:
+                metrics = sql_backend.dashboard_metrics(
+                    DATABASE_PATH, *bounds, trend_freq=trend_freq
+                )
+            elif metrics is None:
+                metrics = compute_dashboard_metrics(
+                    df_issues,
+                    df_category,
+                    *bounds,
+                    rollup=rollup,
+                    mappings=mappings,
+                    trend_freq=trend_freq,
+                )
+
+        kpis = metrics["kpis"]
+        total_cases = kpis["total_cases"]
+        resolved_cases = kpis["resolved_cases"]
+        avg_resolution_days = kpis["avg_resolution_days"]
+        closed_issues_count = kpis["closed_cases"]
+        resolution_rate = kpis["resolution_rate"]
+
+        # Figures are shared between sessions looking at the same view
+        with stage("build figures"):
+            figures = VIEW_CACHE.get_or_compute(
+                (
+                    "overview figures",
+                    data_version,
+                    current_start,
+                    current_end,
+                    prev_start,
+                    prev_end,
+                    trend_freq,
+                    pd.Timestamp.today().normalize(),
+                ),
+                lambda: overview_figures(metrics, trend_freq),
+            )
+
+        with stage("render overview"):
+            # st.subheader("KPIs")
+            st.markdown("""<h3 class="sub">KPIs</h3>""", unsafe_allow_html=True)
+            cols = st.columns(5)
+
+            with cols[0]:
+                ui.metric_card("Total Cases Registered", total_cases)
+
+            with cols[1]:
+                ui.metric_card("Total Cases Resolved", resolved_cases)
+            with cols[2]:
+                ui.metric_card("Average Resolution Days", f"{avg_resolution_days} days")
+
+            with cols[3]:
+                ui.metric_card("Resolution Rate", f"{resolution_rate}%")
+
+            with cols[4]:
+                ui.metric_card("Non-Resolved Closed Cases", closed_issues_count)
+
+            st.divider()
+
+            # st.subheader("Monthly Trend: Registered vs Resolved Cases")
+            trend_title = {"M": "Monthly", "W": "Weekly", "D": "Daily"}[trend_freq]
+            st.markdown(
+                f"""<h3 class="sub">{trend_title} Trend: Registered vs Resolved Cases</h3>""",
+                unsafe_allow_html=True,
+            )
+            st.radio(
+                "Granularity",
+                options=list(TREND_FREQUENCIES),
+                format_func=TREND_FREQUENCIES.get,
+                horizontal=True,
+                key="trend_granularity",
+            )
+            st.plotly_chart(figures["trend_line"], use_container_width=True)
+
+            st.divider()
+
+            col1, col2 = st.columns(2, gap="large")
+            col1.subheader("Distribution of Registered Cases by Priority")
+            col1.plotly_chart(figures["priority_pie"], use_container_width=True)
+
+            # col2.subheader("Top 10 Distress Categories by Frequency")
+            st.markdown(
+                """<h3 class="sub">Top 10 Distress Categories by Frequency</h3>""",
+                unsafe_allow_html=True,
+            )
+
+            col2.dataframe(figures["distress_summary"], use_container_width=True)
+
+            st.divider()
+
+            # st.subheader("Aging Distribution of Pending Cases")
+            st.markdown(
+                """<h3 class="sub">Aging Distribution of Pending Cases</h3>""",
+                unsafe_allow_html=True,
+            )
+
+            col1, col2 = st.columns([2, 1], gap="large")
+
+            col1.plotly_chart(figures["aging_bar"], use_container_width=True)
+            col2.plotly_chart(figures["aging_table"], use_container_width=True)
+
+            st.divider()
+
+        # The long tail behind the average: percentiles of any window are merged
+        # from daily histograms built once per dataset (exact for small windows)
+        with stage("resolution percentiles"):
+            if partitions:
+                histograms = data["resolution_histograms"]
+            elif use_sql:
+                histograms = sql_backend.resolution_histograms(DATABASE_PATH)
+            else:
+                histograms = read_resolution_histograms(df_date, data_version)
+
+            st.markdown(
+                """<h3 class="sub">Resolution Time Percentiles</h3>""",
+                unsafe_allow_html=True,
+            )
+            exact = st.toggle("Exact percentiles", key="exact_percentiles") or None
+            by_priority = resolution_percentiles(
+                histograms["priority"], current_start, current_end, exact, "All cases"
+            )
+            by_category = resolution_percentiles(
+                histograms["category"], current_start, current_end, exact
+            )
+
+            if by_priority.empty:
+                st.info("No cases registered in the selected period were resolved.")
+            else:
+                col1, col2 = st.columns(2, gap="large")
+                col1.dataframe(by_priority, use_container_width=True)
+                col2.dataframe(by_category.head(10), use_container_width=True)
+                st.caption(
+                    "Nearest-rank percentiles of the resolution time of resolved cases"
+                    " opened in the period; the categories are the 10 with the most"
+                    " resolved cases."
+                    + (
+                        ""
+                        if by_priority.attrs["exact"]
+                        else f" Merged from daily histograms, within"
+                        f" {RESOLUTION_ACCURACY:.1%} of the exact values (half an"
+                        " hour for values under an hour)."
+                    )
+                )
+
+            st.divider()
+
+    elif section == "District-wise Analysis":
+        # Per-district numbers are window sums of the district x day cube built
+        # once per dataset, never a groupby of the issue table
+        with stage("district summary"):
+            if partitions:
+                district_cube = data["district_cube"]
+            elif use_sql:
+                district_cube = sql_backend.district_cube(DATABASE_PATH)
+            else:
+                district_cube = read_district_cube(df_date, data_version)
+            today = pd.Timestamp.today().normalize()
+            districts = district_summary(
+                district_cube, current_start, current_end, today
+            )
+            figures = VIEW_CACHE.get_or_compute(
+                ("district figures", data_version, current_start, current_end, today),
+                lambda: district_figures(districts),
+            )
+
+        with stage("render districts"):
+            st.markdown(
+                """<h3 class="sub">District-wise KPIs</h3>""", unsafe_allow_html=True
+            )
+            if districts.empty:
+                st.info("No cases were registered in the selected period.")
+            else:
+                st.dataframe(districts, use_container_width=True)
+                if DISTRICT_UNKNOWN in districts.index:
+                    st.caption(
+                        f"'{DISTRICT_UNKNOWN}' counts cases whose export has no District."
+                    )
+
+                st.divider()
+
+                st.markdown(
+                    """<h3 class="sub">Registered vs Resolved Cases by District</h3>""",
+                    unsafe_allow_html=True,
+                )
+                st.plotly_chart(figures["cases_bar"], use_container_width=True)
+
+                st.divider()
+
+                st.markdown(
+                    """<h3 class="sub">Aging of Pending Cases by District</h3>""",
+                    unsafe_allow_html=True,
+                )
+                st.plotly_chart(figures["aging_bar"], use_container_width=True)
+
+            st.divider()
 
-priority_counts = df_filtered_issues["Priority"].value_counts()
-priority_percentage = (priority_counts / priority_counts.sum() * 100).round(2)
-
-# Create plotly table for more insights to bar chart
-
-min_aging = pending_issues["Aging Days"].min()
-max_aging = pending_issues["Aging Days"].max()
-aging_over_360 = pending_issues[pending_issues["Aging Days"] > 360].shape[0]
-
-aging_table = go.Figure(
-    data=[
-        go.Table(
-            header=dict(
-                values=["<b>Metric</b>", "<b>Value</b>"],
-                fill_color="#f8f9fa",
-                align="center",
-                height=40,
-                font=dict(color="#333333", size=14),
-                line=dict(width=1, color="#f0f0f0"),
-            ),
-            cells=dict(
-                values=[
-                    [
-                        "Lowest aging (days)",
-                        "Highest aging (days)",
-                        "Cases with aging > 360 days",
-                    ],
-                    [min_aging, max_aging, aging_over_360],
-                ],
-                fill_color="white",
-                align="center",
-                height=36,
-                font=dict(color="#333333", size=14),
-                line=dict(width=1, color="#f0f0f0"),
-            ),
+    else:
+        # Resolution times and backlog per department are slices of the
+        # department facts joined once per dataset
+        with stage("department facts"):
+            if partitions:
+                department_facts = data["department_facts"]
+            elif use_sql:
+                department_facts = sql_backend.department_facts(DATABASE_PATH)
+            else:
+                department_facts = read_department_facts(df_date, data_version)
+            sla_timelines, default_sla = read_sla_days()
+
+        st.markdown(
+            """<h3 class="sub">Department-wise Resolution and SLA</h3>""",
+            unsafe_allow_html=True,
         )
-    ]
-)
-
-aging_table.update_layout(
-    margin=dict(l=10, r=10, t=50, b=50),
-    plot_bgcolor="white",
-    paper_bgcolor="white",
-    height=500,
-)
-
-# Temp dataframe for Pie Chart
-chart_data = pd.DataFrame(
-    {
-        "priority": priority_counts.index,
-        "count": priority_counts.values,
-        "percent": priority_percentage.values,
-    }
-)
-
-priority_pie = px.pie(
-    chart_data,
-    names="priority",
-    values="count",
-    hover_data=["count", "percent"],
-    color_discrete_sequence=px.colors.qualitative.Pastel,
-)
-priority_pie.update_traces(
-    texttemplate="%{percent:.2%}",  # ensures consistent display like 10.0%
-    customdata=chart_data[["count"]].to_numpy(),
-    hovertemplate="<b>%{label}</b><br>Cases: %{customdata[0]}",
-)
-
-# Create line chart for Resolved cases vs Cases Registered over time
-
-registered_monthly = (
-    df_filtered_issues.groupby(
-        df_filtered_issues["Opening Date Time"].dt.to_period("M")
-    )["Case No"]
-    .nunique()
-    .reset_index(name="Registered Cases")
-)
-registered_monthly["Month"] = registered_monthly["Opening Date Time"].dt.to_timestamp()
-
-resolved_monthly = (
-    resolved_issues.groupby(resolved_issues["Resolution Date Time"].dt.to_period("M"))[
-        "Case No"
-    ]
-    .nunique()
-    .reset_index(name="Resolved Cases")
-)
-resolved_monthly["Month"] = resolved_monthly["Resolution Date Time"].dt.to_timestamp()
-
-monthly_summary = (
-    pd.merge(
-        registered_monthly[["Month", "Registered Cases"]],
-        resolved_monthly[["Month", "Resolved Cases"]],
-        on="Month",
-        how="outer",
-    )
-    .fillna(0)
-    .sort_values("Month")
-)
-monthly_summary["Registered Cases"] = monthly_summary["Registered Cases"].astype(int)
-monthly_summary["Resolved Cases"] = monthly_summary["Resolved Cases"].astype(int)
-
-monthly_melted = monthly_summary.melt(
-    id_vars="Month",
-    value_vars=["Registered Cases", "Resolved Cases"],
-    var_name="Type",
-    value_name="Number of Cases",
-)
-
-trend_line = px.line(
-    monthly_melted,
-    x="Month",
-    y="Number of Cases",
-    color="Type",
-    markers=True,
-)
-trend_line.update_layout(
-    xaxis_title="Month",
-    yaxis_title="Number of Cases",
-    xaxis=dict(range=[monthly_melted["Month"].min(), monthly_melted["Month"].max()]),
-)
-
-# Creating a distress summary table
-
-distress_cases = df_filtered_issues[df_filtered_issues["Priority"] == "Distress"]
-
-distress_with_categories = pd.merge(
-    distress_cases[["Case No"]],
-    df_category[["Case No", "Category Name"]],
-    on="Case No",
-    how="left",
-)
-
-distress_summary = (
-    distress_with_categories["Category Name"]
-    .value_counts()
-    .reset_index()
-    .rename(columns={"index": "Category", "count": "Frequency of Occurance"})
-    .head(10)
-)
-
-# Creating tabs for different analyses
-tab1, tab2, tab3 = st.tabs(
-    ["Overview", "District-wise Analysis", "Department-wise Analysis"]
-)
-
-with tab1:
-    # st.subheader("KPIs")
-    st.markdown("""<h3 class="sub">KPIs</h3>""", unsafe_allow_html=True)
-    cols = st.columns(5)
-
-    with cols[0]:
-        ui.metric_card("Total Cases Registered", total_cases)
-
-    with cols[1]:
-        ui.metric_card(
-            "Total Cases Resolved",
-            df_filtered_issues[df_filtered_issues["Status"] == "Resolved"][
-                "Case No"
-            ].nunique(),
+        with st.expander("⏱️ Resolution timelines (days)"):
+            timelines = st.data_editor(
+                pd.DataFrame(
+                    {
+                        "Department": department_facts["names"],
+                        "SLA (days)": [
+                            sla_timelines.get(name, default_sla)
+                            for name in department_facts["names"]
+                        ],
+                    }
+                ),
+                disabled=["Department"],
+                hide_index=True,
+                use_container_width=True,
+                key="sla_timelines",
+            )
+        # A cleared cell comes back as NaN: it falls back to the default
+        sla = pd.to_numeric(timelines["SLA (days)"], errors="coerce")
+        sla = sla.fillna(default_sla).clip(lower=1)
+        sla_days = dict(zip(timelines["Department"], sla))
+
+        with stage("department summary"):
+            today = pd.Timestamp.today().normalize()
+            departments = department_summary(
+                department_facts,
+                current_start,
+                current_end,
+                today,
+                sla_days,
+                default_sla,
+            )
+            figures = VIEW_CACHE.get_or_compute(
+                (
+                    "department figures",
+                    data_version,
+                    current_start,
+                    current_end,
+                    today,
+                    tuple(sorted(sla_days.items())),
+                    default_sla,
+                ),
+                lambda: department_figures(departments),
+            )
+
+        with stage("render departments"):
+            if departments.empty:
+                st.info("No mapped cases were registered in the selected period.")
+            else:
+                st.dataframe(departments, use_container_width=True)
+                st.caption(
+                    "Resolved Late counts resolved cases that took longer than their"
+                    " department's timeline; Pending Past SLA counts open cases older"
+                    " than it. Cases mapped to several departments count in each;"
+                    " percentiles are nearest-rank, as on the Overview."
+                )
+
+                st.divider()
+
+                st.markdown(
+                    """<h3 class="sub">Resolution Time Percentiles by Department</h3>""",
+                    unsafe_allow_html=True,
+                )
+                st.plotly_chart(figures["percentile_bar"], use_container_width=True)
+
+                st.divider()
+
+                st.markdown(
+                    """<h3 class="sub">Backlog of Pending Cases by Department</h3>""",
+                    unsafe_allow_html=True,
+                )
+                st.plotly_chart(figures["backlog_bar"], use_container_width=True)
+
+            st.divider()
+
+    # 3. Display data. Each table sits behind a toggle in a fragment, so opening
+    # one reruns only this block and sends a single page of rows to the browser
+    @st.fragment
+    def raw_data_tables(category_table, department_table, issue_table, issue_rows):
+        if st.toggle("🗂️ Category Mapping DataFrame", key="show_category_table"):
+            paged_dataframe(category_table, key="category_table")
+
+        if st.toggle("🏢 Department Mapping DataFrame", key="show_department_table"):
+            paged_dataframe(department_table, key="department_table")
+
+        if st.toggle("📋 Issue Data (Merged with Date Info)", key="show_issue_table"):
+            st.write(f"This dataframe contains {issue_rows} records.")
+            paged_dataframe(
+                issue_table,
+                key="issue_table",
+                default_columns=ISSUE_TABLE_COLUMNS,
+                text_filters=["Case No"],
+                choice_filters=["Status", "Priority"],
+            )
+
+    with stage("render tables"):
+        if use_sql:
+            raw_data_tables(
+                database_table("category_mapping"),
+                database_table("department_mapping"),
+                issue_table,
+                issue_rows,
+            )
+        else:
+            raw_data_tables(df_category, df_dept, issue_table, issue_rows)
+
+        st.caption(
+            f"‼️Out of {all_records} total entries, {na_opening_dates} entries were dropped because the issue registration date ('Opening Date') was not recorded and {na_resolution_dates} were dropped becasue issue resolution date was not recorded for resolved issues."
         )
-    with cols[2]:
-        ui.metric_card("Average Resolution Days", f"{avg_resolution_days} days")
-
-    with cols[3]:
-        ui.metric_card("Resolution Rate", f"{resolution_rate}%")
-
-    with cols[4]:
-        ui.metric_card("Non-Resolved Closed Cases", closed_issues_count)
-
-    st.divider()
-
-    # st.subheader("Monthly Trend: Registered vs Resolved Cases")
-    st.markdown(
-        """<h3 class="sub">Monthly Trend: Registered vs Resolved Cases</h3>""",
-        unsafe_allow_html=True,
-    )
-    st.plotly_chart(trend_line, use_container_width=True)
-
-    st.divider()
-
-    col1, col2 = st.columns(2, gap="large")
-    col1.subheader("Distribution of Registered Cases by Priority")
-    col1.plotly_chart(priority_pie, use_container_width=True)
-
-    # col2.subheader("Top 10 Distress Categories by Frequency")
-    st.markdown(
-        """<h3 class="sub">Top 10 Distress Categories by Frequency</h3>""",
-        unsafe_allow_html=True,
-    )
-
-    col2.dataframe(distress_summary, use_container_width=True)
 
-    st.divider()
-
-    # st.subheader("Aging Distribution of Pending Cases")
-    st.markdown(
-        """<h3 class="sub">Aging Distribution of Pending Cases</h3>""",
-        unsafe_allow_html=True,
-    )
-
-    col1, col2 = st.columns([2, 1], gap="large")
-
-    col1.plotly_chart(aging_bar, use_container_width=True)
-    col2.plotly_chart(aging_table, use_container_width=True)
-
-    st.divider()
-
-
-with tab2:
-    st.subheader("District-wise Analysis")
-
-    st.subheader("Dummy Text for Demo")
-
-    st.write(
-        "Lorem Ipsum is simply dummy text of the printing and typesetting industry. Lorem Ipsum has been the industry's standard dummy text ever since the 1500s, when an unknown printer took a galley of type and scrambled it to make a type specimen book. It has survived not only five centuries, but also the leap into electronic typesetting, remaining essentially unchanged. It was popularised in the 1960s with the release of Letraset sheets containing Lorem Ipsum passages, and more recently with desktop publishing software like Aldus PageMaker including versions of Lorem Ipsum."
-    )
-
-    st.divider()
-
-
-with tab3:
-    st.subheader("Department-wise Analysis")
-
-    st.subheader("Dummy Text for Demo")
-
-    st.write(
-        "Lorem Ipsum is simply dummy text of the printing and typesetting industry. Lorem Ipsum has been the industry's standard dummy text ever since the 1500s, when an unknown printer took a galley of type and scrambled it to make a type specimen book. It has survived not only five centuries, but also the leap into electronic typesetting, remaining essentially unchanged. It was popularised in the 1960s with the release of Letraset sheets containing Lorem Ipsum passages, and more recently with desktop publishing software like Aldus PageMaker including versions of Lorem Ipsum."
+    # 4. Opt-in profile of this rerun (KM_PROFILE=1 or ?profile=1)
+    render_profile_panel(
+        finish_trace(
+            scenario=st.session_state.get("time_period_selector"),
+            data_version=data_version,
+            rows=issue_rows,
+            view_cache=VIEW_CACHE.stats(),
+        )
     )
-
-    st.divider()
-
-
-# 3. Display data
-with st.expander("🗂️ Category Mapping DataFrame"):
-    st.dataframe(df_category)
-
-with st.expander("🏢 Department Mapping DataFrame"):
-    st.dataframe(df_dept)
-
-with st.expander("📋 Issue Data (Merged with Date Info)"):
-    st.write(f"This dataframe contains {len(df_filtered_issues)} records.")
-    st.dataframe(df_filtered_issues)
-
-st.caption(
-    f"‼️Out of {all_records} total entries, {na_opening_dates} entries were dropped because the issue registration date ('Opening Date') was not recorded and {na_resolution_dates} were dropped becasue issue resolution date was not recorded for resolved issues."
-)
+finally:
+    finish_trace(interrupted=True)
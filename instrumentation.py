@@ -0,0 +1,158 @@
+# instrumentation.py
+"""Opt-in per-stage timing for a dashboard rerun.
+
+Stages are wrapped with `stage(name)` (or the `profiled(name)` decorator)
+and record wall time, CPU time and the memory allocated while they ran.
+Nothing is recorded unless a trace was started for the current thread with
+start_trace, so the wrappers cost one attribute lookup when profiling is off.
+
+Memory is measured with tracemalloc, which is process-wide: with several
+sessions profiling at once, a stage's figures include allocations made by
+the other sessions' threads in the meantime.
+"""
+
+import functools
+import json
+import os
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+import pandas as pd
+
+# Set to 1 to profile every rerun; ?profile=1 in the URL profiles one session
+PROFILE_ENV = "KM_PROFILE"
+# Path of a JSON-lines file that receives one trace per profiled rerun
+PROFILE_TRACE_ENV = "KM_PROFILE_TRACE"
+
+_local = threading.local()
+_tracing_lock = threading.Lock()
+_tracing_sessions = 0
+
+
+def profiling_requested(query_value=None):
+    """Whether the environment or a ?profile= query value asks for profiling."""
+    values = (os.environ.get(PROFILE_ENV), query_value)
+    return any(str(v).strip().lower() in ("1", "true", "yes", "on") for v in values)
+
+
+def start_trace(enabled=True, trace_memory=True):
+    """Begin recording stages on this thread; a no-op unless `enabled`."""
+    global _tracing_sessions
+    # A trace left open on this thread by a rerun that never finished
+    if getattr(_local, "trace", None) is not None:
+        finish_trace(interrupted=True)
+    if not enabled:
+        return
+    if trace_memory:
+        with _tracing_lock:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+            _tracing_sessions += 1
+    _local.trace = {
+        "started": time.time(),
+        "wall": time.perf_counter(),
+        "cpu": time.process_time(),
+        "trace_memory": trace_memory,
+        "stages": [],
+        "stack": [],
+    }
+
+
+def finish_trace(path=None, **context):
+    """Stop recording and return the rerun's trace, or None if none was started.
+
+    The trace is a dict with the total wall/CPU time, any `context` given
+    (scenario, dataset version, ...) and one entry per stage in start order.
+    It is appended as a JSON line to `path`, or to $KM_PROFILE_TRACE.
+    """
+    global _tracing_sessions
+    trace = getattr(_local, "trace", None)
+    if trace is None:
+        return None
+    _local.trace = None
+    if trace["trace_memory"]:
+        with _tracing_lock:
+            _tracing_sessions -= 1
+            if _tracing_sessions <= 0:
+                _tracing_sessions = 0
+                tracemalloc.stop()
+
+    result = {
+        "time": pd.Timestamp(trace["started"], unit="s").isoformat(timespec="seconds"),
+        "wall_ms": (time.perf_counter() - trace["wall"]) * 1000,
+        "cpu_ms": (time.process_time() - trace["cpu"]) * 1000,
+        **context,
+        "stages": trace["stages"],
+    }
+    path = path or os.environ.get(PROFILE_TRACE_ENV)
+    if path:
+        with open(path, "a") as f:
+            f.write(json.dumps(result, default=str) + "\n")
+    return result
+
+
+@contextmanager
+def stage(name):
+    """Record the wall, CPU and memory cost of the enclosed block."""
+    trace = getattr(_local, "trace", None)
+    if trace is None:
+        yield
+        return
+
+    stack = trace["stack"]
+    record = {"stage": name, "depth": len(stack)}
+    trace["stages"].append(record)
+    memory = trace["trace_memory"] and tracemalloc.is_tracing()
+    if memory:
+        # reset_peak is global, so hand the peak seen so far to the parent
+        # before resetting it for this stage
+        current, peak = tracemalloc.get_traced_memory()
+        if stack:
+            stack[-1]["peak"] = max(stack[-1]["peak"], peak)
+        tracemalloc.reset_peak()
+        frame = {"start": current, "peak": current}
+    else:
+        frame = {}
+    stack.append(frame)
+    wall, cpu = time.perf_counter(), time.process_time()
+    try:
+        yield
+    finally:
+        record["wall_ms"] = (time.perf_counter() - wall) * 1000
+        record["cpu_ms"] = (time.process_time() - cpu) * 1000
+        stack.pop()
+        if memory and tracemalloc.is_tracing():
+            current, peak = tracemalloc.get_traced_memory()
+            frame["peak"] = max(frame["peak"], peak)
+            if stack:
+                stack[-1]["peak"] = max(stack[-1]["peak"], frame["peak"])
+            record["alloc_mib"] = (current - frame["start"]) / 2**20
+            record["peak_mib"] = (frame["peak"] - frame["start"]) / 2**20
+
+
+def profiled(name):
+    """Decorator form of stage(name)."""
+
+    def decorate(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with stage(name):
+                return fn(*args, **kwargs)
+
+        return wrapper
+
+    return decorate
+
+
+def trace_table(trace):
+    """The stages of a finished trace as a frame, nested stages indented."""
+    stages = pd.DataFrame(trace["stages"])
+    if stages.empty:
+        return stages
+    stages["stage"] = [
+        " " * depth + name for depth, name in zip(stages["depth"], stages["stage"])
+    ]
+    columns = ["stage", "wall_ms", "cpu_ms", "alloc_mib", "peak_mib"]
+    return stages.reindex(columns=columns).set_index("stage").round(2)
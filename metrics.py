@@ -0,0 +1,1051 @@
+# metrics.py
+"""Dashboard computations with no Streamlit dependency.
+
+home.py only renders what compute_dashboard_metrics returns, so the same
+numbers can be profiled, benchmarked or produced from a batch job.
+"""
+
+import numpy as np
+import pandas as pd
+
+from fiscal_calendar import calendar_ordinals, ordinal_starts
+from instrumentation import profiled, stage
+from view_cache import VIEW_CACHE
+
+# Aging buckets for pending cases: bucket i covers AGING_EDGES[i-1] <= days
+# < AGING_EDGES[i], so the defaults give < 7, 7-30 and > 30 days
+AGING_EDGES = [7, 31]
+AGING_LABELS = ["< 7 days", "7–30 days", "> 30 days"]
+AGING_TAIL_DAYS = [360]
+
+# Granularities of the registered vs resolved trend, and their axis labels
+TREND_FREQUENCIES = {"M": "Month", "W": "Week", "D": "Day"}
+
+# Per-day measures of the district cube, and the district of cases whose
+# export has no District
+DISTRICT_MEASURES = [
+    "registered",
+    "resolved",
+    "closed",
+    "pending",
+    "resolution_days_sum",
+    "resolution_days_count",
+]
+DISTRICT_UNKNOWN = "Not recorded"
+
+# Resolution timeline of departments without their own, and the resolution
+# time percentiles of the Department tab (nearest rank, as on the Overview)
+DEFAULT_SLA_DAYS = 7
+SLA_PERCENTILES = [50, 90, 95]
+DEPARTMENT_COLUMNS = [
+    "Registered",
+    "Resolved",
+    *(f"P{q} (days)" for q in SLA_PERCENTILES),
+    "SLA (days)",
+    "Resolved Late",
+    "Breach Rate (%)",
+    "Pending",
+    "Pending Past SLA",
+    *AGING_LABELS,
+]
+
+# Resolution time percentiles of the Overview. Approximate percentiles are
+# within RESOLUTION_ACCURACY of the exact ones (relative, or half an hour
+# under an hour) up to RESOLUTION_MAX_HOURS; windows with at most
+# EXACT_MAX_CASES resolved cases are computed exactly instead
+RESOLUTION_PERCENTILES = [50, 90, 99]
+RESOLUTION_ACCURACY = 0.025
+RESOLUTION_MAX_HOURS = 10 * 366 * 24
+RESOLUTION_BLOCK_DAYS = 32
+EXACT_MAX_CASES = 20_000
+PRIORITY_UNKNOWN = "Not recorded"
+
+# Bin 0 holds resolution times up to _FLOOR_HOURS (reported as half that),
+# bin i > 0 those in (_FLOOR_HOURS * _GAMMA ** (i - 1), _FLOOR_HOURS *
+# _GAMMA ** i], reported as the point within _BIN_ACCURACY of both ends. Both
+# are a fifth tighter than the documented bound, so errors stay clear of it
+_BIN_ACCURACY = 0.8 * RESOLUTION_ACCURACY
+_FLOOR_HOURS = 0.8
+_GAMMA = (1 + _BIN_ACCURACY) / (1 - _BIN_ACCURACY)
+RESOLUTION_BINS = (
+    int(np.ceil(np.log(RESOLUTION_MAX_HOURS / _FLOOR_HOURS) / np.log(_GAMMA))) + 1
+)
+RESOLUTION_BIN_HOURS = _FLOOR_HOURS * np.concatenate(
+    [[0.5], 2 * _GAMMA ** np.arange(1, RESOLUTION_BINS) / (_GAMMA + 1)]
+)
+
+
+@profiled("daily rollup")
+def build_daily_rollup(df_issues, df_date, df_category, df_dept):
+    """Per-day aggregates of the issue table keyed on the Dim_Date calendar.
+
+    Returns a dict of frames indexed (or sorted) by opening date:
+
+    - "daily": registered, resolved, closed and pending case counts plus the
+      sum/count of resolution days, with season and fiscal_year attached
+    - "priority": case counts per day and Priority (one column per priority)
+    - "category" / "department": long frames of date, Priority, mapping name
+      and case count, one row per non-empty combination
+
+    Cases are counted once per Case No, so summing any date range of these
+    frames gives the same figures as counting distinct cases in that range.
+    """
+    df = df_issues.drop_duplicates("Case No")
+    day = df["Opening Date"]
+
+    calendar = df_date.set_index("date")[["season", "fiscal_year"]]
+    days = pd.date_range(
+        min(calendar.index.min(), day.min()), max(calendar.index.max(), day.max())
+    )
+
+    daily = pd.DataFrame(
+        {
+            "registered": day.value_counts(),
+            "resolved": day[df["is_resolved"]].value_counts(),
+            "closed": day[df["is_closed"]].value_counts(),
+            "pending": day[df["is_pending"]].value_counts(),
+            "resolution_days_sum": df["resolution_days"]
+            .where(df["is_resolved"])
+            .groupby(day)
+            .sum(),
+            "resolution_days_count": df["resolution_days"]
+            .where(df["is_resolved"])
+            .groupby(day)
+            .count(),
+        }
+    )
+    daily = daily.reindex(days, fill_value=0).fillna(0).astype("int64")
+    daily = daily.join(calendar)
+    daily.index.name = "date"
+
+    priority = (
+        df.groupby(["Opening Date", "Priority"], observed=True)
+        .size()
+        .unstack(fill_value=0)
+        .reindex(days, fill_value=0)
+    )
+    priority.index.name = "date"
+    priority.columns = priority.columns.astype(str)
+
+    def mapping_counts(df_mapping, column):
+        pairs = df[["Case No", "Opening Date", "Priority"]].merge(
+            df_mapping[["Case No", column]].drop_duplicates(), on="Case No"
+        )
+        return (
+            pairs.groupby(["Opening Date", "Priority", column], observed=True)
+            .size()
+            .reset_index(name="cases")
+            .rename(columns={"Opening Date": "date"})
+        )
+
+    return {
+        "daily": daily,
+        "priority": priority,
+        "category": mapping_counts(df_category, "Category Name"),
+        "department": mapping_counts(df_dept, "Department"),
+    }
+
+
+def combine_rollups(base, delta, sign=1):
+    """Add (sign=1) or subtract (sign=-1) `delta` from the `base` rollup.
+
+    Every count in build_daily_rollup is additive over cases, so applying
+    the rollup of replaced rows with sign=-1 and of their new versions with
+    sign=1 gives the rollup of the updated table.
+    """
+    counts = [
+        col for col in base["daily"].columns if col not in ("season", "fiscal_year")
+    ]
+    daily = (
+        base["daily"][counts]
+        .add(sign * delta["daily"][counts], fill_value=0)
+        .astype("int64")
+    )
+    calendar = base["daily"][["season", "fiscal_year"]].combine_first(
+        delta["daily"][["season", "fiscal_year"]]
+    )
+    daily = daily.join(calendar)
+    daily.index.name = "date"
+
+    priority = (
+        base["priority"]
+        .add(sign * delta["priority"], fill_value=0)
+        .fillna(0)
+        .astype("int64")
+    )
+    priority.index.name = "date"
+
+    combined = {"daily": daily, "priority": priority}
+    for key in ("category", "department"):
+        name = base[key].columns[2]
+        signed = delta[key].assign(cases=sign * delta[key]["cases"])
+        frame = (
+            pd.concat([base[key], signed], ignore_index=True)
+            .astype({"Priority": object, name: object})
+            .groupby(["date", "Priority", name])["cases"]
+            .sum()
+            .reset_index()
+        )
+        combined[key] = (
+            frame[frame["cases"] != 0]
+            .astype({"Priority": "category", name: "category"})
+            .reset_index(drop=True)
+        )
+    return combined
+
+
+def rollup_kpis(rollup, start, end):
+    """Overview KPIs for opening dates in [start, end] from the daily rollup."""
+    totals = rollup["daily"].loc[start:end].sum(numeric_only=True)
+    total_cases = int(totals["registered"])
+    resolved_cases = int(totals["resolved"])
+    days_count = int(totals["resolution_days_count"])
+    return {
+        "total_cases": total_cases,
+        "resolved_cases": resolved_cases,
+        "closed_cases": int(totals["closed"]),
+        "pending_cases": int(totals["pending"]),
+        "avg_resolution_days": (
+            round(float(totals["resolution_days_sum"]) / days_count, 2)
+            if days_count
+            else np.nan
+        ),
+        "resolution_rate": (
+            round(resolved_cases / total_cases * 100, 2) if total_cases else np.nan
+        ),
+    }
+
+
+def rollup_counts(rollup, key, start, end, priority=None):
+    """Case counts per Priority, or per mapping name for key="category" or
+    key="department" (optionally for one priority), in [start, end]."""
+    if key == "priority":
+        counts = rollup["priority"].loc[start:end].sum()
+    else:
+        frame = rollup[key]
+        dates = frame["date"].to_numpy()
+        lo = dates.searchsorted(pd.Timestamp(start).to_datetime64(), side="left")
+        hi = dates.searchsorted(pd.Timestamp(end).to_datetime64(), side="right")
+        frame = frame.iloc[lo:hi]
+        if priority is not None:
+            frame = frame[frame["Priority"] == priority]
+        counts = frame.groupby(frame.columns[2], observed=True)["cases"].sum()
+    counts = counts[counts > 0].sort_values(ascending=False, kind="stable")
+    counts.name = "count"
+    return counts
+
+
+def summarize_aging(
+    aging_days, edges=AGING_EDGES, labels=AGING_LABELS, tail_days=AGING_TAIL_DAYS
+):
+    """Bucket counts, min/max and tail counts for an array of aging days.
+
+    Buckets are assigned with one searchsorted over `edges` (len(labels) ==
+    len(edges) + 1); `tail_days` lists thresholds to count cases strictly
+    above, e.g. the > 360 days row of the aging table.
+    """
+    days = np.asarray(aging_days, dtype="int64")
+    buckets = np.searchsorted(edges, days, side="right")
+    counts = np.bincount(buckets, minlength=len(labels))
+    return {
+        "counts": pd.Series(counts, index=labels, name="count"),
+        "min": days.min() if len(days) else np.nan,
+        "max": days.max() if len(days) else np.nan,
+        "tails": {t: int(np.count_nonzero(days > t)) for t in tail_days},
+    }
+
+
+def slice_period(df, start, end, column="Opening Date"):
+    """Rows of `df` with `start <= df[column] <= end`.
+
+    `df` must be sorted on `column` (read_issue_data guarantees this for the
+    issue table); the bounds are found with a binary search and the result is
+    a positional slice rather than a filtered copy.
+    """
+    dates = df[column].to_numpy()
+    lo = dates.searchsorted(pd.Timestamp(start).to_datetime64(), side="left")
+    hi = dates.searchsorted(pd.Timestamp(end).to_datetime64(), side="right")
+    return df.iloc[lo:hi]
+
+
+def dataset_key(df):
+    # Frames handed out by st.cache_data are fresh copies on every rerun, so
+    # they are identified by the data_version the loaders stamp on them; an
+    # id() would miss on every rerun and could be reused by another frame
+    version = df.attrs.get("data_version")
+    if version is None:
+        raise ValueError(
+            "Frame has no attrs['data_version']; load it through the loaders"
+            " of utilities or stamp one"
+        )
+    return ("version", version)
+
+
+def period_kpis(period):
+    """Overview KPIs computed directly from a slice of the issue table."""
+    total_cases = period["Case No"].nunique()
+    resolved = period[period["is_resolved"]]
+    resolved_cases = resolved["Case No"].nunique()
+    return {
+        "total_cases": total_cases,
+        "resolved_cases": resolved_cases,
+        "closed_cases": int(period["is_closed"].sum()),
+        "pending_cases": int(period["is_pending"].sum()),
+        "avg_resolution_days": round(float(resolved["resolution_days"].mean()), 2),
+        "resolution_rate": (
+            round(resolved_cases / total_cases * 100, 2) if total_cases else np.nan
+        ),
+    }
+
+
+def aging_summary(period, today):
+    pending = period[period["is_pending"]]
+    aging_days = (today - pending["Opening Date"]).dt.days
+    aging = summarize_aging(aging_days)
+    return {
+        "counts": {label: int(n) for label, n in aging["counts"].items()},
+        "min": None if pd.isna(aging["min"]) else int(aging["min"]),
+        "max": None if pd.isna(aging["max"]) else int(aging["max"]),
+        "tails": aging["tails"],
+    }
+
+
+def first_cases(issues):
+    """The first row of every Case No of the issue table."""
+    if "is_first_case" in issues.columns:
+        return issues[issues["is_first_case"].to_numpy()]
+    return issues.drop_duplicates("Case No")
+
+
+def case_trend(period, freq="M"):
+    """Registered (by opening time) vs resolved (by resolution time) cases
+    per month, week or day (`freq` one of TREND_FREQUENCIES).
+
+    Each Case No is counted once, on its first row; periods are integer
+    calendar ordinals counted with np.bincount. Periods with neither
+    registered nor resolved cases are left out.
+    """
+    label = TREND_FREQUENCIES[freq]
+    cases = first_cases(period)
+
+    if freq == "M" and "opening_month_no" in cases.columns:
+        opened = cases["opening_month_no"].to_numpy()
+        resolved = cases["resolution_month_no"].to_numpy()
+    else:
+        opened = calendar_ordinals(cases["Opening Date Time"], freq)
+        resolved = calendar_ordinals(cases["Resolution Date Time"], freq)
+    opened = opened[opened >= 0]
+    resolved = resolved[cases["is_resolved"].to_numpy() & (resolved >= 0)]
+
+    both = np.concatenate([opened, resolved])
+    if not len(both):
+        return {label: [], "Registered Cases": [], "Resolved Cases": []}
+    first, last = both.min(), both.max()
+    registered = np.bincount(opened - first, minlength=last - first + 1)
+    resolved = np.bincount(resolved - first, minlength=last - first + 1)
+    keep = np.flatnonzero((registered > 0) | (resolved > 0))
+    return {
+        label: ordinal_starts(keep + first, freq).tolist(),
+        "Registered Cases": registered[keep].tolist(),
+        "Resolved Cases": resolved[keep].tolist(),
+    }
+
+
+def monthly_trend(period):
+    """Registered vs resolved cases per month, see case_trend."""
+    return case_trend(period, "M")
+
+
+def top_categories(period, categories, k=10, priority="Distress"):
+    """Most frequent categories among the period's cases of one priority."""
+    cases = period[period["Priority"] == priority]
+    with_categories = pd.merge(
+        cases[["Case No"]],
+        categories[["Case No", "Category Name"]],
+        on="Case No",
+        how="left",
+    )
+    counts = with_categories["Category Name"].value_counts()
+    return counts[counts > 0].head(k)
+
+
+def case_mapping_index(mapping, column):
+    """Case ID -> mapping codes lookup, built once per mapping file.
+
+    `mapping` is a category or department mapping with the integer Case ID
+    of apply_schema; a case may map to several names. Returns a dict with
+    the sorted unique "case_ids", CSR style "offsets" into "codes" (the
+    category codes of `column`, in case order) and the code -> "names"
+    array.
+    """
+    names = mapping[column].astype("category")
+    pairs = pd.DataFrame(
+        {
+            "case": mapping["Case ID"].to_numpy("int64"),
+            "code": names.cat.codes.to_numpy("int32"),
+        }
+    )
+    pairs = pairs[(pairs["case"] >= 0) & (pairs["code"] >= 0)]
+    pairs = pairs.drop_duplicates().sort_values(["case", "code"])
+    case_ids, starts = np.unique(pairs["case"].to_numpy(), return_index=True)
+    return {
+        "case_ids": case_ids,
+        "offsets": np.append(starts, len(pairs)),
+        "codes": pairs["code"].to_numpy(),
+        "names": names.cat.categories.to_numpy(dtype=object),
+    }
+
+
+def mapped_counts(index, case_ids):
+    """Number of distinct cases in `case_ids` mapped to each name of `index`."""
+    counts = np.zeros(len(index["names"]), dtype="int64")
+    known = index["case_ids"]
+    if not len(known):
+        return counts
+    case_ids = pd.unique(np.asarray(case_ids, dtype="int64"))
+    pos = np.minimum(known.searchsorted(case_ids), len(known) - 1)
+    pos = pos[known[pos] == case_ids]
+
+    # Expand each case's [start, end) run of codes into one gather index
+    starts = index["offsets"][pos]
+    lengths = index["offsets"][pos + 1] - starts
+    run_starts = np.cumsum(lengths) - lengths
+    take = np.repeat(starts - run_starts, lengths) + np.arange(lengths.sum())
+    return counts + np.bincount(index["codes"][take], minlength=len(counts))
+
+
+def top_k_counts(counts, names, k=10):
+    """The `k` largest non-zero `counts` as a Series indexed by name.
+
+    Ties keep code order, as the stable sort of rollup_counts does, and only
+    the top `k` are sorted.
+    """
+    codes = np.flatnonzero(counts)
+    # One integer key orders by count descending, then code ascending
+    keys = -counts[codes] * len(counts) + codes
+    if len(codes) > k:
+        keep = np.argpartition(keys, k - 1)[:k]
+        codes, keys = codes[keep], keys[keep]
+    codes = codes[np.argsort(keys)]
+    return pd.Series(counts[codes], index=names[codes], name="count")
+
+
+def top_mapped(index, period, k=10, priority="Distress"):
+    """Most frequent mapped names among the period's cases of one priority
+    (or of all priorities when `priority` is None)."""
+    case_ids = period["Case ID"].to_numpy()
+    if priority is not None:
+        case_ids = case_ids[(period["Priority"] == priority).to_numpy()]
+    return top_k_counts(mapped_counts(index, case_ids), index["names"], k)
+
+
+def district_day_counts(issues):
+    """Case counts per District and opening day, one row per non-empty pair.
+
+    Columns are District, date and DISTRICT_MEASURES. Each Case No is
+    counted once, on its first row, as in the daily rollup; cases without a
+    District (or exports without the column) count under DISTRICT_UNKNOWN.
+    """
+    cases = first_cases(issues)
+    if "District" in cases.columns:
+        district = cases["District"].astype(object).fillna(DISTRICT_UNKNOWN)
+    else:
+        district = pd.Series(DISTRICT_UNKNOWN, index=cases.index)
+    resolution_days = cases["resolution_days"].where(cases["is_resolved"])
+    frame = pd.DataFrame(
+        {
+            "District": district.to_numpy(dtype=object),
+            "date": cases["Opening Date"].to_numpy(),
+            "registered": 1,
+            "resolved": cases["is_resolved"].to_numpy("int64"),
+            "closed": cases["is_closed"].to_numpy("int64"),
+            "pending": cases["is_pending"].to_numpy("int64"),
+            "resolution_days_sum": resolution_days.fillna(0).to_numpy("float64"),
+            "resolution_days_count": resolution_days.notna().to_numpy("int64"),
+        }
+    )
+    return frame.groupby(["District", "date"], sort=True).sum().reset_index()
+
+
+@profiled("district cube")
+def build_district_cube(counts):
+    """District x day index of district_day_counts output.
+
+    Returns a dict with the sorted "districts", the "first_day" (days since
+    1970) and, per measure, "prefix" sums along the days: prefix[m][i, j] is
+    the total of district i over its first j days. Any window then costs one
+    subtraction per district, whatever its length.
+    """
+    names, codes = np.unique(
+        counts["District"].to_numpy(dtype=str), return_inverse=True
+    )
+    days = counts["date"].to_numpy("datetime64[D]").astype("int64")
+    first_day = int(days.min()) if len(days) else 0
+    n_days = int(days.max()) - first_day + 1 if len(days) else 0
+    prefix = {}
+    for measure in DISTRICT_MEASURES:
+        dtype = "float64" if measure == "resolution_days_sum" else "int64"
+        grid = np.zeros((len(names), n_days + 1), dtype=dtype)
+        grid[codes, days - first_day + 1] = counts[measure].to_numpy(dtype)
+        prefix[measure] = np.cumsum(grid, axis=1, out=grid)
+    return {"districts": names, "first_day": first_day, "prefix": prefix}
+
+
+def district_summary(cube, start, end, today=None):
+    """Per-district KPIs and pending aging for opening dates in [start, end].
+
+    Registered, resolved, resolution rate, average resolution days, pending
+    cases and the AGING_LABELS buckets of the pending cases' age at `today`
+    (default: today), one row per district with cases, busiest first.
+    """
+    today = pd.Timestamp.today() if today is None else pd.Timestamp(today)
+    n_days = cube["prefix"]["registered"].shape[1] - 1
+
+    def day(value):
+        # Days since 1970, the unit of first_day
+        return (pd.Timestamp(value).normalize() - pd.Timestamp(0)).days
+
+    def offset(value):
+        return int(np.clip(day(value) - cube["first_day"], 0, n_days))
+
+    lo = offset(pd.Timestamp(start).ceil("D"))
+    hi = max(lo, offset(pd.Timestamp(end) + pd.Timedelta(days=1)))
+
+    def window(measure, a, b):
+        prefix = cube["prefix"][measure]
+        return prefix[:, b] - prefix[:, a]
+
+    totals = {measure: window(measure, lo, hi) for measure in DISTRICT_MEASURES}
+
+    # A pending case opened on day d is `today - d` days old, so each aging
+    # bucket is a run of opening days (the runs go from the oldest bucket)
+    today_offset = day(today) - cube["first_day"]
+    cuts = [int(np.clip(today_offset - edge + 1, lo, hi)) for edge in AGING_EDGES]
+    runs = [lo, *reversed(cuts), hi]
+    aging = [window("pending", a, b) for a, b in zip(runs, runs[1:])][::-1]
+
+    registered = totals["registered"]
+    resolved = totals["resolved"]
+    days_count = totals["resolution_days_count"]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        summary = pd.DataFrame(
+            {
+                "Registered": registered,
+                "Resolved": resolved,
+                "Resolution Rate (%)": np.round(resolved / registered * 100, 2),
+                "Avg Resolution Days": np.round(
+                    totals["resolution_days_sum"] / days_count, 2
+                ),
+                "Pending": totals["pending"],
+                **dict(zip(AGING_LABELS, aging)),
+            },
+            index=pd.Index(cube["districts"], name="District"),
+        )
+    summary = summary[summary["Registered"] > 0]
+    return summary.sort_values("Registered", ascending=False, kind="stable")
+
+
+def mapped_case_rows(cases, index):
+    """Positions into `cases` and mapped names, one pair per (case, name)
+    of the case_mapping_index `index`; unmapped cases are left out."""
+    known = index["case_ids"]
+    case_ids = cases["Case ID"].to_numpy("int64")
+    pos = np.minimum(known.searchsorted(case_ids), max(len(known) - 1, 0))
+    mapped = np.flatnonzero(known[pos] == case_ids) if len(known) else pos[:0]
+
+    # Expand each mapped case's run of codes, as in mapped_counts
+    starts = index["offsets"][pos[mapped]]
+    lengths = index["offsets"][pos[mapped] + 1] - starts
+    run_starts = np.cumsum(lengths) - lengths
+    take = np.repeat(starts - run_starts, lengths) + np.arange(lengths.sum())
+    return np.repeat(mapped, lengths), index["names"][index["codes"][take]]
+
+
+def department_case_rows(issues, index):
+    """One row per (case, department) of the issue table, the department
+    mapping joined in through its case_mapping_index.
+
+    Columns are Department, date (opening day), resolution_hours, is_resolved
+    and is_pending. Each Case No is taken once, on its first row; cases
+    without a department are left out.
+    """
+    cases = first_cases(issues)
+    rows, names = mapped_case_rows(cases, index)
+    return pd.DataFrame(
+        {
+            "Department": names,
+            "date": cases["Opening Date"].to_numpy()[rows],
+            "resolution_hours": cases["resolution_hours"].to_numpy("float64")[rows],
+            "is_resolved": cases["is_resolved"].to_numpy()[rows],
+            "is_pending": cases["is_pending"].to_numpy()[rows],
+        }
+    )
+
+
+@profiled("department facts")
+def build_department_facts(rows):
+    """Department fact arrays of department_case_rows output.
+
+    Rows are sorted by department, then opening day, so the cases of one
+    department in any window are one contiguous slice found by binary
+    search. Returns a dict with the department "names", CSR "offsets" into
+    the row arrays "day" (days since 1970), "resolution_hours" (NaN unless
+    resolved) and "pending_prefix", the running count of pending rows, plus
+    the resolution "histograms" of the resolved rows (the rows
+    resolution_case_rows gives with the department index).
+    """
+    names, codes = np.unique(
+        rows["Department"].to_numpy(dtype=str), return_inverse=True
+    )
+    days = rows["date"].to_numpy("datetime64[D]").astype("int64")
+    order = np.lexsort((days, codes))
+    hours = rows["resolution_hours"].to_numpy("float64")[order]
+    hours[~rows["is_resolved"].to_numpy(bool)[order]] = np.nan
+    pending = rows["is_pending"].to_numpy(bool)[order]
+    resolved = rows[
+        rows["is_resolved"].to_numpy(bool) & rows["resolution_hours"].notna()
+    ]
+    return {
+        "names": names,
+        "offsets": np.searchsorted(codes[order], np.arange(len(names) + 1)),
+        "day": days[order],
+        "resolution_hours": hours,
+        "pending_prefix": np.concatenate([[0], np.cumsum(pending)]),
+        "histograms": build_resolution_histograms(
+            pd.DataFrame(
+                {
+                    "Department": resolved["Department"].to_numpy(),
+                    "date": resolved["date"].to_numpy(),
+                    "resolution_hours": np.maximum(
+                        resolved["resolution_hours"].to_numpy("float64"), 0
+                    ),
+                }
+            )
+        ),
+    }
+
+
+def department_summary(
+    facts, start, end, today=None, sla_days=None, default_sla=DEFAULT_SLA_DAYS
+):
+    """Per-department resolution times, backlog and SLA breaches for
+    opening dates in [start, end].
+
+    `sla_days` maps department names to their resolution timeline in days
+    (others get `default_sla`). A resolved case breaches when it took
+    longer than its timeline; a pending case when it has been open longer
+    at `today` (default: today). Percentiles are resolution_percentiles of
+    the resolved cases of the window, in days.
+    """
+    today = pd.Timestamp.today() if today is None else pd.Timestamp(today)
+    today = (today.normalize() - pd.Timestamp(0)).days
+    first = (pd.Timestamp(start).ceil("D") - pd.Timestamp(0)).days
+    last = (pd.Timestamp(end).normalize() - pd.Timestamp(0)).days
+    sla_days = sla_days or {}
+    percentiles = resolution_percentiles(
+        facts["histograms"], start, end, percentiles=SLA_PERCENTILES
+    )
+
+    records = []
+    for code, name in enumerate(facts["names"]):
+        run_start, run_end = facts["offsets"][code], facts["offsets"][code + 1]
+        days = facts["day"][run_start:run_end]
+        lo = run_start + days.searchsorted(first, side="left")
+        hi = run_start + days.searchsorted(last, side="right")
+        if hi <= lo:
+            continue
+
+        def pending_between(a, b):
+            # Pending rows among positions [a, b) of the window
+            a, b = min(max(a, lo), hi), min(max(b, lo), hi)
+            return int(facts["pending_prefix"][b] - facts["pending_prefix"][a])
+
+        def opened_before(day):
+            return run_start + days.searchsorted(day, side="left")
+
+        hours = facts["resolution_hours"][lo:hi]
+        hours = hours[~np.isnan(hours)]
+        sla = sla_days.get(name, default_sla)
+        # Pending cases opened on day d are `today - d` days old
+        cuts = [opened_before(today - edge + 1) for edge in reversed(AGING_EDGES)]
+        runs = [lo, *cuts, hi]
+        aging = [pending_between(a, b) for a, b in zip(runs, runs[1:])][::-1]
+        breached = int(np.count_nonzero(hours > sla * 24))
+        records.append(
+            {
+                "Department": name,
+                "Registered": hi - lo,
+                "Resolved": len(hours),
+                **{
+                    f"P{q} (days)": (
+                        percentiles.at[name, f"P{q} (days)"] if len(hours) else np.nan
+                    )
+                    for q in SLA_PERCENTILES
+                },
+                "SLA (days)": sla,
+                "Resolved Late": breached,
+                "Breach Rate (%)": (
+                    round(breached / len(hours) * 100, 2) if len(hours) else np.nan
+                ),
+                "Pending": pending_between(lo, hi),
+                "Pending Past SLA": pending_between(lo, opened_before(today - sla)),
+                **dict(zip(AGING_LABELS, aging)),
+            }
+        )
+    summary = pd.DataFrame(records, columns=["Department", *DEPARTMENT_COLUMNS])
+    summary = summary.set_index("Department")
+    return summary.sort_values("Registered", ascending=False, kind="stable")
+
+
+def resolution_bins(hours):
+    """Bin of RESOLUTION_BIN_HOURS of each resolution time (in hours)."""
+    hours = np.maximum(np.asarray(hours, dtype="float64"), _FLOOR_HOURS)
+    bins = np.ceil(np.log(hours / _FLOOR_HOURS) / np.log(_GAMMA)).astype("int64")
+    return np.minimum(bins, RESOLUTION_BINS - 1)
+
+
+def resolution_case_rows(issues, index=None, label="Priority"):
+    """Resolved cases of the issue table with their opening day and
+    resolution time, grouped by Priority or, given a case_mapping_index, by
+    mapped name (a case mapped to several names counts in each).
+
+    Columns are `label`, date and resolution_hours. Each Case No is taken
+    once, on its first row; negative resolution times count as zero.
+    """
+    cases = first_cases(issues)
+    hours = cases["resolution_hours"].to_numpy("float64")
+    resolved = cases["is_resolved"].to_numpy(bool) & ~np.isnan(hours)
+    cases, hours = cases[resolved], hours[resolved]
+    if index is None:
+        rows = np.arange(len(cases))
+        groups = cases["Priority"].astype(object).fillna(PRIORITY_UNKNOWN).to_numpy()
+    else:
+        rows, groups = mapped_case_rows(cases, index)
+    return pd.DataFrame(
+        {
+            label: groups,
+            "date": cases["Opening Date"].to_numpy()[rows],
+            "resolution_hours": np.maximum(hours[rows], 0),
+        }
+    )
+
+
+@profiled("resolution histograms")
+def build_resolution_histograms(rows, block_days=RESOLUTION_BLOCK_DAYS):
+    """Per-day resolution time histograms of resolution_case_rows output.
+
+    Days are counted from "first_day" (days since 1970). Returns a dict with
+    the group "label" and sorted "names", and:
+
+    - "daily_day", "daily_cell", "daily_count": the non-empty cells of every
+      day's histograms in day order, a cell being group * RESOLUTION_BINS +
+      bin
+    - "prefix": cumulative histograms (blocks + 1, groups, bins) of the days
+      before each block of `block_days` days, so any window costs two block
+      lookups plus the daily cells of its ragged ends, whatever its length
+    - "day", "group", "hours": the rows sorted by day, group and resolution
+      time, for exact percentiles
+    """
+    label = rows.columns[0]
+    names, codes = np.unique(rows[label].to_numpy(dtype=str), return_inverse=True)
+    days = rows["date"].to_numpy("datetime64[D]").astype("int64")
+    first_day = int(days.min()) if len(days) else 0
+    days = days - first_day
+    hours = rows["resolution_hours"].to_numpy("float64")
+    n_blocks = int(days.max()) // block_days + 1 if len(days) else 0
+    width = len(names) * RESOLUTION_BINS
+    cells = codes * RESOLUTION_BINS + resolution_bins(hours)
+
+    keys, counts = np.unique(days * width + cells, return_counts=True)
+    prefix = np.bincount(
+        (days // block_days + 1) * width + cells, minlength=(n_blocks + 1) * width
+    )
+    prefix = prefix.reshape(n_blocks + 1, len(names), RESOLUTION_BINS)
+    order = np.lexsort((hours, codes, days))
+    return {
+        "label": label,
+        "names": names,
+        "first_day": first_day,
+        "block_days": block_days,
+        "daily_day": keys // width,
+        "daily_cell": keys % width,
+        "daily_count": counts,
+        "prefix": np.cumsum(prefix, axis=0).astype("int32"),
+        "day": days[order],
+        "group": codes[order],
+        "hours": hours[order],
+    }
+
+
+def _window_days(histograms, start, end):
+    # [first, last + 1) of the opening dates in [start, end], in days since
+    # first_day and clipped to the blocks of the histograms
+    first = (pd.Timestamp(start).ceil("D") - pd.Timestamp(0)).days
+    last = (pd.Timestamp(end).normalize() - pd.Timestamp(0)).days
+    span = (len(histograms["prefix"]) - 1) * histograms["block_days"]
+    a = int(np.clip(first - histograms["first_day"], 0, span))
+    b = int(np.clip(last + 1 - histograms["first_day"], a, span))
+    return a, b
+
+
+def window_histograms(histograms, start, end):
+    """Resolution time histograms (groups, bins) of the cases opened in
+    [start, end], merged from the block prefix and the daily histograms."""
+    a, b = _window_days(histograms, start, end)
+    shape = len(histograms["names"]), RESOLUTION_BINS
+    block = histograms["block_days"]
+
+    def daily(first, stop):
+        days = histograms["daily_day"]
+        lo, hi = days.searchsorted(first), days.searchsorted(stop)
+        merged = np.bincount(
+            histograms["daily_cell"][lo:hi],
+            weights=histograms["daily_count"][lo:hi],
+            minlength=shape[0] * shape[1],
+        )
+        return merged.reshape(shape).astype("int64")
+
+    first_block, last_block = -(-a // block), b // block
+    if first_block >= last_block:
+        return daily(a, b)
+    prefix = histograms["prefix"]
+    return (
+        prefix[last_block].astype("int64")
+        - prefix[first_block]
+        + daily(a, first_block * block)
+        + daily(last_block * block, b)
+    )
+
+
+def resolution_error_bound(exact):
+    """Largest error (in hours) histogram_percentiles may make on each
+    `exact` percentile: RESOLUTION_ACCURACY of it, or half an hour under an
+    hour."""
+    exact = np.asarray(exact, dtype="float64")
+    return np.where(exact < 1, 0.5, RESOLUTION_ACCURACY * exact)
+
+
+def histogram_percentiles(hist, percentiles=RESOLUTION_PERCENTILES):
+    """Nearest-rank `percentiles` (in hours) of every row of the histograms
+    `hist`, each within RESOLUTION_ACCURACY of the exact one; NaN for
+    empty rows."""
+    cum = np.cumsum(hist, axis=1)
+    n = cum[:, -1]
+    values = np.full((len(hist), len(percentiles)), np.nan)
+    for j, q in enumerate(percentiles):
+        # The smallest value with at least q% of the cases at or below it
+        rank = np.maximum((q * n + 99) // 100, 1)
+        bins = (cum >= rank[:, None]).argmax(axis=1)
+        values[:, j] = np.where(n > 0, RESOLUTION_BIN_HOURS[bins], np.nan)
+    return values
+
+
+def exact_percentiles(hours, codes, n_groups, percentiles=RESOLUTION_PERCENTILES):
+    """Nearest-rank `percentiles` of `hours` per group code in
+    [0, n_groups), as histogram_percentiles but from the values."""
+    values = np.full((n_groups, len(percentiles)), np.nan)
+    if not len(hours):
+        return values
+    hours = hours[np.lexsort((hours, codes))]
+    counts = np.bincount(codes, minlength=n_groups)
+    starts = np.cumsum(counts) - counts
+    for j, q in enumerate(percentiles):
+        rank = np.maximum((q * counts + 99) // 100, 1)
+        picks = np.minimum(starts + rank - 1, len(hours) - 1)
+        values[:, j] = np.where(counts > 0, hours[picks], np.nan)
+    return values
+
+
+def resolution_percentiles(
+    histograms, start, end, exact=None, total=None, percentiles=RESOLUTION_PERCENTILES
+):
+    """Resolved cases and nearest-rank resolution time percentiles (in days)
+    per group, for cases opened in [start, end].
+
+    Percentiles come from the window's merged histograms (see
+    window_histograms); exact=True computes them from the sorted resolution
+    times instead, and exact=None does so for windows with at most
+    EXACT_MAX_CASES resolved cases. `total` labels an extra first row over
+    all groups, for groups that do not overlap (priorities). Rows with
+    cases only, busiest first; attrs["exact"] tells the mode used.
+    """
+    a, b = _window_days(histograms, start, end)
+    lo, hi = histograms["day"].searchsorted([a, b])
+    exact = hi - lo <= EXACT_MAX_CASES if exact is None else exact
+    names = histograms["names"]
+
+    if exact:
+        codes, hours = histograms["group"][lo:hi], histograms["hours"][lo:hi]
+        counts = np.bincount(codes, minlength=len(names))
+        values = exact_percentiles(hours, codes, len(names), percentiles)
+        if total is not None:
+            overall = exact_percentiles(hours, np.zeros_like(codes), 1, percentiles)
+            counts = np.concatenate([[hi - lo], counts])
+            values = np.vstack([overall, values])
+    else:
+        hist = window_histograms(histograms, start, end)
+        if total is not None:
+            hist = np.vstack([hist.sum(axis=0, keepdims=True), hist])
+        counts = hist.sum(axis=1)
+        values = histogram_percentiles(hist, percentiles)
+
+    summary = pd.DataFrame(
+        {
+            "Resolved": counts,
+            **{
+                f"P{q} (days)": np.round(values[:, j] / 24, 1)
+                for j, q in enumerate(percentiles)
+            },
+        },
+        index=pd.Index(
+            names if total is None else [total, *names], name=histograms["label"]
+        ),
+    )
+    summary = summary[summary["Resolved"] > 0]
+    head = 0 if total is None else 1
+    summary = pd.concat(
+        [
+            summary.iloc[:head],
+            summary.iloc[head:].sort_values("Resolved", ascending=False, kind="stable"),
+        ]
+    )
+    summary.attrs["exact"] = bool(exact)
+    return summary
+
+
+def compute_dashboard_metrics(
+    issues,
+    categories,
+    start,
+    end,
+    prev_start=None,
+    prev_end=None,
+    rollup=None,
+    today=None,
+    mappings=None,
+    priority="Distress",
+    trend_freq="M",
+):
+    """Every number shown on the overview tab for one period, as plain data.
+
+    `issues` is the prepared issue table from read_issue_data (sorted by
+    Opening Date) and `categories` the category mapping. When the daily
+    `rollup` of the same data is given, KPIs, priority shares and category
+    counts are summed from it instead of the raw rows. `today` anchors the
+    aging of pending cases (default: today).
+
+    `mappings` holds case_mapping_index lookups under "category" and
+    "department" (see read_case_mappings); with them the top categories
+    (and departments) of the cases of `priority` are counted from integer
+    codes instead of a merge on Case No. `trend_freq` picks the month, week
+    or day granularity of the trend (see case_trend).
+
+    Results are kept in the shared VIEW_CACHE, keyed on the dataset
+    versions, the bounds, `today` and the options, so treat them as
+    read-only.
+    """
+    today = pd.Timestamp.today() if today is None else pd.Timestamp(today)
+    today = today.normalize()
+    key = (
+        "metrics",
+        dataset_key(issues),
+        dataset_key(categories),
+        start,
+        end,
+        prev_start,
+        prev_end,
+        rollup is not None,
+        today,
+        None if mappings is None else tuple(mappings),
+        priority,
+        trend_freq,
+    )
+    cached = VIEW_CACHE.get(key)
+    if cached is not None:
+        return cached
+
+    with stage("filter"):
+        period = slice_period(issues, start, end)
+    has_prev = prev_start is not None and prev_end is not None
+
+    with stage("KPIs"):
+        if rollup is not None:
+            kpis = rollup_kpis(rollup, start, end)
+            prev_kpis = rollup_kpis(rollup, prev_start, prev_end) if has_prev else None
+            priorities = rollup_counts(rollup, "priority", start, end)
+        else:
+            kpis = period_kpis(period)
+            prev_kpis = (
+                period_kpis(slice_period(issues, prev_start, prev_end))
+                if has_prev
+                else None
+            )
+            priorities = period["Priority"].value_counts()
+            priorities = priorities[priorities > 0]
+
+    with stage("aging"):
+        aging = aging_summary(period, today)
+    with stage("trend"):
+        trend = case_trend(period, trend_freq)
+    with stage("distress categories"):
+        departments = None
+        if mappings is not None:
+            distress = top_mapped(mappings["category"], period, priority=priority)
+            if "department" in mappings:
+                departments = top_mapped(
+                    mappings["department"], period, priority=priority
+                )
+        elif rollup is not None:
+            distress = rollup_counts(rollup, "category", start, end, priority=priority)
+        else:
+            distress = top_categories(period, categories, priority=priority)
+
+    metrics = {
+        "kpis": kpis,
+        "prev_kpis": prev_kpis,
+        "aging": aging,
+        "priority": {str(name): int(n) for name, n in priorities.items()},
+        "trend": trend,
+        "distress": [(str(name), int(n)) for name, n in distress.head(10).items()],
+        "distress_departments": (
+            None
+            if departments is None
+            else [(str(name), int(n)) for name, n in departments.items()]
+        ),
+    }
+
+    return VIEW_CACHE.put(key, metrics)
+
+
+def metrics_to_json(metrics):
+    """compute_dashboard_metrics output as JSON-ready data (see
+    metrics_from_json): trend periods become ISO dates and aging tail
+    thresholds strings."""
+    payload = dict(metrics)
+    payload["trend"] = {
+        name: [v.isoformat() if isinstance(v, pd.Timestamp) else v for v in values]
+        for name, values in metrics["trend"].items()
+    }
+    payload["aging"] = dict(
+        metrics["aging"],
+        tails={str(t): n for t, n in metrics["aging"]["tails"].items()},
+    )
+    return payload
+
+
+def metrics_from_json(payload):
+    """Inverse of metrics_to_json."""
+    metrics = dict(payload)
+    label, *counts = payload["trend"]
+    metrics["trend"] = {
+        label: [pd.Timestamp(v) for v in payload["trend"][label]],
+        **{name: payload["trend"][name] for name in counts},
+    }
+    metrics["aging"] = dict(
+        payload["aging"],
+        tails={int(t): n for t, n in payload["aging"]["tails"].items()},
+    )
+    for key in ("distress", "distress_departments"):
+        if metrics.get(key) is not None:
+            metrics[key] = [tuple(pair) for pair in metrics[key]]
+    return metrics
@@ -0,0 +1,553 @@
+# sql_backend.py
+"""Overview metrics and raw table pages from an embedded SQLite database.
+
+An alternative to holding the issue table in every server process: the
+prepared issue table and the category/department mappings are written once
+to a single database file (see build_database), and each view runs SQL
+aggregations that return only small result sets. The results have the same
+shape as compute_dashboard_metrics, so the page renders them unchanged.
+
+Only the standard library's sqlite3 is needed. Connections are opened read
+only, per query, so any number of server processes can share the file.
+"""
+
+import json
+import os
+import sqlite3
+
+import numpy as np
+import pandas as pd
+
+from fiscal_calendar import ordinal_starts
+from metrics import (
+    AGING_EDGES,
+    AGING_LABELS,
+    AGING_TAIL_DAYS,
+    DISTRICT_MEASURES,
+    DISTRICT_UNKNOWN,
+    PRIORITY_UNKNOWN,
+    TREND_FREQUENCIES,
+    build_department_facts,
+    build_district_cube,
+    build_resolution_histograms,
+)
+from view_cache import VIEW_CACHE
+
+# Bump whenever build_database changes the layout of the file
+SCHEMA_VERSION = 3
+
+# Integer helper columns of the issues table: days since 1970 of the
+# opening date, opening time and resolution time (-1 when missing)
+ORDINAL_COLUMNS = {
+    "opening_day": "Opening Date",
+    "opened_day": "Opening Date Time",
+    "resolved_day": "Resolution Date Time",
+}
+HIDDEN_COLUMNS = [*ORDINAL_COLUMNS, "case_id"]
+# SQLite has no date or boolean type; these are restored on the way out
+DATE_COLUMNS = ["Opening Date", "Opening Date Time", "Resolution Date Time"]
+BOOL_COLUMNS = ["is_resolved", "is_closed", "is_pending", "is_first_case"]
+
+MAPPING_TABLES = {"category": "Category Name", "department": "Department"}
+INSERT_CHUNK_ROWS = 50_000
+
+
+def day_number(value):
+    """Days since 1 Jan 1970 of a date, the unit of the *_day columns."""
+    return int(pd.Timestamp(value).normalize().value // (86_400 * 10**9))
+
+
+def _quote(name):
+    return '"' + name.replace('"', '""') + '"'
+
+
+def _day_ordinals(dates):
+    values = np.asarray(dates, dtype="datetime64[ns]")
+    days = values.astype("datetime64[D]").astype("int64")
+    return np.where(np.isnat(values), -1, days)
+
+
+def build_database(path, issues, mappings, meta=None):
+    """Write the prepared issue table and the case mappings to `path`.
+
+    `issues` is the output of prepare_issue_data (sorted by Opening Date, so
+    rowid order is the page's default order) and `mappings` maps
+    "category"/"department" to the mapping frames with their Case ID.
+    `meta` (JSON-friendly) is stored alongside, e.g. the data version and
+    the drop counts the page reports.
+    """
+    if os.path.exists(path):
+        os.remove(path)
+    conn = sqlite3.connect(path)
+    try:
+        conn.execute("PRAGMA journal_mode = OFF")
+        conn.execute("PRAGMA synchronous = OFF")
+
+        table = issues.rename(columns={"Case ID": "case_id"})
+        table = table.astype(
+            {
+                col: object
+                for col in table.columns
+                if isinstance(table[col].dtype, pd.CategoricalDtype)
+            }
+        )
+        for name, column in ORDINAL_COLUMNS.items():
+            table[name] = _day_ordinals(table[column])
+        table.to_sql("issues", conn, index=False, chunksize=INSERT_CHUNK_ROWS)
+        conn.execute("CREATE INDEX issues_opening_day ON issues (opening_day)")
+        # Covers the distress queries, which only touch one priority
+        conn.execute(
+            "CREATE INDEX issues_priority ON issues (Priority, opening_day, case_id)"
+        )
+
+        for name, column in MAPPING_TABLES.items():
+            pairs = mappings[name][["Case ID", column]].astype({column: object})
+            pairs = pairs[pairs["Case ID"] >= 0].dropna().drop_duplicates()
+            pairs.columns = ["case_id", "name"]
+            pairs.to_sql(name, conn, index=False, chunksize=INSERT_CHUNK_ROWS)
+            conn.execute(f"CREATE INDEX {name}_case ON {name} (case_id)")
+            # The raw Case No view of the mapping, as the CSV has it
+            mappings[name].drop(columns="Case ID").to_sql(
+                f"{name}_mapping", conn, index=False, chunksize=INSERT_CHUNK_ROWS
+            )
+
+        conn.execute("CREATE TABLE meta (key TEXT PRIMARY KEY, value TEXT)")
+        meta = {**(meta or {}), "schema_version": SCHEMA_VERSION}
+        conn.executemany(
+            "INSERT INTO meta VALUES (?, ?)",
+            [(key, json.dumps(value, default=str)) for key, value in meta.items()],
+        )
+        conn.commit()
+        conn.execute("ANALYZE")
+    finally:
+        conn.close()
+
+
+def connect(path):
+    """Read-only connection to a database written by build_database."""
+    return sqlite3.connect(f"file:{path}?mode=ro", uri=True, check_same_thread=False)
+
+
+def database_key(path):
+    # Changes whenever the file is rebuilt
+    stat = os.stat(path)
+    return (path, stat.st_size, stat.st_mtime_ns)
+
+
+def read_meta(path):
+    """The `meta` dict stored by build_database, or None if unreadable."""
+    try:
+        conn = connect(path)
+        try:
+            rows = conn.execute("SELECT key, value FROM meta").fetchall()
+        finally:
+            conn.close()
+    except sqlite3.Error:
+        return None
+    meta = {key: json.loads(value) for key, value in rows}
+    if meta.get("schema_version") != SCHEMA_VERSION:
+        return None
+    return meta
+
+
+def _day_bounds(start, end):
+    # [start, end] as whole opening days, as slice_period compares midnights
+    return day_number(pd.Timestamp(start).ceil("D")), day_number(end)
+
+
+def sql_kpis(conn, start, end):
+    """Overview KPIs for opening dates in [start, end] (as rollup_kpis)."""
+    total, resolved, closed, pending, days_sum, days_count = conn.execute(
+        """
+        SELECT COUNT(*), TOTAL(is_resolved), TOTAL(is_closed), TOTAL(is_pending),
+               TOTAL(CASE WHEN is_resolved THEN resolution_days END),
+               COUNT(CASE WHEN is_resolved THEN resolution_days END)
+        FROM issues
+        WHERE is_first_case AND opening_day BETWEEN ? AND ?
+        """,
+        _day_bounds(start, end),
+    ).fetchone()
+    return {
+        "total_cases": int(total),
+        "resolved_cases": int(resolved),
+        "closed_cases": int(closed),
+        "pending_cases": int(pending),
+        "avg_resolution_days": (
+            round(days_sum / days_count, 2) if days_count else np.nan
+        ),
+        "resolution_rate": round(resolved / total * 100, 2) if total else np.nan,
+    }
+
+
+def sql_priority_counts(conn, start, end):
+    """Case counts per Priority, largest first (as rollup_counts)."""
+    rows = conn.execute(
+        """
+        SELECT Priority, COUNT(*) AS n FROM issues
+        WHERE is_first_case AND opening_day BETWEEN ? AND ?
+          AND Priority IS NOT NULL
+        GROUP BY Priority ORDER BY n DESC, Priority
+        """,
+        _day_bounds(start, end),
+    ).fetchall()
+    return {str(name): int(n) for name, n in rows}
+
+
+def sql_aging(conn, start, end, today):
+    """Aging of the period's pending cases (as aging_summary).
+
+    The database returns one row per distinct age; bucketing happens here.
+    """
+    rows = conn.execute(
+        """
+        SELECT ? - opening_day AS age, COUNT(*) FROM issues
+        WHERE is_pending AND opening_day BETWEEN ? AND ?
+        GROUP BY age
+        """,
+        (day_number(today), *_day_bounds(start, end)),
+    ).fetchall()
+    ages = np.array([age for age, _ in rows], dtype="int64")
+    counts = np.array([n for _, n in rows], dtype="int64")
+    buckets = np.searchsorted(AGING_EDGES, ages, side="right")
+    totals = np.bincount(buckets, weights=counts, minlength=len(AGING_LABELS))
+    return {
+        "counts": {label: int(n) for label, n in zip(AGING_LABELS, totals)},
+        "min": int(ages.min()) if len(ages) else None,
+        "max": int(ages.max()) if len(ages) else None,
+        "tails": {t: int(counts[ages > t].sum()) for t in AGING_TAIL_DAYS},
+    }
+
+
+# Period number columns of the trend, by granularity: opening time and
+# resolution time as months, or as days from which weeks are derived
+_TREND_COLUMNS = {
+    "M": ("opening_month_no", "resolution_month_no"),
+    "W": ("opened_day", "resolved_day"),
+    "D": ("opened_day", "resolved_day"),
+}
+
+
+def sql_trend(conn, start, end, freq="M"):
+    """Registered vs resolved cases per month, week or day (as case_trend)."""
+    label = TREND_FREQUENCIES[freq]
+    opened, resolved = _TREND_COLUMNS[freq]
+    bounds = _day_bounds(start, end)
+    counts = {}
+    for name, column, condition in (
+        ("Registered Cases", opened, ""),
+        ("Resolved Cases", resolved, "AND is_resolved"),
+    ):
+        # Day numbers are >= 0 here, so integer division floors like numpy
+        period = f"({column} + 3) / 7" if freq == "W" else column
+        rows = conn.execute(
+            f"""
+            SELECT {period} AS period, COUNT(*) FROM issues
+            WHERE is_first_case AND opening_day BETWEEN ? AND ?
+              AND {column} >= 0 {condition}
+            GROUP BY period
+            """,
+            bounds,
+        ).fetchall()
+        counts[name] = dict(rows)
+
+    periods = sorted(set(counts["Registered Cases"]) | set(counts["Resolved Cases"]))
+    return {
+        label: ordinal_starts(periods, freq).tolist(),
+        **{
+            name: [int(by_period.get(p, 0)) for p in periods]
+            for name, by_period in counts.items()
+        },
+    }
+
+
+def sql_top_mapped(conn, table, start, end, k=10, priority="Distress"):
+    """Most frequent mapped names among the period's cases of `priority`
+    (as top_mapped): distinct cases per name, ties by name."""
+    if table not in MAPPING_TABLES:
+        raise ValueError(f"Unknown mapping table {table!r}")
+    condition = "" if priority is None else "AND i.Priority = ?"
+    params = _day_bounds(start, end) + (() if priority is None else (priority,))
+    rows = conn.execute(
+        f"""
+        SELECT m.name, COUNT(DISTINCT i.case_id) AS n
+        FROM issues AS i JOIN {table} AS m ON m.case_id = i.case_id
+        WHERE i.opening_day BETWEEN ? AND ? {condition}
+        GROUP BY m.name ORDER BY n DESC, m.name LIMIT ?
+        """,
+        (*params, k),
+    ).fetchall()
+    return [(str(name), int(n)) for name, n in rows]
+
+
+def dashboard_metrics(
+    path,
+    start,
+    end,
+    prev_start=None,
+    prev_end=None,
+    today=None,
+    priority="Distress",
+    trend_freq="M",
+):
+    """compute_dashboard_metrics, answered by the database at `path`.
+
+    Results are kept in the shared VIEW_CACHE, keyed on the database file,
+    the bounds, `today` and the options, so treat them as read-only.
+    """
+    today = pd.Timestamp.today() if today is None else pd.Timestamp(today)
+    today = today.normalize()
+    key = (
+        "sql metrics",
+        database_key(path),
+        start,
+        end,
+        prev_start,
+        prev_end,
+        today,
+        priority,
+        trend_freq,
+    )
+    cached = VIEW_CACHE.get(key)
+    if cached is not None:
+        return cached
+
+    conn = connect(path)
+    try:
+        has_prev = prev_start is not None and prev_end is not None
+        metrics = {
+            "kpis": sql_kpis(conn, start, end),
+            "prev_kpis": sql_kpis(conn, prev_start, prev_end) if has_prev else None,
+            "aging": sql_aging(conn, start, end, today),
+            "priority": sql_priority_counts(conn, start, end),
+            "trend": sql_trend(conn, start, end, trend_freq),
+            "distress": sql_top_mapped(conn, "category", start, end, 10, priority),
+            "distress_departments": sql_top_mapped(
+                conn, "department", start, end, 10, priority
+            ),
+        }
+    finally:
+        conn.close()
+    return VIEW_CACHE.put(key, metrics)
+
+
+def _column_types(path, table):
+    conn = connect(path)
+    try:
+        rows = conn.execute(f"PRAGMA table_info({_quote(table)})").fetchall()
+    finally:
+        conn.close()
+    return {row[1]: row[2] for row in rows if row[1] not in HIDDEN_COLUMNS}
+
+
+def district_day_counts(path):
+    """metrics.district_day_counts, grouped by the database."""
+    district = "District" if "District" in table_columns(path, "issues") else "NULL"
+    conn = connect(path)
+    try:
+        counts = pd.read_sql_query(
+            f"""
+            SELECT COALESCE({district}, ?) AS District, opening_day AS date,
+                   COUNT(*), TOTAL(is_resolved), TOTAL(is_closed),
+                   TOTAL(is_pending),
+                   TOTAL(CASE WHEN is_resolved THEN resolution_days END),
+                   COUNT(CASE WHEN is_resolved THEN resolution_days END)
+            FROM issues WHERE is_first_case
+            GROUP BY 1, 2 ORDER BY 1, 2
+            """,
+            conn,
+            params=[DISTRICT_UNKNOWN],
+        )
+    finally:
+        conn.close()
+    counts.columns = ["District", "date", *DISTRICT_MEASURES]
+    counts["date"] = pd.to_datetime(counts["date"], unit="D")
+    return counts
+
+
+def district_cube(path):
+    """build_district_cube of the database, kept in VIEW_CACHE per file."""
+    return VIEW_CACHE.get_or_compute(
+        ("sql district cube", database_key(path)),
+        lambda: build_district_cube(district_day_counts(path)),
+    )
+
+
+def department_facts(path):
+    """build_department_facts of the database, kept in VIEW_CACHE per file.
+
+    Only the five columns the facts need are read, one row per case and
+    department.
+    """
+
+    def build():
+        conn = connect(path)
+        try:
+            rows = pd.read_sql_query(
+                """
+                SELECT d.name AS Department, i.opening_day AS date,
+                       i.resolution_hours, i.is_resolved, i.is_pending
+                FROM issues AS i JOIN department AS d ON d.case_id = i.case_id
+                WHERE i.is_first_case
+                """,
+                conn,
+            )
+        finally:
+            conn.close()
+        rows["date"] = pd.to_datetime(rows["date"], unit="D")
+        return build_department_facts(rows)
+
+    return VIEW_CACHE.get_or_compute(
+        ("sql department facts", database_key(path)), build
+    )
+
+
+def table_columns(path, table):
+    """Columns of `table` shown in the raw data view."""
+    return list(_column_types(path, table))
+
+
+def _where(columns, bounds, contains, isin):
+    clauses, params = [], []
+    if bounds is not None:
+        clauses.append("opening_day BETWEEN ? AND ?")
+        params.extend(_day_bounds(*bounds))
+    for col, text in (contains or {}).items():
+        if text:
+            if col not in columns:
+                raise ValueError(f"Unknown column {col!r}")
+            clauses.append(f"instr(lower({_quote(col)}), lower(?)) > 0")
+            params.append(text)
+    for col, values in (isin or {}).items():
+        if values:
+            if col not in columns:
+                raise ValueError(f"Unknown column {col!r}")
+            marks = ", ".join("?" * len(values))
+            clauses.append(f"{_quote(col)} IN ({marks})")
+            params.extend(str(v) for v in values)
+    return (" WHERE " + " AND ".join(clauses) if clauses else ""), params
+
+
+def count_rows(path, table, bounds=None):
+    """Number of rows of `table`, of the issues in [start, end] with `bounds`."""
+    where, params = _where([], bounds, None, None)
+    conn = connect(path)
+    try:
+        return conn.execute(
+            f"SELECT COUNT(*) FROM {_quote(table)}{where}", params
+        ).fetchone()[0]
+    finally:
+        conn.close()
+
+
+def query_page(
+    path,
+    table,
+    start,
+    stop,
+    columns=None,
+    sort_by=None,
+    ascending=True,
+    contains=None,
+    isin=None,
+    bounds=None,
+):
+    """query_table over a database table: rows `start:stop` after filtering
+    and sorting, and the number of matching rows.
+
+    `bounds` limits the issues table to opening dates in [start, end]. Rows
+    keep their stored order on ties and missing values sort last, as in
+    query_table.
+    """
+    types = _column_types(path, table)
+    known = list(types)
+    columns = known if columns is None else columns
+    unknown = [col for col in [*columns, sort_by] if col and col not in known]
+    if unknown:
+        raise ValueError(f"Unknown columns {unknown}")
+    where, params = _where(known, bounds, contains, isin)
+    order = "rowid"
+    if sort_by is not None:
+        direction = "ASC" if ascending else "DESC"
+        order = f"{_quote(sort_by)} IS NULL, {_quote(sort_by)} {direction}, rowid"
+    select = ", ".join(_quote(col) for col in columns) or "NULL"
+
+    conn = connect(path)
+    try:
+        total = conn.execute(
+            f"SELECT COUNT(*) FROM {_quote(table)}{where}", params
+        ).fetchone()[0]
+        page = pd.read_sql_query(
+            f"SELECT {select} FROM {_quote(table)}{where} "
+            f"ORDER BY {order} LIMIT ? OFFSET ?",
+            conn,
+            params=[*params, max(stop - start, 0), start],
+            parse_dates=[col for col in columns if col in DATE_COLUMNS],
+            # A page of only NULLs would otherwise come back as objects
+            dtype={col: "float64" for col in columns if types[col] == "REAL"},
+        )
+    finally:
+        conn.close()
+    for col in page.columns.intersection(BOOL_COLUMNS):
+        page[col] = page[col].astype(bool)
+    if not columns:
+        page = page.iloc[:, :0]
+    return page, int(total)
+
+
+def distinct_values(path, table, column):
+    """Sorted distinct non-null values of one column, for choice filters."""
+    if column not in table_columns(path, table):
+        raise ValueError(f"Unknown column {column!r}")
+    conn = connect(path)
+    try:
+        rows = conn.execute(
+            f"SELECT DISTINCT {_quote(column)} FROM {_quote(table)} "
+            f"WHERE {_quote(column)} IS NOT NULL ORDER BY 1"
+        ).fetchall()
+    finally:
+        conn.close()
+    return [value for value, in rows]
+
+
+def resolution_histograms(path):
+    """Resolution time histograms per priority and per category of the
+    database, as utilities.resolution_histograms, kept in VIEW_CACHE per
+    file. Only resolved first cases are read."""
+
+    def build():
+        conn = connect(path)
+        try:
+            families = {
+                "priority": pd.read_sql_query(
+                    """
+                    SELECT COALESCE(Priority, ?) AS Priority, opening_day AS date,
+                           MAX(resolution_hours, 0) AS resolution_hours
+                    FROM issues
+                    WHERE is_first_case AND is_resolved
+                      AND resolution_hours IS NOT NULL
+                    """,
+                    conn,
+                    params=[PRIORITY_UNKNOWN],
+                ),
+                "category": pd.read_sql_query(
+                    """
+                    SELECT c.name AS "Category Name", i.opening_day AS date,
+                           MAX(i.resolution_hours, 0) AS resolution_hours
+                    FROM issues AS i JOIN category AS c ON c.case_id = i.case_id
+                    WHERE i.is_first_case AND i.is_resolved
+                      AND i.resolution_hours IS NOT NULL
+                    """,
+                    conn,
+                ),
+            }
+        finally:
+            conn.close()
+        for rows in families.values():
+            rows["date"] = pd.to_datetime(rows["date"], unit="D")
+        return {
+            key: build_resolution_histograms(rows) for key, rows in families.items()
+        }
+
+    return VIEW_CACHE.get_or_compute(
+        ("sql resolution histograms", database_key(path)), build
+    )
@@ -0,0 +1,230 @@
+# synthetic_data.py
+"""Synthetic ERPNext exports shaped like the files in data/.
+
+Produces Issue, Issue_Category and Issue_Dept CSVs with the same columns,
+date formats, status/priority mix and missing-date rates as the real
+exports, at any number of cases, for benchmarking the loaders and metrics.
+
+    python synthetic_data.py --cases 1900000 --out /tmp/km_synthetic
+"""
+
+import argparse
+import os
+
+import numpy as np
+import pandas as pd
+
+# Shares observed in the 6 May 2025 exports
+CASE_PREFIXES = {"KM": 0.85, "VKB": 0.15}
+STATUS_SHARES = {
+    "Resolved": 0.58,
+    "Closed": 0.15,
+    "Open": 0.17,
+    "Replied": 0.05,
+    "On Hold": 0.05,
+}
+PRIORITY_SHARES = {"Medium": 0.40, "Low": 0.30, "High": 0.18, "Distress": 0.12}
+MISSING_OPENING_DATE_RATE = 0.01
+MISSING_RESOLUTION_RATE = 0.02
+MULTI_MAPPING_RATE = 0.02
+MEDIAN_RESOLUTION_HOURS = 120
+
+CATEGORY_NAMES = [
+    "Rythu Bandhu",
+    "Information",
+    "Kisan Samman",
+    "Crop Booking",
+    "Rythu Bharosa",
+    "Market Payment delay",
+    "Crop Loss",
+    "Market Issues",
+    "Land succession",
+    "Land Corrections",
+    "Crop Insurance",
+    "Pest attack",
+    "Farm Pond",
+    "Animal Issues",
+    "Agriculture Inputs",
+    "Category not assigned",
+]
+DISTRICT_NAMES = [
+    "Adilabad",
+    "Bhadradri Kothagudem",
+    "Hyderabad",
+    "Jagtial",
+    "Jangaon",
+    "Jayashankar Bhupalpally",
+    "Jogulamba Gadwal",
+    "Kamareddy",
+    "Karimnagar",
+    "Khammam",
+    "Kumuram Bheem Asifabad",
+    "Mahabubabad",
+    "Mahabubnagar",
+    "Mancherial",
+    "Medak",
+    "Medchal-Malkajgiri",
+    "Mulugu",
+    "Nagarkurnool",
+    "Nalgonda",
+    "Narayanpet",
+    "Nirmal",
+    "Nizamabad",
+    "Peddapalli",
+    "Rajanna Sircilla",
+    "Rangareddy",
+    "Sangareddy",
+    "Siddipet",
+    "Suryapet",
+    "Vikarabad",
+    "Wanaparthy",
+    "Warangal",
+    "Hanumakonda",
+    "Yadadri Bhuvanagiri",
+]
+MISSING_DISTRICT_RATE = 0.15
+DEPARTMENT_NAMES = [
+    "Agriculture - KM",
+    "Revenue",
+    "Horticulture",
+    "Marketing",
+    "Rural Development",
+    "Animal Husbandry",
+    "Banking",
+    "Department not mapped",
+]
+
+
+def _choice(rng, shares, n):
+    names = list(shares)
+    p = np.array([shares[name] for name in names])
+    return np.asarray(names, dtype=object)[rng.choice(len(names), n, p=p / p.sum())]
+
+
+def generate_issues(
+    n_cases, start="2018-05-01", end="2025-05-06", seed=0, first_case=1
+):
+    """Issue export rows as strings, in the ERPNext column formats."""
+    rng = np.random.default_rng(seed)
+    start = pd.Timestamp(start)
+    span_minutes = int((pd.Timestamp(end) - start) / pd.Timedelta(minutes=1))
+
+    prefixes = _choice(rng, CASE_PREFIXES, n_cases)
+    numbers = (
+        pd.Series(np.arange(first_case, first_case + n_cases)).astype(str).str.zfill(5)
+    )
+    case_no = pd.Series(prefixes).str.cat(numbers, sep="-")
+
+    opened = start + pd.to_timedelta(
+        np.sort(rng.integers(0, span_minutes, n_cases)), unit="min"
+    )
+    status = _choice(rng, STATUS_SHARES, n_cases)
+    priority = _choice(rng, PRIORITY_SHARES, n_cases)
+
+    # Resolution delay is long-tailed: lognormal around the median
+    delay_hours = rng.lognormal(np.log(MEDIAN_RESOLUTION_HOURS), 1.2, n_cases)
+    resolved_at = pd.Series(opened + pd.to_timedelta(delay_hours, unit="h"))
+    has_resolution = np.isin(status, ["Resolved", "Closed"])
+    has_resolution &= rng.random(n_cases) >= MISSING_RESOLUTION_RATE
+
+    opening_date = pd.Series(opened.strftime("%d-%m-%Y"))
+    opening_date[rng.random(n_cases) < MISSING_OPENING_DATE_RATE] = None
+
+    district = pd.Series(
+        np.asarray(DISTRICT_NAMES, dtype=object)[
+            rng.integers(0, len(DISTRICT_NAMES), n_cases)
+        ]
+    )
+    district[rng.random(n_cases) < MISSING_DISTRICT_RATE] = None
+
+    return pd.DataFrame(
+        {
+            "Case No": case_no,
+            "Opening Date": opening_date,
+            "Opening Date Time": opened.strftime("%d-%m-%Y %H:%M"),
+            "Resolution Date Time": resolved_at.dt.strftime("%d-%m-%Y %H:%M").where(
+                has_resolution
+            ),
+            "Status": status,
+            "Priority": priority,
+            "District": district,
+        }
+    )
+
+
+def generate_mapping(case_no, names, column, seed=0):
+    """Case to category/department mapping, a few cases mapped twice."""
+    rng = np.random.default_rng(seed)
+    # Zipf-like popularity so a handful of names dominate, as in the exports
+    weights = 1 / np.arange(1, len(names) + 1)
+    extra = case_no[rng.random(len(case_no)) < MULTI_MAPPING_RATE]
+    cases = pd.concat([case_no, extra], ignore_index=True)
+    picks = rng.choice(len(names), len(cases), p=weights / weights.sum())
+    return pd.DataFrame(
+        {"Case No": cases, column: np.asarray(names, dtype=object)[picks]}
+    )
+
+
+def write_dataset(
+    directory,
+    n_cases,
+    seed=0,
+    chunk_size=1_000_000,
+    start="2018-05-01",
+    end="2025-05-06",
+):
+    """Write Issue/Issue_Category/Issue_Dept CSVs for `n_cases` cases.
+
+    Rows are generated and appended in chunks of `chunk_size` cases so large
+    datasets never sit in memory at once. Returns the three paths.
+    """
+    os.makedirs(directory, exist_ok=True)
+    paths = {
+        "issue": os.path.join(directory, "Issue_synthetic.csv"),
+        "category": os.path.join(directory, "Issue_Category_synthetic.csv"),
+        "department": os.path.join(directory, "Issue_Dept_synthetic.csv"),
+    }
+    for path in paths.values():
+        if os.path.exists(path):
+            os.remove(path)
+
+    # Split the date span across chunks so every chunk stays sorted in time
+    n_chunks = max(1, -(-n_cases // chunk_size))
+    bounds = pd.date_range(start, end, periods=n_chunks + 1)
+
+    for i in range(n_chunks):
+        size = min(chunk_size, n_cases - i * chunk_size)
+        issues = generate_issues(
+            size,
+            bounds[i],
+            bounds[i + 1],
+            seed=seed + i,
+            first_case=i * chunk_size + 1,
+        )
+        mappings = {
+            "category": generate_mapping(
+                issues["Case No"], CATEGORY_NAMES, "Category Name", seed + i
+            ),
+            "department": generate_mapping(
+                issues["Case No"], DEPARTMENT_NAMES, "Department", seed + i + 1
+            ),
+        }
+        header = i == 0
+        issues.to_csv(
+            paths["issue"], mode="a", header=header, index=False, encoding="ISO-8859-1"
+        )
+        for key, mapping in mappings.items():
+            mapping.to_csv(
+                paths[key], mode="a", header=header, index=False, encoding="ISO-8859-1"
+            )
+    return paths
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--cases", type=int, default=190_000)
+    parser.add_argument("--out", default="synthetic_data")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    for key, path in write_dataset(args.out, args.cases, seed=args.seed).items():
+        print(f"{key}: {path}")
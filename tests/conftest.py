@@ -0,0 +1,39 @@
+import pytest
+
+from synthetic_data import write_dataset
+from utilities import (
+    DATE_CSV,
+    load_csv,
+    prepare_issue_data,
+    read_csv,
+    read_issue_csv,
+)
+
+# Small enough to keep the suite quick, large enough for every priority,
+# category and department to show up
+TEST_CASES = 3_000
+
+
+@pytest.fixture(scope="session")
+def dataset(tmp_path_factory):
+    return write_dataset(tmp_path_factory.mktemp("synthetic"), TEST_CASES, seed=1)
+
+
+@pytest.fixture(scope="session")
+def df_date():
+    return load_csv(DATE_CSV, parse_dates=["date"], date_format="%d-%m-%Y")
+
+
+@pytest.fixture(scope="session")
+def issues(dataset, df_date):
+    return prepare_issue_data(read_issue_csv(dataset["issue"]), df_date)[0]
+
+
+@pytest.fixture(scope="session")
+def categories(dataset):
+    return read_csv(dataset["category"])
+
+
+@pytest.fixture(scope="session")
+def departments(dataset):
+    return read_csv(dataset["department"])
@@ -0,0 +1,75 @@
+# Timed pipeline stages on the test dataset, run with pytest-benchmark:
+#
+#     pytest tests/test_bench_stages.py --benchmark-only
+#
+# benchmark.py times the same stages at larger scales.
+import pytest
+
+import metrics
+from utilities import prepare_issue_data, read_issue_csv
+
+pytest.importorskip("pytest_benchmark")
+
+
+@pytest.fixture(scope="module")
+def bounds(issues):
+    return issues["Opening Date"].min(), issues["Opening Date"].max()
+
+
+@pytest.fixture(scope="module")
+def rollup(issues, df_date, categories, departments):
+    return metrics.build_daily_rollup(issues, df_date, categories, departments)
+
+
+@pytest.fixture(scope="module")
+def category_index(categories):
+    return metrics.case_mapping_index(categories, "Category Name")
+
+
+def test_load(benchmark, dataset, df_date):
+    issues = benchmark(
+        lambda: prepare_issue_data(read_issue_csv(dataset["issue"]), df_date)[0]
+    )
+    assert len(issues)
+
+
+def test_rollup(benchmark, issues, df_date, categories, departments):
+    benchmark(metrics.build_daily_rollup, issues, df_date, categories, departments)
+
+
+def test_filter(benchmark, issues, bounds):
+    benchmark(metrics.slice_period, issues, *bounds)
+
+
+def test_kpis_rollup(benchmark, rollup, bounds):
+    benchmark(metrics.rollup_kpis, rollup, *bounds)
+
+
+def test_aging(benchmark, issues, bounds):
+    benchmark(metrics.aging_summary, issues, bounds[1])
+
+
+def test_monthly_trend(benchmark, issues):
+    benchmark(metrics.monthly_trend, issues)
+
+
+def test_distress_index(benchmark, issues, category_index):
+    benchmark(metrics.top_mapped, category_index, issues)
+
+
+def test_district_summary(benchmark, issues, bounds):
+    cube = metrics.build_district_cube(metrics.district_day_counts(issues))
+    benchmark(metrics.district_summary, cube, *bounds, bounds[1])
+
+
+def test_department_summary(benchmark, issues, departments, bounds):
+    index = metrics.case_mapping_index(departments, "Department")
+    facts = metrics.build_department_facts(metrics.department_case_rows(issues, index))
+    benchmark(metrics.department_summary, facts, *bounds, bounds[1])
+
+
+@pytest.mark.parametrize("exact", [False, True])
+def test_resolution_percentiles(benchmark, issues, category_index, bounds, exact):
+    rows = metrics.resolution_case_rows(issues, category_index, "Category Name")
+    histograms = metrics.build_resolution_histograms(rows)
+    benchmark(metrics.resolution_percentiles, histograms, *bounds, exact=exact)
@@ -0,0 +1,17 @@
+import benchmark
+
+
+def test_run_benchmarks_creates_its_workdir(tmp_path):
+    workdir = tmp_path / "missing" / "dir"
+    report = benchmark.run_benchmarks([0.05], repeat=1, workdir=str(workdir))
+    assert workdir.is_dir()
+    steps = {run["step"] for run in report["results"]}
+    assert {"load", "rollup", "kpis_rollup", "percentiles_hist"} <= steps
+    assert all(run["best_s"] >= 0 for run in report["results"])
+
+
+def test_compare_flags_regressions():
+    baseline = {"results": [{"scale": 1, "step": "load", "best_s": 1.0}]}
+    report = {"results": [{"scale": 1, "step": "load", "best_s": 1.5}]}
+    assert benchmark.compare(report, baseline, threshold=0.2) == [(1, "load")]
+    assert benchmark.compare(baseline, baseline, threshold=0.2) == []
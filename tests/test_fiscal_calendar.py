@@ -0,0 +1,77 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from fiscal_calendar import (
+    COMPARISON_LABELS,
+    calendar_ordinals,
+    indian_financial_quarter,
+    indian_financial_year,
+    ordinal_starts,
+    period_windows,
+)
+from utilities import prepare_issue_data
+
+DATES = pd.date_range("2023-12-25", "2025-04-10")
+
+
+def test_financial_quarter_and_year_match_scalar_dates():
+    quarters = indian_financial_quarter(DATES)
+    years = indian_financial_year(DATES)
+    for date, quarter, year in zip(DATES, quarters, years):
+        assert quarter == indian_financial_quarter(date)
+        assert year == indian_financial_year(date)
+    assert indian_financial_quarter(pd.Timestamp("2025-04-01")) == 1
+    assert indian_financial_quarter(pd.Timestamp("2025-03-31")) == 4
+    assert indian_financial_year(pd.Timestamp("2025-03-31")) == 2025
+    assert indian_financial_year(pd.Timestamp("2025-04-01")) == 2026
+
+
+def test_financial_year_matches_dim_date(df_date):
+    assert (indian_financial_year(df_date["date"].dt) == df_date["fiscal_year"]).all()
+
+
+@pytest.mark.parametrize("scenario", list(COMPARISON_LABELS))
+def test_period_windows_match_one_date_at_a_time(scenario):
+    windows = period_windows(DATES, scenario)
+    for as_of in DATES[::17]:
+        assert windows.loc[as_of].equals(period_windows([as_of], scenario).iloc[0])
+    assert (windows["current_start"] <= windows["current_end"]).all()
+    assert (windows["prev_end"] < windows["current_start"]).all()
+
+
+def test_period_windows_cap_the_previous_month():
+    window = period_windows(["2024-03-31"], "This Month").iloc[0]
+    assert window["prev_start"] == pd.Timestamp("2024-02-01")
+    assert window["prev_end"] == pd.Timestamp("2024-02-29")
+
+
+def test_period_windows_use_financial_quarters():
+    window = period_windows(["2025-02-10"], "This Quarter").iloc[0]
+    assert window["current_start"] == pd.Timestamp("2025-01-01")
+    assert window["prev_start"] == pd.Timestamp("2024-10-01")
+    assert window["prev_end"] == pd.Timestamp("2024-12-31")
+
+
+def test_period_windows_year_to_date_is_one_day_shorter_last_year():
+    window = period_windows(["2025-03-01"], "This Year").iloc[0]
+    assert window["prev_start"] == pd.Timestamp("2024-01-01")
+    assert window["prev_end"] == pd.Timestamp("2024-02-28")
+
+
+@pytest.mark.parametrize("freq", ["M", "W", "D"])
+def test_calendar_ordinals_round_trip(freq):
+    ordinals = calendar_ordinals(DATES, freq)
+    starts = ordinal_starts(ordinals, freq)
+    assert (starts <= DATES).all()
+    assert (np.diff(np.unique(ordinals)) == 1).all()
+    assert calendar_ordinals([np.datetime64("NaT")], freq)[0] == -1
+
+
+def test_fiscal_year_beyond_dim_date(issues, df_date):
+    raw = issues.head(3).copy()
+    raw["Opening Date"] = df_date["date"].max() + pd.Timedelta(days=120)
+    raw["Opening Date Time"] = raw["Opening Date"]
+    prepared = prepare_issue_data(raw, df_date)[0]
+    expected = indian_financial_year(prepared["Opening Date"].dt)
+    assert (prepared["fiscal_year"] == expected).all()
@@ -0,0 +1,81 @@
+import os
+import shutil
+import subprocess
+import sys
+import textwrap
+
+import pytest
+
+from synthetic_data import write_dataset
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Rendered in a fresh interpreter: the exports directory and the worker count
+# are read when utilities is imported. Given two dates, the page is rerun
+# with that Custom range
+RENDER_PAGE = textwrap.dedent("""
+    import datetime
+    import sys
+
+    from streamlit.testing.v1 import AppTest
+
+    import utilities
+
+    utilities.CACHE_DIR = sys.argv[1]
+    at = AppTest.from_file("home.py", default_timeout=120)
+    at.run()
+    if len(sys.argv) > 2:
+        at.selectbox(key="time_period_selector").select("Custom").run()
+        dates = [datetime.date.fromisoformat(d) for d in sys.argv[2:]]
+        at.date_input(key="custom_date_picker").set_value(dates).run()
+    for info in at.info:
+        print(info.value)
+    for exception in at.exception:
+        print(exception.value)
+    sys.exit(1 if at.exception else 0)
+    """)
+
+MONTHS = ["2025-02", "2025-03", "2025-04"]
+
+
+@pytest.fixture
+def exports(tmp_path):
+    for i, month in enumerate(MONTHS):
+        write_dataset(
+            tmp_path / "exports" / "state=Telangana" / f"month={month}",
+            200,
+            seed=i,
+            start=f"{month}-01",
+            end=f"{month}-28",
+        )
+    return tmp_path
+
+
+def render(exports, *custom):
+    pytest.importorskip("streamlit.testing.v1")
+    env = dict(
+        os.environ,
+        KM_EXPORTS_DIR=str(exports / "exports"),
+        KM_LOAD_WORKERS="2",
+        PYTHONPATH=ROOT,
+    )
+    return subprocess.run(
+        [sys.executable, "-c", RENDER_PAGE, str(exports / "cache"), *custom],
+        cwd=ROOT,
+        env=env,
+        capture_output=True,
+        text=True,
+        timeout=300,
+    )
+
+
+def test_page_renders_partitions_with_several_workers(exports):
+    result = render(exports)
+    assert result.returncode == 0, result.stdout + result.stderr
+
+
+def test_custom_range_without_exports_shows_a_notice(exports):
+    shutil.rmtree(exports / "exports" / "state=Telangana" / "month=2025-03")
+    result = render(exports, "2025-03-05", "2025-03-20")
+    assert result.returncode == 0, result.stdout + result.stderr
+    assert "No data was exported for the selected period." in result.stdout
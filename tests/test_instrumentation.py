@@ -0,0 +1,58 @@
+import threading
+import tracemalloc
+
+import pytest
+
+import instrumentation
+from instrumentation import finish_trace, stage, start_trace
+
+
+@pytest.fixture(autouse=True)
+def no_trace_file(monkeypatch):
+    monkeypatch.delenv(instrumentation.PROFILE_TRACE_ENV, raising=False)
+    yield
+    finish_trace()
+
+
+def run_page(fail):
+    # The try/finally of home.py around a rerun that may be cut short
+    start_trace(True)
+    try:
+        with stage("load data"):
+            if fail:
+                raise RuntimeError("rerun interrupted")
+        return finish_trace(scenario="All Time")
+    finally:
+        finish_trace(interrupted=True)
+
+
+def test_finished_rerun_records_its_stages():
+    trace = run_page(fail=False)
+    assert trace["scenario"] == "All Time"
+    assert [s["stage"] for s in trace["stages"]] == ["load data"]
+    assert not tracemalloc.is_tracing()
+
+
+def test_interrupted_rerun_stops_tracemalloc():
+    with pytest.raises(RuntimeError):
+        run_page(fail=True)
+    assert instrumentation._tracing_sessions == 0
+    assert not tracemalloc.is_tracing()
+
+
+def test_unfinished_trace_is_released_by_the_next_start():
+    start_trace(True)
+    start_trace(True)
+    assert instrumentation._tracing_sessions == 1
+    finish_trace()
+    assert not tracemalloc.is_tracing()
+
+
+def test_sessions_share_tracemalloc():
+    start_trace(True)
+    other = threading.Thread(target=run_page, args=(False,))
+    other.start()
+    other.join()
+    assert tracemalloc.is_tracing()
+    finish_trace()
+    assert not tracemalloc.is_tracing()
@@ -0,0 +1,149 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import utilities
+from metrics import build_daily_rollup
+from synthetic_data import (
+    CATEGORY_NAMES,
+    DEPARTMENT_NAMES,
+    generate_issues,
+    generate_mapping,
+)
+
+SEED_CASES = 1_000
+NEW_CASES = 100
+
+
+def write_csv(df, path):
+    df.to_csv(path, index=False, encoding="ISO-8859-1")
+    return str(path)
+
+
+def next_export(previous, rng, first_case):
+    """`previous` with some cases updated, a few new ones and a Case No that
+    appears twice (the last row is the current one)."""
+    export = previous.copy()
+    updated = rng.choice(len(export), 60, replace=False)
+    export.loc[updated[:20], "Status"] = "Resolved"
+    export.loc[updated[:20], "Resolution Date Time"] = "01-05-2025 10:00"
+    export.loc[updated[20:40], "Priority"] = "Distress"
+    export.loc[updated[40:], "Opening Date"] = "02-01-2024"
+    new = generate_issues(NEW_CASES, seed=first_case, first_case=first_case)
+    stale = export[export["Case No"].notna()].iloc[[5]].assign(Status="Open")
+    return pd.concat([stale, export, new], ignore_index=True)
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    rng = np.random.default_rng(0)
+    seed = generate_issues(SEED_CASES, seed=0)
+    # An earlier version of a case, and rows that have no Case No
+    seed = pd.concat(
+        [seed.iloc[[3]].assign(Priority="Low", Status="Open"), seed],
+        ignore_index=True,
+    )
+    seed.loc[[10, 11, 12], "Case No"] = None
+
+    exports = []
+    previous = seed
+    for i in range(3):
+        previous = next_export(previous, rng, SEED_CASES + 1 + i * NEW_CASES)
+        exports.append(write_csv(previous, tmp_path / f"Issue_{i}.csv"))
+
+    cases = pd.concat([seed, previous])["Case No"].dropna().drop_duplicates()
+    mappings = {
+        "CATEGORY_CSV": generate_mapping(cases, CATEGORY_NAMES, "Category Name"),
+        "DEPT_CSV": generate_mapping(cases, DEPARTMENT_NAMES, "Department", 1),
+    }
+    for name, mapping in mappings.items():
+        monkeypatch.setattr(
+            utilities, name, write_csv(mapping, tmp_path / f"{name}.csv")
+        )
+    monkeypatch.setattr(utilities, "ISSUE_CSV", write_csv(seed, tmp_path / "Issue.csv"))
+    monkeypatch.setattr(utilities, "CACHE_DIR", str(tmp_path / "cache"))
+    monkeypatch.setattr(utilities, "ISSUE_STORE_DIR", str(tmp_path / "store"))
+    monkeypatch.setattr(utilities, "ISSUE_STORE_MAX_PARTS", 3)
+    utilities.read_category_data.clear()
+    utilities.read_department_data.clear()
+    yield exports
+    utilities.read_category_data.clear()
+    utilities.read_department_data.clear()
+
+
+def normalized(rollup):
+    counts = [c for c in rollup["daily"].columns if c not in ("season", "fiscal_year")]
+    frames = {
+        "daily": rollup["daily"][counts],
+        "priority": rollup["priority"].astype("int64"),
+    }
+    for key in ("category", "department"):
+        frame = rollup[key].astype({col: object for col in rollup[key].columns[1:3]})
+        frame = frame[frame["cases"] != 0].sort_values(list(frame.columns[:3]))
+        frames[key] = frame.reset_index(drop=True)
+    return frames
+
+
+def assert_same_rollup(incremental, rebuilt):
+    incremental, rebuilt = normalized(incremental), normalized(rebuilt)
+    for key in ("daily", "priority"):
+        index = incremental[key].index.union(rebuilt[key].index)
+        columns = incremental[key].columns.union(rebuilt[key].columns)
+        a = incremental[key].reindex(index=index, columns=columns, fill_value=0)
+        b = rebuilt[key].reindex(index=index, columns=columns, fill_value=0)
+        # Counts never go negative (a sum of resolution days can)
+        assert (a.drop(columns="resolution_days_sum", errors="ignore") >= 0).all(None)
+        pd.testing.assert_frame_equal(a, b, check_dtype=False, check_names=False)
+    for key in ("category", "department"):
+        assert (incremental[key]["cases"] > 0).all(), key
+        pd.testing.assert_frame_equal(
+            incremental[key], rebuilt[key], check_dtype=False, check_categorical=False
+        )
+
+
+def test_incremental_rollup_matches_a_full_rebuild(store):
+    df_date = utilities.read_date_data()
+    for path in store:
+        assert utilities.ingest_issue_export(path) > 0
+        issues = utilities.prepare_issue_data(utilities.load_issue_frame(), df_date)[0]
+        rebuilt = build_daily_rollup(
+            issues,
+            df_date,
+            utilities.read_category_data(),
+            utilities.read_department_data(),
+        )
+        assert_same_rollup(utilities.read_store_rollup(), rebuilt)
+    # Three exports with a limit of three parts: the store was compacted
+    assert len(utilities.read_store_manifest()["parts"]) < 4
+
+
+def test_store_keeps_the_last_row_of_a_case_and_every_row_without_one(store):
+    utilities.ingest_issue_export(store[0])
+    rows = utilities.load_issue_frame()
+    assert rows["Case No"].isna().sum() == 3
+    assert not rows["Case No"].dropna().duplicated().any()
+    assert rows.loc[rows["Case No"] == "KM-00004", "Status"].tolist() != ["Open"]
+
+
+@pytest.mark.parametrize("latest", [False, True])
+def test_streamed_rollup_matches_the_whole_table(store, tmp_path, latest):
+    df_date = utilities.read_date_data()
+    mappings = utilities.read_category_data(), utilities.read_department_data()
+    seed = pd.read_csv(utilities.ISSUE_CSV, encoding="ISO-8859-1")
+    # Later versions of cases, chunks away from the first, one opened earlier
+    again = seed.iloc[[20, 500]].assign(Status="Open")
+    again.iloc[0, again.columns.get_loc("Opening Date")] = "01-01-2023"
+    path = write_csv(pd.concat([seed, again], ignore_index=True), tmp_path / "i.csv")
+    raw = utilities.read_issue_csv(path)
+    if latest:
+        raw = utilities._latest_cases(raw)
+    issues, null_opening, null_resolution = utilities.prepare_issue_data(raw, df_date)
+    out_path = str(tmp_path / "rows.parquet")
+    rollup, counts = utilities.stream_issue_rollup(
+        path, df_date, *mappings, out_path, latest, chunk_rows=97
+    )
+    assert_same_rollup(rollup, build_daily_rollup(issues, df_date, *mappings))
+    assert counts["rows"] == len(raw) == len(pd.read_parquet(out_path))
+    assert counts["null_opening_dates"] == null_opening
+    assert counts["null_resolution_dates"] == null_resolution
+    assert counts["true_max_date"] == str(raw.attrs["true_max_date"])
@@ -0,0 +1,56 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import metrics
+
+
+@pytest.fixture
+def stamped(issues, categories):
+    issues, categories = issues.copy(), categories.copy()
+    issues.attrs["data_version"] = "test-issues"
+    categories.attrs["data_version"] = "test-categories"
+    return issues, categories
+
+
+def test_dataset_key_requires_a_data_version():
+    with pytest.raises(ValueError):
+        metrics.dataset_key(pd.DataFrame({"Case No": ["KM-1"]}))
+
+
+def test_dashboard_metrics_are_shared_between_copies(stamped):
+    issues, categories = stamped
+    start, end = issues["Opening Date"].min(), issues["Opening Date"].max()
+    first = metrics.compute_dashboard_metrics(issues, categories, start, end)
+    # st.cache_data hands out a fresh copy on every rerun
+    again = metrics.compute_dashboard_metrics(issues.copy(), categories, start, end)
+    assert again is first
+    assert first["kpis"]["total_cases"] == issues["Case No"].nunique()
+
+
+def test_department_percentiles_are_nearest_rank_of_the_resolution_rows(
+    issues, departments
+):
+    index = metrics.case_mapping_index(departments, "Department")
+    facts = metrics.build_department_facts(metrics.department_case_rows(issues, index))
+    rows = metrics.resolution_case_rows(issues, index, "Department")
+    expected = metrics.build_resolution_histograms(rows)
+    for key in ("names", "prefix", "day", "group", "hours"):
+        np.testing.assert_array_equal(facts["histograms"][key], expected[key])
+
+    today = issues["Opening Date"].max()
+    for start, end in [
+        (issues["Opening Date"].min(), today),
+        (today - pd.Timedelta(days=90), today),
+    ]:
+        summary = metrics.department_summary(facts, start, end, today)
+        window = rows[rows["date"].between(start, end)]
+        for name, hours in window.groupby("Department")["resolution_hours"]:
+            exact = np.percentile(hours, metrics.SLA_PERCENTILES, method="inverted_cdf")
+            assert summary.at[name, "Resolved"] == len(hours)
+            np.testing.assert_array_equal(
+                summary.loc[
+                    name, [f"P{q} (days)" for q in metrics.SLA_PERCENTILES]
+                ].to_numpy(float),
+                np.round(exact / 24, 1),
+            )
@@ -0,0 +1,116 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import metrics
+from benchmark import percentile_bound_ratio
+
+# Windows drawn at random over the data, on top of everything and single days
+WINDOWS = 60
+
+# The bins are built a fifth tighter than RESOLUTION_ACCURACY
+MARGIN = 0.8
+
+
+@pytest.fixture(scope="module", params=["priority", "category"])
+def family(request, issues, categories):
+    if request.param == "priority":
+        rows = metrics.resolution_case_rows(issues)
+    else:
+        index = metrics.case_mapping_index(categories, "Category Name")
+        rows = metrics.resolution_case_rows(issues, index, "Category Name")
+    return rows, metrics.build_resolution_histograms(rows)
+
+
+@pytest.fixture(scope="module")
+def windows(issues):
+    first, last = issues["Opening Date"].min(), issues["Opening Date"].max()
+    rng = np.random.default_rng(0)
+    offsets = np.sort(rng.integers(0, (last - first).days + 1, (WINDOWS, 2)), axis=1)
+    days = [(first + pd.Timedelta(days=int(a)),) * 2 for a in offsets[:5, 0]]
+    return [(first, last), *days] + [
+        (first + pd.Timedelta(days=int(a)), first + pd.Timedelta(days=int(b)))
+        for a, b in offsets
+    ]
+
+
+def exact_by_group(rows, histograms, start, end):
+    label = rows.columns[0]
+    window = rows[rows["date"].between(start, end)]
+    codes = histograms["names"].searchsorted(window[label].to_numpy(dtype=str))
+    return {
+        code: np.percentile(
+            hours, metrics.RESOLUTION_PERCENTILES, method="inverted_cdf"
+        )
+        for code, hours in window.groupby(codes)["resolution_hours"]
+    }
+
+
+def test_bins_stay_within_the_bound_with_margin():
+    edges = metrics._FLOOR_HOURS * metrics._GAMMA ** np.arange(
+        metrics.RESOLUTION_BINS - 1
+    )
+    hours = np.concatenate([[0, 0.1], edges, edges * (1 + 1e-9), edges * 0.999])
+    hours = hours[hours <= metrics.RESOLUTION_MAX_HOURS]
+    reported = metrics.RESOLUTION_BIN_HOURS[metrics.resolution_bins(hours)]
+    ratio = np.abs(reported - hours) / metrics.resolution_error_bound(hours)
+    assert ratio.max() <= MARGIN + 1e-6
+
+
+def test_error_bound_is_relative_from_an_hour():
+    bound = metrics.resolution_error_bound([0, 0.99, 1, 10, 100])
+    np.testing.assert_allclose(bound, [0.5, 0.5, 0.025, 0.25, 2.5])
+
+
+def test_histogram_percentiles_within_the_bound(family, windows):
+    rows, histograms = family
+    for start, end in windows:
+        hist = metrics.window_histograms(histograms, start, end)
+        approx = metrics.histogram_percentiles(hist)
+        exact = exact_by_group(rows, histograms, start, end)
+        assert set(np.flatnonzero(hist.sum(axis=1))) == set(exact)
+        for code, values in exact.items():
+            bound = metrics.resolution_error_bound(values)
+            ratio = np.abs(approx[code] - values) / bound
+            assert ratio.max() <= MARGIN + 1e-6, (start, end, code)
+
+
+def test_benchmark_bound_ratio_has_margin(family, windows):
+    rows, histograms = family
+    assert 0 < percentile_bound_ratio(rows, histograms, windows) <= MARGIN + 1e-6
+
+
+def test_window_histograms_count_the_cases_of_the_window(family, windows):
+    rows, histograms = family
+    label = rows.columns[0]
+    for start, end in windows:
+        window = rows[rows["date"].between(start, end)]
+        counts = metrics.window_histograms(histograms, start, end).sum(axis=1)
+        expected = window[label].value_counts()
+        assert dict(zip(histograms["names"], counts)) == {
+            name: expected.get(name, 0) for name in histograms["names"]
+        }
+
+
+def test_exact_mode_matches_numpy(family, windows):
+    rows, histograms = family
+    total = "All cases" if rows.columns[0] == "Priority" else None
+    for start, end in windows:
+        summary = metrics.resolution_percentiles(
+            histograms, start, end, exact=True, total=total
+        )
+        assert summary.attrs["exact"]
+        exact = exact_by_group(rows, histograms, start, end)
+        expected = {histograms["names"][code]: v for code, v in exact.items()}
+        if total is not None:
+            window = rows[rows["date"].between(start, end)]["resolution_hours"]
+            if len(window):
+                expected[total] = np.percentile(
+                    window, metrics.RESOLUTION_PERCENTILES, method="inverted_cdf"
+                )
+        assert set(summary.index) == set(expected)
+        for name, values in expected.items():
+            np.testing.assert_array_equal(
+                summary.loc[name].iloc[1:].to_numpy(float),
+                np.round(values / 24, 1),
+            )
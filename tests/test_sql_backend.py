@@ -0,0 +1,180 @@
+import json
+import os
+import time
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import metrics
+import sql_backend
+import utilities
+
+WINDOWS = 20
+
+# Page requests as the raw data view makes them: (start, stop, columns,
+# sort_by, ascending, contains, isin)
+PAGES = [
+    (0, 25, None, None, True, None, None),
+    (
+        100,
+        125,
+        ["Case No", "Status", "resolution_days"],
+        "resolution_days",
+        False,
+        None,
+        None,
+    ),
+    (
+        0,
+        50,
+        None,
+        "Resolution Date Time",
+        True,
+        {"Case No": "km-1"},
+        {"Status": ["Open", "Closed"]},
+    ),
+    (
+        5,
+        30,
+        ["Case No", "Priority"],
+        "Priority",
+        False,
+        None,
+        {"Priority": ["Distress"]},
+    ),
+]
+
+
+@pytest.fixture(scope="module")
+def stamped(issues, categories, departments):
+    issues, categories = issues.copy(), categories.copy()
+    issues.attrs["data_version"] = "sql-test-issues"
+    categories.attrs["data_version"] = "sql-test-categories"
+    return issues, categories, departments
+
+
+@pytest.fixture(scope="module")
+def database(stamped, tmp_path_factory):
+    issues, categories, departments = stamped
+    path = str(tmp_path_factory.mktemp("sql") / "issues.sqlite")
+    sql_backend.build_database(
+        path, issues, {"category": categories, "department": departments}
+    )
+    return path
+
+
+@pytest.fixture(scope="module")
+def windows(issues):
+    first, last = issues["Opening Date"].min(), issues["Opening Date"].max()
+    standard = [
+        utilities.standard_period(scenario, last, first)[:4]
+        for scenario in utilities.STANDARD_SCENARIOS
+    ]
+    rng = np.random.default_rng(1)
+    dates = pd.date_range(first.normalize(), last)
+    random = [
+        (dates[a], dates[b], None, None)
+        for a, b in np.sort(rng.integers(0, len(dates), (WINDOWS, 2)), axis=1)
+    ]
+    return standard + random
+
+
+def shown(page):
+    # As the raw table shows it: missing values of any dtype alike
+    return page.astype(object).where(page.notna(), None).astype(str)
+
+
+def as_json(result):
+    return json.dumps(metrics.metrics_to_json(result), sort_keys=True, default=str)
+
+
+@pytest.mark.parametrize("trend_freq", ["M", "W", "D"])
+def test_sql_metrics_match_the_frames(stamped, df_date, database, windows, trend_freq):
+    issues, categories, departments = stamped
+    rollup = metrics.build_daily_rollup(issues, df_date, categories, departments)
+    mappings = {
+        "category": metrics.case_mapping_index(categories, "Category Name"),
+        "department": metrics.case_mapping_index(departments, "Department"),
+    }
+    today = issues["Opening Date"].max()
+    for bounds in windows:
+        expected = metrics.compute_dashboard_metrics(
+            issues,
+            categories,
+            *bounds,
+            rollup=rollup,
+            today=today,
+            mappings=mappings,
+            trend_freq=trend_freq,
+        )
+        result = sql_backend.dashboard_metrics(
+            database, *bounds, today=today, trend_freq=trend_freq
+        )
+        assert as_json(result) == as_json(expected), bounds
+
+
+@pytest.mark.parametrize("page", PAGES)
+def test_query_page_matches_query_table(issues, database, windows, page):
+    start, end = windows[2][:2]
+    expected, expected_total = utilities.query_table(
+        metrics.slice_period(issues, start, end), *page
+    )
+    result, total = sql_backend.query_page(
+        database, "issues", *page, bounds=(start, end)
+    )
+    assert total == expected_total
+    columns = [col for col in expected.columns if col != "Case ID"]
+    pd.testing.assert_frame_equal(
+        shown(result[columns].reset_index(drop=True)),
+        shown(expected[columns].reset_index(drop=True)),
+    )
+
+
+@pytest.fixture
+def stale_database(tmp_path, monkeypatch, database):
+    path = str(tmp_path / "issues.sqlite")
+    with open(database, "rb") as src, open(path, "wb") as dst:
+        dst.write(src.read())
+    # The copy has no stamp, so it reads as built from other data
+    monkeypatch.setattr(utilities, "database_stamp", lambda: {"data_version": "new"})
+    return path
+
+
+def test_database_being_rebuilt_elsewhere_is_served_as_it_is(
+    stale_database, monkeypatch
+):
+    def write_database(path):
+        raise AssertionError("only the lock holder rebuilds")
+
+    monkeypatch.setattr(utilities, "write_database", write_database)
+    open(f"{stale_database}.lock", "w").close()
+    meta = utilities.current_database(stale_database)
+    assert meta["stale"]
+    assert os.path.exists(f"{stale_database}.lock")
+
+
+def test_database_rebuild_takes_and_releases_the_lock(stale_database, monkeypatch):
+    built = []
+
+    def write_database(path):
+        assert os.path.exists(f"{path}.lock")
+        built.append(path)
+        return {"data_version": "new"}
+
+    monkeypatch.setattr(utilities, "write_database", write_database)
+    assert utilities.current_database(stale_database) == {"data_version": "new"}
+    assert built == [stale_database]
+    assert not os.path.exists(f"{stale_database}.lock")
+
+
+def test_lock_left_by_a_dead_builder_is_taken_over(stale_database, monkeypatch):
+    monkeypatch.setattr(
+        utilities, "write_database", lambda path: {"data_version": "new"}
+    )
+    lock = f"{stale_database}.lock"
+    open(lock, "w").close()
+    old = time.time() - utilities.DATABASE_BUILD_TIMEOUT - 1
+    os.utime(lock, (old, old))
+    assert utilities.current_database(stale_database) == {"data_version": "new"}
+    assert not os.path.exists(lock)
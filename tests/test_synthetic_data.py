@@ -0,0 +1,44 @@
+import pandas as pd
+
+from synthetic_data import (
+    CATEGORY_NAMES,
+    DEPARTMENT_NAMES,
+    PRIORITY_SHARES,
+    generate_issues,
+    write_dataset,
+)
+from utilities import read_csv, read_issue_csv
+
+
+def test_generate_issues_is_seeded_and_sorted():
+    issues = generate_issues(500, seed=3)
+    assert len(issues) == 500
+    assert issues["Case No"].is_unique
+    assert issues.equals(generate_issues(500, seed=3))
+    opened = pd.to_datetime(issues["Opening Date Time"], format="%d-%m-%Y %H:%M")
+    assert opened.is_monotonic_increasing
+    assert set(issues["Priority"]) <= set(PRIORITY_SHARES)
+
+
+def test_generate_issues_resolution_follows_opening():
+    issues = generate_issues(500, seed=3)
+    opened = pd.to_datetime(issues["Opening Date Time"], format="%d-%m-%Y %H:%M")
+    resolved = pd.to_datetime(issues["Resolution Date Time"], format="%d-%m-%Y %H:%M")
+    assert (resolved.dropna() >= opened[resolved.notna()]).all()
+    assert resolved.isna().any() and issues["Opening Date"].isna().any()
+
+
+def test_write_dataset_in_chunks(tmp_path):
+    paths = write_dataset(tmp_path / "new", 1_000, seed=2, chunk_size=300)
+    issues = read_issue_csv(paths["issue"])
+    assert len(issues) == 1_000
+    assert issues["Case No"].is_unique
+    categories = read_csv(paths["category"])
+    departments = read_csv(paths["department"])
+    assert set(issues["Case No"]) == set(categories["Case No"])
+    assert set(categories["Category Name"]) <= set(CATEGORY_NAMES)
+    assert set(departments["Department"]) <= set(DEPARTMENT_NAMES)
+
+    # Rewriting replaces the files instead of appending to them
+    write_dataset(tmp_path / "new", 200, seed=2)
+    assert len(read_issue_csv(paths["issue"])) == 200
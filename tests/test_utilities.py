@@ -0,0 +1,82 @@
+import pandas as pd
+import pytest
+
+import utilities
+from synthetic_data import write_dataset
+from utilities import apply_schema, memory_report
+
+
+def test_memory_report_compares_object_and_compact_columns(categories):
+    report = memory_report({"Category mapping": categories})
+    row = report.iloc[0]
+    assert row["Frame"] == "Category mapping"
+    assert row["Rows"] == len(categories)
+    assert row["After (MB)"] < row["Before (MB)"]
+    assert 0 < row["Reduction (%)"] < 100
+
+
+def test_memory_report_before_figure_ignores_the_schema():
+    raw = pd.DataFrame({"Case No": ["KM-1", "KM-2"], "Priority": ["Low", "High"]})
+    before = memory_report({"raw": raw.copy()})["Before (MB)"].iloc[0]
+    compact = memory_report({"compact": apply_schema(raw)})["Before (MB)"].iloc[0]
+    assert before == compact
+
+
+def test_failed_stream_write_leaves_no_temp_file(tmp_path, monkeypatch):
+    csv_path = tmp_path / "Issue.csv"
+    csv_path.write_text("Case No\nKM-1\n")
+    cache_dir = tmp_path / "cache"
+    monkeypatch.setattr(utilities, "CACHE_DIR", str(cache_dir))
+    monkeypatch.setattr(utilities, "STREAMING_MIN_BYTES", 0)
+
+    def streamer(path, out_path):
+        with open(out_path, "w") as f:
+            f.write("partial")
+        raise ValueError("bad chunk")
+
+    with pytest.raises(ValueError):
+        utilities._load_columnar(str(csv_path), pd.read_csv, streamer)
+    assert list(cache_dir.iterdir()) == []
+
+
+def test_partition_date_range_skips_months_without_dates(tmp_path, monkeypatch):
+    monkeypatch.setattr(utilities, "CACHE_DIR", str(tmp_path / "cache"))
+    months = ["2025-02", "2025-03", "2025-04", "2025-05"]
+    for i, month in enumerate(months):
+        write_dataset(
+            tmp_path / "exports" / "state=Telangana" / f"month={month}",
+            50,
+            seed=i,
+            start=f"{month}-01",
+            end=f"{month}-28",
+        )
+    # The first and last months have no parseable Opening Date
+    for month in (months[0], months[-1]):
+        path = tmp_path / "exports" / "state=Telangana" / f"month={month}"
+        path = path / "Issue_synthetic.csv"
+        raw = pd.read_csv(path, encoding="ISO-8859-1", dtype=str)
+        raw["Opening Date"] = None
+        raw.to_csv(path, index=False, encoding="ISO-8859-1")
+
+    partitions = utilities.discover_partitions(str(tmp_path / "exports"))
+    start, end = utilities.read_partition_date_range(partitions)
+    issues = [
+        utilities.read_issue_csv(p["issue"])["Opening Date"] for p in partitions[1:-1]
+    ]
+    assert start == min(dates.min() for dates in issues)
+    assert end == max(dates.max() for dates in issues)
+    assert start.strftime("%Y-%m") == "2025-03"
+    assert end.strftime("%Y-%m") == "2025-04"
+
+
+@pytest.mark.parametrize("text", ["{not json", "[30, 60]", ""])
+def test_malformed_sla_config_falls_back_to_the_default(tmp_path, text):
+    path = tmp_path / "department_sla.json"
+    path.write_text(text)
+    assert utilities.read_sla_days(str(path)) == ({}, utilities.DEFAULT_SLA_DAYS)
+
+
+def test_sla_config_overrides_the_default(tmp_path):
+    path = tmp_path / "department_sla.json"
+    path.write_text('{"default": 10, "Horticulture": 5}')
+    assert utilities.read_sla_days(str(path)) == ({"Horticulture": 5}, 10)
@@ -1,9 +1,57 @@
 # utilities.py
 import streamlit as st
 import pandas as pd
+import numpy as np
 from datetime import timedelta
 import base64
+import glob
+import hashlib
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from itertools import repeat
 import streamlit_shadcn_ui as ui
+from fiscal_calendar import (
+    COMPARISON_LABELS,
+    calendar_ordinals,
+    indian_financial_quarter,
+    indian_financial_year,
+    period_windows,
+)
+from instrumentation import profiled, profiling_requested, stage, trace_table
+from metrics import (
+    DEFAULT_SLA_DAYS,
+    build_daily_rollup,
+    build_department_facts,
+    build_district_cube,
+    build_resolution_histograms,
+    case_mapping_index,
+    combine_rollups,
+    compute_dashboard_metrics,
+    department_case_rows,
+    district_day_counts,
+    metrics_from_json,
+    metrics_to_json,
+    resolution_case_rows,
+)
+from sql_backend import (
+    build_database,
+    database_key,
+    distinct_values,
+    query_page,
+    read_meta,
+    table_columns,
+)
+from view_cache import VIEW_CACHE
+
+try:
+    import pyarrow  # noqa: F401
+
+    HAS_PYARROW = True
+except ImportError:
+    HAS_PYARROW = False
 
 DATA_DIR = "data"
 DATE_CSV = f"{DATA_DIR}/Dim_Date.csv"
@@ -11,6 +59,93 @@ CATEGORY_CSV = f"{DATA_DIR}/Issue_Category_6May2025.csv"
 DEPT_CSV = f"{DATA_DIR}/Issue_Dept_6May2025.csv"
 ISSUE_CSV = f"{DATA_DIR}/Issue_6May2025.csv"
 
+# Parquet copies of the CSV exports, shared by every server process.
+# Bump CACHE_VERSION whenever a reader changes the shape of what it returns.
+CACHE_DIR = f"{DATA_DIR}/.cache"
+CACHE_VERSION = 3
+
+# Issue rows upserted from successive exports (see ingest_issue_export),
+# stored as append-only Parquet parts plus the matching daily rollup
+ISSUE_STORE_DIR = f"{CACHE_DIR}/issue_store"
+ISSUE_STORE_MAX_PARTS = 8
+ROLLUP_KEYS = ["daily", "priority", "category", "department"]
+
+# Per-state monthly exports, laid out as
+#   <EXPORTS_DIR>/state=<State>/month=<YYYY-MM>/Issue*.csv
+# next to that month's Issue_Category*.csv and Issue_Dept*.csv. Each month
+# holds the cases opened in it. When the directory has partitions they
+# replace the single export above; LOAD_WORKERS threads load them
+EXPORTS_DIR = os.environ.get("KM_EXPORTS_DIR", f"{DATA_DIR}/exports")
+LOAD_WORKERS = int(os.environ.get("KM_LOAD_WORKERS", os.cpu_count() or 1))
+
+# Columns of the ERPNext issue export used by the dashboard
+ISSUE_COLUMNS = {
+    "Case No": str,
+    "Opening Date": str,
+    "Opening Date Time": str,
+    "Resolution Date Time": str,
+    "Status": "category",
+    "Priority": "category",
+    # Not in every export; read when present
+    "District": "category",
+}
+# Low-cardinality text columns held as pandas categoricals in every frame
+CATEGORICAL_COLUMNS = [
+    "Status",
+    "Priority",
+    "Category Name",
+    "Department",
+    "season",
+    "State",
+    "District",
+]
+ISSUE_DATE_FORMATS = {
+    "Opening Date": "%d-%m-%Y",
+    "Opening Date Time": "%d-%m-%Y %H:%M",
+    "Resolution Date Time": "%d-%m-%Y %H:%M",
+}
+
+# Exports of at least STREAMING_MIN_BYTES are parsed ISSUE_CHUNK_ROWS rows at
+# a time when building their Parquet cache, and the issue store is seeded the
+# same way (see stream_issue_rollup). Only those steps are bounded: the page,
+# later ingests and write_database still hold the whole issue table, unless
+# the exports are partitioned by month and only the selected months are read
+ISSUE_CHUNK_ROWS = 250_000
+STREAMING_MIN_BYTES = int(os.environ.get("KM_STREAMING_MIN_MB", 128)) * 2**20
+
+# Scenarios whose windows follow from the data alone, so their metrics can be
+# precomputed into SNAPSHOT_PATH by `python utilities.py snapshot`
+STANDARD_SCENARIOS = ["All Time", *COMPARISON_LABELS]
+SNAPSHOT_PATH = f"{CACHE_DIR}/snapshots.json"
+
+# Per-department resolution timelines in days, as a JSON object of
+# department name to days with an optional "default"; DEFAULT_SLA_DAYS
+# applies without the file
+SLA_CONFIG = os.environ.get("KM_SLA_CONFIG", f"{DATA_DIR}/department_sla.json")
+
+# KM_BACKEND=sqlite answers the Overview and the raw tables from one SQLite
+# file instead of per-process frames (see sql_backend); DATABASE_PATH is
+# rebuilt whenever the issue data or the dimension files change
+SQL_BACKEND = os.environ.get("KM_BACKEND", "pandas").strip().lower() == "sqlite"
+DATABASE_PATH = f"{CACHE_DIR}/kisan_mitra.sqlite"
+# Only one process rebuilds it at a time, holding <DATABASE_PATH>.lock; a
+# lock older than this is taken to be left by a builder that died
+DATABASE_BUILD_TIMEOUT = 60 * 60
+
+# Choices of rows per page for the raw data tables, and the issue columns
+# shown there until the user picks others
+RAW_PAGE_SIZES = [25, 100, 500]
+ISSUE_TABLE_COLUMNS = [
+    "Case No",
+    "Opening Date Time",
+    "Resolution Date Time",
+    "Status",
+    "Priority",
+    "season",
+    "fiscal_year",
+    "resolution_days",
+]
+
 
 def encode_image_base64(img_path):
     with open(img_path, "rb") as img_file:
@@ -29,140 +164,43 @@ def initialize_page():
         st.markdown(f"<style>{f.read()}</style>", unsafe_allow_html=True)
 
 
-def indian_financial_quarter(date):
-    # Shift months so Apr=1, May=2,... Mar=12
-    shifted_month = (date.month - 4) % 12 + 1
-    quarter = (shifted_month - 1) // 3 + 1
-    return quarter
-
-
-def process_date_ranges(scenario, max_date, min_date):
-    prev_custom_start = None
+def standard_period(scenario, max_date, min_date):
+    """Current and comparison windows of one of STANDARD_SCENARIOS.
 
+    Returns current_start, current_end, prev_start, prev_end and the
+    comparison label; they only depend on the data's date range.
+    """
     if scenario == "All Time":
         # For "All Time", use the full range of available data
+        return min_date, max_date, None, None, ""
 
-        current_start = min_date
-        current_end = max_date
-        prev_start = None
-        prev_end = None
-        comparison_label = ""
-        prev_custom_start = None
-
-    elif scenario == "This Month":
-        # Get current month dates
-        current_month = max_date.month
-        current_year = max_date.year
-        day_of_month = max_date.day
-
-        # Current period: From 1st of current month to current day
-        current_start = pd.Timestamp(year=current_year, month=current_month, day=1)
-        current_end = max_date
-
-        # Previous month
-        if current_month == 1:  # January
-            prev_month = 12
-            prev_year = current_year - 1
-        else:
-            prev_month = current_month - 1
-            prev_year = current_year
-
-        # Previous period: From 1st of previous month to same day of previous month
-        prev_start = pd.Timestamp(year=prev_year, month=prev_month, day=1)
-
-        try:
-            prev_end = pd.Timestamp(year=prev_year, month=prev_month, day=day_of_month)
-        except ValueError:
-            # If day doesn't exist in previous month (e.g., March 31 -> Feb 28/29)
-            if prev_month == 2:  # February
-                prev_end = (
-                    pd.Timestamp(year=prev_year, month=prev_month, day=29)
-                    if (
-                        prev_year % 4 == 0
-                        and (prev_year % 100 != 0 or prev_year % 400 == 0)
-                    )
-                    else pd.Timestamp(year=prev_year, month=prev_month, day=28)
-                )
-            else:
-                last_day = pd.Timestamp(
-                    year=prev_year, month=prev_month + 1, day=1
-                ) - timedelta(days=1)
-                prev_end = last_day
-
-        comparison_label = "vs PM"
-
-    elif scenario == "This Quarter":
-
-        def adjusted_year_month(base_year, shifted_month):
-            if shifted_month > 12:
-                return base_year + 1, shifted_month - 12
-            return base_year, shifted_month
-
-        quarter_end_month = {1: 6, 2: 9, 3: 12, 4: 3}
-
-        # Get current quarter info
-        current_year = max_date.year
-        current_quarter = indian_financial_quarter(max_date)
-
-        current_year_adjusted, quarter_start_month = adjusted_year_month(
-            current_year, (current_quarter - 1) * 3 + 4
-        )
-        current_quarter_start = pd.Timestamp(
-            year=current_year_adjusted, month=quarter_start_month, day=1
-        )
-        current_start = current_quarter_start
-        current_end = max_date
-        days_into_quarter = (max_date - current_quarter_start).days
-
-        # Previous quarter info
-        if current_quarter == 1:
-            prev_quarter = 4
-            prev_year = current_year - 1
-        else:
-            prev_quarter = current_quarter - 1
-            prev_year = current_year
-
-        prev_year_adjusted, prev_quarter_start_month = adjusted_year_month(
-            prev_year, (prev_quarter - 1) * 3 + 4
-        )
-        prev_start = pd.Timestamp(
-            year=prev_year_adjusted, month=prev_quarter_start_month, day=1
-        )
-
-        # Calculate capped prev_end (based on actual quarter end)
-        end_month = quarter_end_month[prev_quarter]
-        if end_month < prev_quarter_start_month:
-            end_year = prev_year_adjusted + 1
-        else:
-            end_year = prev_year_adjusted
-
-        prev_end = pd.Timestamp(end_year, end_month, 1) + pd.offsets.MonthEnd(1)
-
-        comparison_label = "vs PQ"
-
-    elif scenario == "This Year":
-        # Get current year dates up to max_date
-        current_year = max_date.year
-
-        # Calculate days into year
-        year_start = pd.Timestamp(year=current_year, month=1, day=1)
-        days_into_year = (max_date - year_start).days - 1
+    # Month, financial quarter or year to date, and its comparison period
+    window = period_windows([max_date], scenario).iloc[0]
+    return (
+        window["current_start"],
+        max_date,
+        window["prev_start"],
+        window["prev_end"],
+        COMPARISON_LABELS[scenario],
+    )
 
-        # Current period: From Jan 1 to max_date of current year
-        current_start = year_start
-        current_end = max_date
 
-        # Previous period: Same number of days into previous year
-        prev_year = current_year - 1
-        prev_start = pd.Timestamp(year=prev_year, month=1, day=1)
-        prev_end = prev_start + timedelta(days=days_into_year)
+def process_date_ranges(scenario, max_date, min_date):
+    prev_custom_start = None
 
-        comparison_label = "vs PY"
+    if scenario in STANDARD_SCENARIOS:
+        (
+            current_start,
+            current_end,
+            prev_start,
+            prev_end,
+            comparison_label,
+        ) = standard_period(scenario, max_date, min_date)
 
     elif scenario == "Custom":
         date_range = st.sidebar.date_input(
             "Select Date Range",
-            value=(max_date - timedelta(days=180), max_date),
+            value=(max(max_date - timedelta(days=180), min_date), max_date),
             min_value=min_date.date(),
             max_value=max_date.date(),
             key="custom_date_picker",  # optional: ensures independent key
@@ -220,12 +258,225 @@ def process_date_ranges(scenario, max_date, min_date):
     )
 
 
-def load_csv(path, parse_dates=None, date_format=None):
+def file_fingerprint(path):
+    stat = os.stat(path)
+    return {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+
+
+def file_sha256(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _write_atomic(path, write):
+    # Write to a private temp file first so concurrent workers and sessions
+    # never read a half-written cache file
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        write(tmp_path)
+        os.replace(tmp_path, path)
+    except BaseException:
+        # Whatever went wrong, don't leave the partial file behind
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+
+
+def _write_json(path, obj):
+    with open(path, "w") as f:
+        json.dump(obj, f)
+
+
+def load_columnar(path, reader, streamer=None):
+    """Load `path` through the Parquet cache in CACHE_DIR.
+
+    The returned frame carries `attrs["data_version"]`, derived from the
+    source file, so memoized computations can tell datasets apart.
+
+    `reader(path)` parses the CSV; its result (and any JSON-friendly
+    `df.attrs`) is stored next to a manifest holding the source size, mtime
+    and SHA-256. The cache is reused while the size and mtime match, or the
+    content hash still matches after a touch; otherwise the CSV is parsed
+    again. Without pyarrow, or on a read-only data dir, this is just
+    `reader(path)`.
+
+    Files of at least STREAMING_MIN_BYTES are instead converted by
+    `streamer(path, parquet_path)`, which writes the Parquet file chunk by
+    chunk and returns the attrs, so the CSV is never parsed in one piece.
+    """
+    with stage(f"load {os.path.basename(path)}"):
+        df = _load_columnar(path, reader, streamer)
+    fingerprint = file_fingerprint(path)
+    df.attrs["data_version"] = (
+        f"{_cache_name(path)}:{fingerprint['size']}:{fingerprint['mtime_ns']}"
+    )
+    return df
+
+
+def _cache_name(path):
+    # Files under DATA_DIR are named by their path below it, so partitions
+    # with the same file name get separate caches ("Issue_6May2025" for a
+    # top-level export); files elsewhere by name and a hash of the path
+    relative = os.path.splitext(os.path.relpath(path, DATA_DIR))[0]
+    if relative.startswith(os.pardir):
+        digest = hashlib.sha1(os.path.abspath(path).encode()).hexdigest()[:12]
+        relative = f"{os.path.splitext(os.path.basename(path))[0]}-{digest}"
+    return relative.replace(os.sep, "__")
+
+
+def _load_columnar(path, reader, streamer=None):
+    if not HAS_PYARROW:
+        return reader(path)
+
+    name = _cache_name(path)
+    cache_path = f"{CACHE_DIR}/{name}.parquet"
+    manifest_path = f"{CACHE_DIR}/{name}.json"
+    fingerprint = file_fingerprint(path)
+
+    manifest = None
+    if os.path.exists(cache_path) and os.path.exists(manifest_path):
+        try:
+            with open(manifest_path) as f:
+                manifest = json.load(f)
+        except (OSError, ValueError):
+            manifest = None
+
+    if manifest is not None and manifest.get("version") == CACHE_VERSION:
+        fresh = all(manifest.get(k) == v for k, v in fingerprint.items())
+        if not fresh and manifest.get("size") == fingerprint["size"]:
+            # Same size, new mtime (e.g. re-copied export): compare contents
+            fresh = manifest.get("sha256") == file_sha256(path)
+            if fresh:
+                manifest.update(fingerprint)
+                try:
+                    _write_atomic(manifest_path, lambda tmp: _write_json(tmp, manifest))
+                except OSError:
+                    pass
+        if fresh:
+            try:
+                df = apply_schema(pd.read_parquet(cache_path))
+            except Exception:
+                # Corrupt or unreadable cache file: rebuild from the CSV
+                pass
+            else:
+                df.attrs = manifest.get("attrs", {})
+                return df
+
+    if streamer is not None and fingerprint["size"] >= STREAMING_MIN_BYTES:
+        attrs = {}
+        try:
+            os.makedirs(CACHE_DIR, exist_ok=True)
+            _write_atomic(cache_path, lambda tmp: attrs.update(streamer(path, tmp)))
+            manifest = {
+                "version": CACHE_VERSION,
+                **fingerprint,
+                "sha256": file_sha256(path),
+                "attrs": attrs,
+            }
+            _write_atomic(manifest_path, lambda tmp: _write_json(tmp, manifest))
+        except OSError:
+            # Read-only data dir: fall back to parsing in one piece
+            pass
+        else:
+            df = apply_schema(pd.read_parquet(cache_path))
+            df.attrs = attrs
+            return df
+
+    df = reader(path)
+
+    try:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        _write_atomic(cache_path, lambda tmp: df.to_parquet(tmp, index=False))
+        manifest = {
+            "version": CACHE_VERSION,
+            **fingerprint,
+            "sha256": file_sha256(path),
+            "attrs": df.attrs,
+        }
+        _write_atomic(manifest_path, lambda tmp: _write_json(tmp, manifest))
+    except OSError:
+        pass
+
+    return df
+
+
+def encode_case_no(case_no):
+    """Map "KM-19382" style case numbers to a stable int64 key.
+
+    The letter prefix is packed base-27 into the high 32 bits and the
+    number into the low 32 bits, so keys agree across independently loaded
+    frames without a shared vocabulary. Malformed values map to -1.
+    """
+    parts = case_no.str.extract(r"^([A-Za-z]{1,6})-(\d{1,9})$")
+    prefix_codes = {}
+    for prefix in parts[0].dropna().unique():
+        code = 0
+        for char in prefix.upper():
+            code = code * 27 + (ord(char) - ord("A") + 1)
+        prefix_codes[prefix] = code
+    high = parts[0].map(prefix_codes).fillna(-1).to_numpy("int64")
+    low = pd.to_numeric(parts[1]).fillna(0).to_numpy("int64")
+    keys = np.where(high >= 0, (high << 32) | low, -1)
+    return pd.Series(keys, index=case_no.index, name="Case ID")
+
+
+def apply_schema(df):
+    for col in CATEGORICAL_COLUMNS:
+        if col in df.columns and not isinstance(df[col].dtype, pd.CategoricalDtype):
+            df[col] = df[col].astype("category")
+    if "Case No" in df.columns and "Case ID" not in df.columns:
+        df["Case ID"] = encode_case_no(df["Case No"])
+    return df
+
+
+def memory_report(frames):
+    """Deep memory of each frame before and after the compact schema.
+
+    `frames` maps a display name to a frame loaded through apply_schema; the
+    "before" figure is the same data with categoricals as object columns and
+    without the integer Case ID.
+    """
+    rows = []
+    for name, df in frames.items():
+        plain = df.drop(columns=["Case ID"], errors="ignore")
+        plain = plain.astype(
+            {
+                col: object
+                for col in plain.columns
+                if isinstance(plain[col].dtype, pd.CategoricalDtype)
+            }
+        )
+        before = plain.memory_usage(deep=True).sum() / 2**20
+        after = df.memory_usage(deep=True).sum() / 2**20
+        rows.append(
+            {
+                "Frame": name,
+                "Rows": len(df),
+                "Before (MB)": round(before, 2),
+                "After (MB)": round(after, 2),
+                "Reduction (%)": round((1 - after / before) * 100, 1),
+            }
+        )
+    return pd.DataFrame(rows)
+
+
+def read_csv(path, parse_dates=None, date_format=None):
     df = pd.read_csv(path, encoding="ISO-8859-1")
     if parse_dates:
         for col in parse_dates:
             df[col] = pd.to_datetime(df[col], format=date_format, errors="coerce")
-    return df
+    return apply_schema(df)
+
+
+def load_csv(path, parse_dates=None, date_format=None):
+    return load_columnar(
+        path, lambda p: read_csv(p, parse_dates=parse_dates, date_format=date_format)
+    )
 
 
 @st.cache_data
@@ -244,29 +495,440 @@ def read_department_data():
 
 
 @st.cache_data
-def read_issue_data(df_date):
-    df = pd.read_csv(ISSUE_CSV, encoding="ISO-8859-1")
-    df_raw = pd.read_csv(ISSUE_CSV, encoding="ISO-8859-1")
+def read_case_mappings():
+    # Category and department codes per integer Case ID, for counting the
+    # top names of any slice of the issue table without a merge
+    return {
+        "category": case_mapping_index(read_category_data(), "Category Name"),
+        "department": case_mapping_index(read_department_data(), "Department"),
+    }
 
-    # Parse dates to set format
-    df["Opening Date"] = pd.to_datetime(
-        df["Opening Date"], format="%d-%m-%Y", errors="coerce"
-    )
-    df["Opening Date Time"] = pd.to_datetime(
-        df["Opening Date Time"], format="%d-%m-%Y %H:%M", errors="coerce"
+
+def _parse_issue_dates(df):
+    # Parses the date columns in place and returns the true min and max
+    # Opening Date
+    opening_date_raw = df["Opening Date"]
+    for col, date_format in ISSUE_DATE_FORMATS.items():
+        df[col] = pd.to_datetime(df[col], format=date_format, errors="coerce")
+
+    # True min/max follow the lenient (dayfirst) parse, which only differs from
+    # the strict format for the few values the strict parse rejects
+    opening_dates = df["Opening Date"].dropna()
+    rejected = opening_date_raw[df["Opening Date"].isna() & opening_date_raw.notna()]
+    if len(rejected):
+        lenient = pd.to_datetime(rejected, dayfirst=True, errors="coerce").dropna()
+        opening_dates = pd.concat([opening_dates, lenient])
+    return opening_dates.min(), opening_dates.max()
+
+
+def _read_issue_csv(path, **kwargs):
+    # Only the columns the dashboard uses, with dates read as plain strings so
+    # they can be parsed from the same buffer
+    return pd.read_csv(
+        path,
+        encoding="ISO-8859-1",
+        usecols=lambda col: col in ISSUE_COLUMNS,
+        dtype=ISSUE_COLUMNS,
+        **kwargs,
     )
-    df["Resolution Date Time"] = pd.to_datetime(
-        df["Resolution Date Time"], format="%d-%m-%Y %H:%M", errors="coerce"
+
+
+@profiled("parse issue CSV")
+def read_issue_csv(path):
+    # Single pass over the whole export
+    df = _read_issue_csv(path)
+    true_min_date, true_max_date = _parse_issue_dates(df)
+
+    # Kept as ISO strings so they survive the Parquet cache manifest
+    df.attrs["true_min_date"] = str(true_min_date)
+    df.attrs["true_max_date"] = str(true_max_date)
+
+    return apply_schema(df)
+
+
+def iter_issue_csv(path, chunk_rows=ISSUE_CHUNK_ROWS):
+    """Parsed chunks of at most `chunk_rows` rows of an issue export.
+
+    Each chunk is what read_issue_csv returns for its rows, with its own
+    true_min_date/true_max_date attrs (as Timestamps), so memory stays
+    bounded by the chunk size whatever the size of the file.
+    """
+    with _read_issue_csv(path, chunksize=chunk_rows) as reader:
+        for chunk in reader:
+            true_min_date, true_max_date = _parse_issue_dates(chunk)
+            chunk.attrs["true_min_date"] = true_min_date
+            chunk.attrs["true_max_date"] = true_max_date
+            yield apply_schema(chunk)
+
+
+def _merge_date_range(attrs, chunk):
+    for key, pick in (("true_min_date", min), ("true_max_date", max)):
+        value = chunk.attrs[key]
+        if pd.notna(value):
+            attrs[key] = value if pd.isna(attrs.get(key)) else pick(attrs[key], value)
+
+
+class _ParquetChunks:
+    """Appends frames to one Parquet file as they come.
+
+    Categorical columns are written as plain strings (each chunk has its own
+    categories), so apply the schema again after reading the file back.
+    """
+
+    def __init__(self, out_path):
+        self.out_path = out_path
+        self.writer = None
+
+    def write(self, chunk):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        chunk = chunk.astype(
+            {
+                col: object
+                for col in chunk.columns
+                if isinstance(chunk[col].dtype, pd.CategoricalDtype)
+            }
+        )
+        if self.writer is None:
+            # Columns that are empty in the first chunk are still text
+            schema = pa.Schema.from_pandas(chunk, preserve_index=False)
+            for i, field in enumerate(schema):
+                if pa.types.is_null(field.type):
+                    schema = schema.set(i, field.with_type(pa.string()))
+            self.writer = pq.ParquetWriter(self.out_path, schema)
+        self.writer.write_table(
+            pa.Table.from_pandas(chunk, schema=self.writer.schema, preserve_index=False)
+        )
+
+    def close(self):
+        if self.writer is not None:
+            self.writer.close()
+
+
+@profiled("stream issue CSV")
+def stream_issue_parquet(path, out_path, chunk_rows=ISSUE_CHUNK_ROWS):
+    """Convert an issue export to Parquet chunk by chunk; returns its attrs.
+
+    Categorical columns are written as plain strings (each chunk has its own
+    categories), so apply the schema again after reading the file back.
+    """
+    attrs = {}
+    parquet = _ParquetChunks(out_path)
+    try:
+        for chunk in iter_issue_csv(path, chunk_rows):
+            _merge_date_range(attrs, chunk)
+            parquet.write(chunk)
+    finally:
+        parquet.close()
+    return {key: str(value) for key, value in attrs.items()}
+
+
+def _case_rows(path, chunk_rows, latest):
+    # Rows of an issue export that are kept (latest: the last row of each
+    # Case No, as _latest_cases) and that the daily rollup counts: per Case
+    # No, the kept row with the earliest Opening Date that prepare_issue_data
+    # keeps, as build_daily_rollup's drop_duplicates picks it. Only a hash,
+    # the opening day and two flags per row are held, never the rows
+    keys, missing, opening, clean = [], [], [], []
+    attrs = {}
+    for chunk in iter_issue_csv(path, chunk_rows):
+        _merge_date_range(attrs, chunk)
+        case_no = chunk["Case No"].astype(object)
+        missing.append(case_no.isna().to_numpy())
+        keys.append(pd.util.hash_array(case_no.fillna("").to_numpy()))
+        opening.append(chunk["Opening Date"].to_numpy("datetime64[ns]").view("int64"))
+        clean.append(
+            (
+                chunk["Opening Date"].notna()
+                & (
+                    (chunk["Status"] != "Resolved")
+                    | chunk["Resolution Date Time"].notna()
+                )
+            ).to_numpy()
+        )
+    if not keys:
+        return np.zeros(0, bool), np.zeros(0, bool), attrs
+    keys, missing = np.concatenate(keys), np.concatenate(missing)
+    opening, clean = np.concatenate(opening), np.concatenate(clean)
+
+    kept = np.ones(len(keys), bool)
+    if latest:
+        kept[~missing] = ~pd.Series(keys[~missing]).duplicated(keep="last").to_numpy()
+    # Rows without a Case No are one case to drop_duplicates
+    keys[missing] = 0
+    rows = np.flatnonzero(kept & clean)
+    rows = rows[np.lexsort((rows, opening[rows], keys[rows]))]
+    first = np.ones(len(rows), bool)
+    first[1:] = keys[rows][1:] != keys[rows][:-1]
+    counted = np.zeros(len(keys), bool)
+    counted[rows[first]] = True
+    return kept, counted, attrs
+
+
+@profiled("stream issue rollup")
+def stream_issue_rollup(
+    path,
+    df_date,
+    df_category,
+    df_dept,
+    out_path=None,
+    latest=False,
+    chunk_rows=ISSUE_CHUNK_ROWS,
+):
+    """Daily rollup of an issue export, reduced chunk by chunk.
+
+    The export is read twice: once for the case keys, then chunk by chunk
+    through prepare_issue_data and build_daily_rollup, folded together with
+    combine_rollups. A Case No repeated across chunks is counted once, on
+    the same row as in the rollup of the whole table. With `latest`, only
+    the last row of each Case No is used (as in the issue store); with
+    `out_path`, the rows used are also written there as Parquet.
+
+    Returns the rollup and the rows used, the rows dropped for a missing
+    Opening Date and for a resolved case without a resolution time, and the
+    export's true_min_date/true_max_date.
+    """
+    kept, counted, attrs = _case_rows(path, chunk_rows, latest)
+    rollup = None
+    counts = {"rows": 0, "null_opening_dates": 0, "null_resolution_dates": 0}
+    parquet = None if out_path is None else _ParquetChunks(out_path)
+    offset = 0
+    try:
+        for chunk in iter_issue_csv(path, chunk_rows):
+            rows = slice(offset, offset + len(chunk))
+            offset += len(chunk)
+            chunk = chunk[kept[rows]]
+            if parquet is not None:
+                parquet.write(chunk)
+            counts["rows"] += len(chunk)
+            chunk, null_opening, null_resolution = prepare_issue_data(
+                chunk.assign(_counted=counted[rows][kept[rows]]), df_date
+            )
+            counts["null_opening_dates"] += int(null_opening)
+            counts["null_resolution_dates"] += int(null_resolution)
+            chunk = chunk[chunk.pop("_counted").to_numpy(bool)]
+            if len(chunk):
+                delta = build_daily_rollup(chunk, df_date, df_category, df_dept)
+                rollup = delta if rollup is None else combine_rollups(rollup, delta)
+    finally:
+        if parquet is not None:
+            parquet.close()
+    counts.update(
+        {key: str(attrs.get(key, pd.NaT)) for key in ("true_min_date", "true_max_date")}
     )
+    return rollup, counts
+
+
+def read_store_manifest():
+    try:
+        with open(f"{ISSUE_STORE_DIR}/manifest.json") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def issue_data_version():
+    """Cheap token that changes whenever the issue data on disk changes."""
+    manifest = read_store_manifest()
+    if manifest is not None:
+        return f"store-{manifest['version']}"
+    fingerprint = file_fingerprint(ISSUE_CSV)
+    return f"csv-{fingerprint['size']}-{fingerprint['mtime_ns']}"
+
+
+def rollup_sources():
+    # The persisted rollup is only valid for the dimension files it was
+    # built from
+    return {path: file_fingerprint(path) for path in (DATE_CSV, CATEGORY_CSV, DEPT_CSV)}
+
+
+def _latest_cases(df):
+    # The last row of each Case No, in file order. Rows without a Case No
+    # are not versions of one case, so they are all kept
+    keep = ~df["Case No"].duplicated(keep="last") | df["Case No"].isna()
+    return df[keep.to_numpy()].reset_index(drop=True)
+
+
+@profiled("load issue rows")
+def load_issue_frame():
+    """Raw issue rows: the ingested store if there is one, else ISSUE_CSV."""
+    manifest = read_store_manifest()
+    if manifest is None:
+        return load_columnar(ISSUE_CSV, read_issue_csv, stream_issue_parquet)
+
+    parts = [pd.read_parquet(f"{ISSUE_STORE_DIR}/{part}") for part in manifest["parts"]]
+    df = pd.concat(parts, ignore_index=True) if len(parts) > 1 else parts[0]
+    # Later parts hold the newest version of each case
+    df = apply_schema(_latest_cases(df))
+    df.attrs = manifest["attrs"]
+    return df
+
 
-    df_raw["Opening Date"] = pd.to_datetime(
-        df_raw["Opening Date"], dayfirst=True, errors="coerce"
+def read_store_rollup():
+    rollup = {}
+    for key in ROLLUP_KEYS:
+        rollup[key] = pd.read_parquet(f"{ISSUE_STORE_DIR}/rollup_{key}.parquet")
+    return rollup
+
+
+def _write_store(manifest, rollup, part=None):
+    os.makedirs(ISSUE_STORE_DIR, exist_ok=True)
+    if part is not None:
+        name = f"part-{manifest['next_part']:05d}.parquet"
+        _write_atomic(
+            f"{ISSUE_STORE_DIR}/{name}", lambda tmp: part.to_parquet(tmp, index=False)
+        )
+        manifest["parts"].append(name)
+        manifest["next_part"] += 1
+    for key, frame in rollup.items():
+        _write_atomic(
+            f"{ISSUE_STORE_DIR}/rollup_{key}.parquet",
+            lambda tmp: frame.to_parquet(tmp, index=key in ("daily", "priority")),
+        )
+    manifest["version"] += 1
+    manifest["rollup_sources"] = rollup_sources()
+    # The manifest is written last: readers only ever see complete parts
+    _write_atomic(
+        f"{ISSUE_STORE_DIR}/manifest.json", lambda tmp: _write_json(tmp, manifest)
     )
-    true_min_date = df_raw["Opening Date"].dropna().min()
-    true_max_date = df_raw["Opening Date"].dropna().max()
 
-    total_records = len(df)
 
+def ingest_issue_export(path):
+    """Upsert a newer ERPNext issue export into the persisted issue store.
+
+    Only cases that are new, or whose dates, Status or Priority changed, are
+    appended as a new store part, and the persisted daily rollup is updated
+    by the rollup of those rows minus that of the versions they replace.
+    The store is seeded from ISSUE_CSV on first use, chunk by chunk (see
+    stream_issue_rollup), and compacted into one part once it holds
+    ISSUE_STORE_MAX_PARTS parts; later exports and compaction are read whole. A Case No repeated in an
+    export keeps its last row, the seed included; rows without a Case No
+    are kept from the seed but cannot be matched, so later exports never
+    upsert them. Returns the number of upserted cases.
+    """
+    df_date = read_date_data()
+    df_category = read_category_data()
+    df_dept = read_department_data()
+
+    def rollup_of(df_raw):
+        df = prepare_issue_data(df_raw, df_date)[0]
+        return build_daily_rollup(df, df_date, df_category, df_dept)
+
+    manifest = read_store_manifest()
+    if manifest is None:
+        # Seeded chunk by chunk, so the first export is never held whole; the
+        # rollup counts the same row per case that the store keeps, or
+        # subtracting a replaced version later would remove another row
+        os.makedirs(ISSUE_STORE_DIR, exist_ok=True)
+        seeded = {}
+
+        def write_seed(tmp):
+            seeded["rollup"], seeded["counts"] = stream_issue_rollup(
+                ISSUE_CSV, df_date, df_category, df_dept, out_path=tmp, latest=True
+            )
+
+        name = "part-00000.parquet"
+        _write_atomic(f"{ISSUE_STORE_DIR}/{name}", write_seed)
+        manifest = {
+            "version": 0,
+            "parts": [name],
+            "next_part": 1,
+            "attrs": {
+                bound: seeded["counts"][bound]
+                for bound in ("true_min_date", "true_max_date")
+            },
+        }
+        _write_store(manifest, seeded["rollup"])
+
+    store = load_issue_frame()
+    new = read_issue_csv(path)
+    attrs = new.attrs
+    new = _latest_cases(new[new["Case No"].notna().to_numpy()])
+
+    compared = [
+        col
+        for col in ISSUE_COLUMNS
+        if col != "Case No" and col in new.columns and col in store.columns
+    ]
+    joined = new[["Case No"] + compared].merge(
+        store[["Case No"] + compared],
+        on="Case No",
+        how="left",
+        suffixes=("", "_old"),
+        indicator=True,
+    )
+    changed = joined["_merge"] == "left_only"
+    for col in compared:
+        a = joined[col].astype(object)
+        b = joined[f"{col}_old"].astype(object)
+        changed |= ~((a == b) | (a.isna() & b.isna()))
+    upserts = new[changed.to_numpy()]
+    if upserts.empty:
+        return 0
+
+    replaced = store[store["Case No"].isin(upserts["Case No"])]
+    if manifest["rollup_sources"] == rollup_sources():
+        rollup = combine_rollups(read_store_rollup(), rollup_of(upserts))
+        if len(replaced):
+            rollup = combine_rollups(rollup, rollup_of(replaced), sign=-1)
+    else:
+        # Dimension files changed since the last ingest: rebuild in full
+        updated = store[~store["Case No"].isin(upserts["Case No"])]
+        rollup = rollup_of(pd.concat([updated, upserts], ignore_index=True))
+
+    for bound, pick in (("true_min_date", min), ("true_max_date", max)):
+        known = [
+            pd.Timestamp(v)
+            for v in (manifest["attrs"][bound], attrs[bound])
+            if pd.notna(pd.Timestamp(v))
+        ]
+        manifest["attrs"][bound] = str(pick(known)) if known else "NaT"
+
+    if len(manifest["parts"]) + 1 >= ISSUE_STORE_MAX_PARTS:
+        compacted = _latest_cases(pd.concat([store, upserts], ignore_index=True))
+        stale = manifest["parts"]
+        manifest["parts"] = []
+        _write_store(manifest, rollup, part=compacted)
+        for name in stale:
+            os.remove(f"{ISSUE_STORE_DIR}/{name}")
+    else:
+        _write_store(manifest, rollup, part=upserts)
+
+    return len(upserts)
+
+
+@profiled("Dim_Date lookup")
+def lookup_date_dimension(dates, df_date, columns):
+    """Look up `columns` of the daily calendar `df_date` for a Series of dates.
+
+    The calendar is laid out as one row per day from its first date, so each
+    date maps to a row by its integer day offset instead of a hash merge.
+    Dates that are missing or outside the calendar get NaN. Returns a frame
+    with the index of `dates`.
+    """
+    calendar = df_date.set_index("date")[columns].sort_index()
+    start = calendar.index[0]
+    days = pd.date_range(start, calendar.index[-1])
+    if len(days) != len(calendar):
+        calendar = calendar.reindex(days)
+
+    offsets = ((pd.DatetimeIndex(dates) - start) // pd.Timedelta(days=1)).to_numpy()
+    valid = (offsets >= 0) & (offsets < len(calendar))
+    looked_up = calendar.iloc[np.where(valid, offsets, 0).astype("int64")]
+    looked_up.index = dates.index
+    if not valid.all():
+        looked_up = looked_up.where(pd.Series(valid, index=dates.index), axis=0)
+    return looked_up
+
+
+@profiled("prepare issues")
+def prepare_issue_data(df, df_date):
+    """Clean a raw issue frame and attach the date dimension and case facts.
+
+    Returns the prepared frame together with the number of rows dropped for
+    a missing Opening Date and for resolved cases without a resolution time.
+    """
     # Count rows where Opening Date is null
     null_opening_dates = df["Opening Date"].isna().sum()
 
@@ -281,20 +943,60 @@ def read_issue_data(df_date):
     # Drop rows with Status = "Resolved" and missing Resolution Date Time
     df = df[(df["Status"] != "Resolved") | (df["Resolution Date Time"].notna())]
 
+    # Keep the table sorted by Opening Date so slice_period can binary-search it
+    df = df.sort_values("Opening Date", kind="stable", ignore_index=True)
+
     # Extract Year and Month from Opening Date
     df["Year"] = df["Opening Date"].dt.year
     df["Month"] = df["Opening Date"].dt.month
 
-    # Merge Issue CSV with date dimensions season and fiscal year
-    df_merged = df.merge(
-        df_date[["date", "season", "fiscal_year"]],
-        left_on="Opening Date",
-        right_on="date",
-        how="left",
+    # Attach date dimensions season and fiscal year by calendar day offset
+    df[["season", "fiscal_year"]] = lookup_date_dimension(
+        df["Opening Date"], df_date, ["season", "fiscal_year"]
+    )
+    # Dim_Date ends before newer exports do; their fiscal year is computed
+    df["fiscal_year"] = (
+        df["fiscal_year"]
+        .fillna(indian_financial_year(df["Opening Date"].dt))
+        .astype("int64")
     )
 
+    # Financial quarter of the opening date, for period membership filters
+    df["financial_quarter"] = indian_financial_quarter(df["Opening Date"].dt)
+
+    # Case-level facts computed once per load, so the page never re-masks
+    df["is_resolved"] = df["Status"] == "Resolved"
+    df["is_closed"] = df["Status"] == "Closed"
+    df["is_pending"] = ~(df["is_resolved"] | df["is_closed"])
+    resolution_time = df["Resolution Date Time"] - df["Opening Date Time"]
+    df["resolution_days"] = resolution_time.dt.days
+    df["resolution_hours"] = resolution_time.dt.total_seconds() / 3600
+    # Integer month numbers (-1 when missing) for bincount based trends, and
+    # the first row of each Case No so trends dedupe once instead of per month
+    df["opening_month_no"] = calendar_ordinals(df["Opening Date Time"], "M")
+    df["resolution_month_no"] = calendar_ordinals(df["Resolution Date Time"], "M")
+    df["is_first_case"] = ~df["Case No"].duplicated()
+
+    return df, null_opening_dates, null_resolution_dates
+
+
+@st.cache_data
+def read_issue_data(_df_date, data_version=None):
+    # data_version (see issue_data_version) only keys the cache, so that an
+    # ingest made by another process is picked up on the next rerun. The
+    # leading underscore keeps st.cache_data from hashing the whole Dim_Date
+    # frame on every call; it comes from the equally static read_date_data
+    df = load_issue_frame()
+    true_min_date = pd.Timestamp(df.attrs["true_min_date"])
+    true_max_date = pd.Timestamp(df.attrs["true_max_date"])
+
+    total_records = len(df)
+
+    df, null_opening_dates, null_resolution_dates = prepare_issue_data(df, _df_date)
+    df.attrs["data_version"] = data_version or issue_data_version()
+
     return (
-        df_merged,
+        df,
         null_opening_dates,
         null_resolution_dates,
         total_records,
@@ -303,6 +1005,440 @@ def read_issue_data(df_date):
     )
 
 
+@st.cache_data
+def read_daily_rollup(_df_date, data_version=None):
+    manifest = read_store_manifest()
+    if manifest is not None and manifest["rollup_sources"] == rollup_sources():
+        return read_store_rollup()
+
+    df_issues = read_issue_data(_df_date, data_version)[0]
+    return build_daily_rollup(
+        df_issues, _df_date, read_category_data(), read_department_data()
+    )
+
+
+@st.cache_data
+def read_district_cube(_df_date, data_version=None):
+    # Built once per data version, so the District tab only ever sums windows
+    # of the cube instead of grouping the issue table
+    df_issues = read_issue_data(_df_date, data_version)[0]
+    return build_district_cube(district_day_counts(df_issues))
+
+
+@st.cache_data
+def read_department_facts(_df_date, data_version=None):
+    # The department mapping joined into the first row of every case once
+    # per data version; the Department tab only slices its sorted arrays
+    df_issues = read_issue_data(_df_date, data_version)[0]
+    index = read_case_mappings()["department"]
+    return build_department_facts(department_case_rows(df_issues, index))
+
+
+@st.cache_data
+def read_resolution_histograms(_df_date, data_version=None):
+    # Daily resolution time histograms per priority and per category, built
+    # once per data version; any window's percentiles are merged from them
+    df_issues = read_issue_data(_df_date, data_version)[0]
+    return resolution_histograms(df_issues, read_case_mappings()["category"])
+
+
+def resolution_histograms(df_issues, category_index):
+    # build_resolution_histograms of the cases per priority and per category
+    return {
+        "priority": build_resolution_histograms(resolution_case_rows(df_issues)),
+        "category": build_resolution_histograms(
+            resolution_case_rows(df_issues, category_index, "Category Name")
+        ),
+    }
+
+
+def read_sla_days(path=SLA_CONFIG):
+    """Department timelines from `path` and the default timeline."""
+    try:
+        with open(path) as f:
+            timelines = json.load(f)
+    except (OSError, ValueError):
+        # Missing or malformed config: every department gets the default
+        timelines = {}
+    if not isinstance(timelines, dict):
+        timelines = {}
+    default = timelines.pop("default", DEFAULT_SLA_DAYS)
+    return timelines, default
+
+
+def discover_partitions(root=EXPORTS_DIR):
+    """Exports under `root`, one dict per state and month.
+
+    Each holds the "state", the "month" as "YYYY-MM", the "issue",
+    "category" and "department" paths (mappings may be None) and a "version"
+    that changes with any of the files. Sorted by month, then state; empty
+    if `root` does not exist.
+    """
+    partitions = []
+    for directory in sorted(glob.glob(os.path.join(root, "state=*", "month=*"))):
+        state = os.path.basename(os.path.dirname(directory)).split("=", 1)[1]
+        month = os.path.basename(directory).split("=", 1)[1]
+        files = {
+            "category": glob.glob(os.path.join(directory, "Issue_Category*.csv")),
+            "department": glob.glob(os.path.join(directory, "Issue_Dept*.csv")),
+        }
+        mapped = {path for paths in files.values() for path in paths}
+        files["issue"] = [
+            path
+            for path in glob.glob(os.path.join(directory, "Issue*.csv"))
+            if path not in mapped
+        ]
+        if len(files["issue"]) != 1 or any(len(v) > 1 for v in files.values()):
+            raise ValueError(f"Expected one export of each kind in {directory}")
+        paths = {key: (found[0] if found else None) for key, found in files.items()}
+        fingerprints = [
+            file_fingerprint(path) for path in paths.values() if path is not None
+        ]
+        partitions.append(
+            {
+                "state": state,
+                "month": str(pd.Period(month, freq="M")),
+                **paths,
+                "version": hashlib.sha1(
+                    json.dumps(fingerprints, sort_keys=True).encode()
+                ).hexdigest()[:12],
+            }
+        )
+    return sorted(partitions, key=lambda p: (p["month"], p["state"]))
+
+
+def partitions_version(partitions):
+    # Token of a set of partitions, for keying caches and memoized views
+    versions = "".join(p["version"] for p in partitions)
+    return f"parts-{hashlib.sha1(versions.encode()).hexdigest()[:12]}"
+
+
+def prune_partitions(partitions, *bounds):
+    """Partitions whose month overlaps [start, end] for any (start, end) pair
+    in `bounds` (e.g. the current and comparison windows; None pairs are
+    skipped)."""
+    windows = [
+        (pd.Timestamp(start), pd.Timestamp(end))
+        for start, end in zip(bounds[::2], bounds[1::2])
+        if start is not None and end is not None
+    ]
+    kept = []
+    for partition in partitions:
+        month = pd.Period(partition["month"], freq="M")
+        first, last = month.start_time, month.end_time
+        if any(first <= end and last >= start for start, end in windows):
+            kept.append(partition)
+    return kept
+
+
+def _load_partition(partition, df_date):
+    # One state-month: parsed (through its Parquet cache) and prepared
+    df = load_columnar(partition["issue"], read_issue_csv, stream_issue_parquet)
+    total_records = len(df)
+    bounds = [df.attrs["true_min_date"], df.attrs["true_max_date"]]
+    df, null_opening_dates, null_resolution_dates = prepare_issue_data(df, df_date)
+    df["State"] = partition["state"]
+    mappings = {
+        key: (
+            load_csv(partition[key])
+            if partition[key] is not None
+            else pd.DataFrame({"Case No": pd.Series(dtype=object), column: []})
+        )
+        for key, column in (("category", "Category Name"), ("department", "Department"))
+    }
+    return {
+        "issues": df,
+        **mappings,
+        "total_records": total_records,
+        "null_opening_dates": int(null_opening_dates),
+        "null_resolution_dates": int(null_resolution_dates),
+        "true_dates": bounds,
+    }
+
+
+def _concat(frames):
+    # Each partition has its own categories; concatenating turns those
+    # columns into objects, which apply_schema makes categorical again
+    return apply_schema(pd.concat(frames, ignore_index=True))
+
+
+@profiled("load partitions")
+def load_partitions(partitions, df_date, max_workers=LOAD_WORKERS):
+    """Load and prepare `partitions` in parallel and combine them.
+
+    Partitions are loaded by a pool of up to `max_workers` threads (in the
+    calling thread for one partition or worker); parsing and the Parquet
+    reads release the GIL. Returns the prepared issue
+    table, in Opening Date order with a State column, the category and
+    department mappings and the row counts of read_issue_data.
+    """
+    workers = min(max_workers, len(partitions))
+    if workers > 1:
+        # Threads, not processes: spawned workers re-import the running
+        # Streamlit page as __mp_main__ and the pool breaks
+        with ThreadPoolExecutor(workers) as pool:
+            loaded = list(pool.map(_load_partition, partitions, repeat(df_date)))
+    else:
+        loaded = [_load_partition(partition, df_date) for partition in partitions]
+
+    if not loaded:
+        raise ValueError("No partitions to load")
+    issues = _concat([part["issues"] for part in loaded])
+    issues = issues.sort_values("Opening Date", kind="stable", ignore_index=True)
+    # A case exported in two months is still counted once
+    issues["is_first_case"] = ~issues["Case No"].duplicated()
+    version = partitions_version(partitions)
+    issues.attrs["data_version"] = version
+    # Concatenated frames lose the attrs the cache keys of VIEW_CACHE rely on
+    category = _concat([part["category"] for part in loaded])
+    category.attrs["data_version"] = f"{version}:category"
+    department = _concat([part["department"] for part in loaded])
+    department.attrs["data_version"] = f"{version}:department"
+
+    dates = pd.to_datetime([d for part in loaded for d in part["true_dates"]])
+    return {
+        "issues": issues,
+        "category": category,
+        "department": department,
+        "total_records": sum(part["total_records"] for part in loaded),
+        "null_opening_dates": sum(part["null_opening_dates"] for part in loaded),
+        "null_resolution_dates": sum(part["null_resolution_dates"] for part in loaded),
+        "true_min_date": dates.min(),
+        "true_max_date": dates.max(),
+    }
+
+
+@st.cache_data
+def read_partition_date_range(partitions):
+    """True min and max Opening Date of partitioned exports.
+
+    Months hold the cases opened in them, so only the exports of the first
+    and the last month are read (through their caches), walking inward past
+    months with no valid Opening Date. NaT if no month has one.
+    """
+
+    def true_dates(month, key):
+        dates = []
+        for partition in partitions:
+            if partition["month"] == month:
+                path = partition["issue"]
+                df = load_columnar(path, read_issue_csv, stream_issue_parquet)
+                dates.append(pd.Timestamp(df.attrs[key]))
+        return [d for d in dates if pd.notna(d)]
+
+    def bound(months, key, pick):
+        for month in months:
+            dates = true_dates(month, key)
+            if dates:
+                return pick(dates)
+        return pd.NaT
+
+    months = list(dict.fromkeys(partition["month"] for partition in partitions))
+    return (
+        bound(months, "true_min_date", min),
+        bound(reversed(months), "true_max_date", max),
+    )
+
+
+@st.cache_data(max_entries=8)
+def read_partitioned_data(_df_date, partitions):
+    """load_partitions of `partitions` with their daily rollup, case
+    mappings, district cube, department facts and resolution histograms; each
+    distinct selection is loaded once per process."""
+    data = load_partitions(partitions, _df_date)
+    data["rollup"] = build_daily_rollup(
+        data["issues"], _df_date, data["category"], data["department"]
+    )
+    data["mappings"] = {
+        "category": case_mapping_index(data["category"], "Category Name"),
+        "department": case_mapping_index(data["department"], "Department"),
+    }
+    data["district_cube"] = build_district_cube(district_day_counts(data["issues"]))
+    data["department_facts"] = build_department_facts(
+        department_case_rows(data["issues"], data["mappings"]["department"])
+    )
+    data["resolution_histograms"] = resolution_histograms(
+        data["issues"], data["mappings"]["category"]
+    )
+    return data
+
+
+def snapshot_stamp():
+    # What a snapshot is only valid for: the issue data, the dimension files
+    # and the day (pending-case aging counts from today)
+    return {
+        "data_version": issue_data_version(),
+        "sources": rollup_sources(),
+        "today": str(pd.Timestamp.today().date()),
+    }
+
+
+def _bounds_key(bounds):
+    return [None if bound is None else str(pd.Timestamp(bound)) for bound in bounds]
+
+
+def write_snapshots(path=SNAPSHOT_PATH):
+    """Precompute the Overview metrics of every standard scenario to `path`.
+
+    Run after each data refresh (ingest does it) and once a day, since the
+    page only serves a snapshot built today. Returns the scenarios written.
+    """
+    stamp = snapshot_stamp()
+    df_date = read_date_data()
+    df_issues, *_, min_date, max_date = read_issue_data(df_date, stamp["data_version"])
+    rollup = read_daily_rollup(df_date, stamp["data_version"])
+    mappings = read_case_mappings()
+
+    scenarios = {}
+    for scenario in STANDARD_SCENARIOS:
+        bounds = standard_period(scenario, max_date, min_date)[:4]
+        metrics = compute_dashboard_metrics(
+            df_issues,
+            read_category_data(),
+            *bounds,
+            rollup=rollup,
+            mappings=mappings,
+        )
+        scenarios[scenario] = {
+            "bounds": _bounds_key(bounds),
+            "metrics": metrics_to_json(metrics),
+        }
+
+    snapshot = {**stamp, "trend_freq": "M", "scenarios": scenarios}
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    _write_atomic(path, lambda tmp: _write_json(tmp, snapshot))
+    return list(scenarios)
+
+
+def _load_snapshot(path):
+    try:
+        with open(path) as f:
+            snapshot = json.load(f)
+        for entry in snapshot["scenarios"].values():
+            entry["metrics"] = metrics_from_json(entry["metrics"])
+    except (OSError, ValueError, KeyError):
+        return None
+    return snapshot
+
+
+def read_snapshot(scenario, bounds, trend_freq="M", path=SNAPSHOT_PATH):
+    """Precomputed metrics of `scenario`, or None when there is no snapshot
+    for it that is current and covers the same bounds and granularity."""
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    snapshot = VIEW_CACHE.get_or_compute(
+        ("snapshot", path, stat.st_size, stat.st_mtime_ns),
+        lambda: _load_snapshot(path),
+    )
+    if snapshot is None or snapshot["trend_freq"] != trend_freq:
+        return None
+    if any(snapshot.get(k) != v for k, v in snapshot_stamp().items()):
+        return None
+    entry = snapshot["scenarios"].get(scenario)
+    if entry is None or entry["bounds"] != _bounds_key(bounds):
+        return None
+    return entry["metrics"]
+
+
+def database_stamp():
+    # What the database was built from
+    return {"data_version": issue_data_version(), "sources": rollup_sources()}
+
+
+def write_database(path=DATABASE_PATH):
+    """Build the SQLite database of the current data at `path`.
+
+    Reads the issue rows without st.cache_data, so a server process that
+    builds it does not keep the frames afterwards; they are still read
+    whole while it builds. Returns its meta.
+    """
+    stamp = database_stamp()
+    df_date = load_csv(DATE_CSV, parse_dates=["date"], date_format="%d-%m-%Y")
+    df = load_issue_frame()
+    total_records = len(df)
+    true_min_date = df.attrs["true_min_date"]
+    true_max_date = df.attrs["true_max_date"]
+    df, null_opening_dates, null_resolution_dates = prepare_issue_data(df, df_date)
+    meta = {
+        **stamp,
+        "total_records": total_records,
+        "null_opening_dates": int(null_opening_dates),
+        "null_resolution_dates": int(null_resolution_dates),
+        "true_min_date": true_min_date,
+        "true_max_date": true_max_date,
+        "rows": len(df),
+    }
+    mappings = {"category": load_csv(CATEGORY_CSV), "department": load_csv(DEPT_CSV)}
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with stage("build database"):
+        _write_atomic(path, lambda tmp: build_database(tmp, df, mappings, meta))
+    return meta
+
+
+def _take_build_lock(lock_path):
+    # Creates the lock file; False while another live builder holds it
+    for _ in range(2):
+        try:
+            fd = os.open(lock_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+        except FileExistsError:
+            try:
+                if time.time() - os.path.getmtime(lock_path) < DATABASE_BUILD_TIMEOUT:
+                    return False
+                # Left behind by a builder that died
+                os.remove(lock_path)
+            except FileNotFoundError:
+                pass
+            continue
+        os.write(fd, str(os.getpid()).encode())
+        os.close(fd)
+        return True
+    return False
+
+
+def _database_meta(path):
+    try:
+        return VIEW_CACHE.get_or_compute(
+            ("database meta", *database_key(path)), lambda: read_meta(path)
+        )
+    except OSError:
+        return None
+
+
+def current_database(path=DATABASE_PATH):
+    """Meta of the database at `path`, rebuilt first if it is missing or
+    was built from other data.
+
+    One process rebuilds it at a time. While another one does, an existing
+    database is served as it is, its meta marked "stale"; without one this
+    waits for that build (or for its lock to time out).
+    """
+
+    def fresh(meta):
+        stamp = database_stamp()
+        return meta is not None and all(meta.get(k) == v for k, v in stamp.items())
+
+    meta = _database_meta(path)
+    if fresh(meta):
+        return meta
+    lock_path = f"{path}.lock"
+    os.makedirs(os.path.dirname(lock_path), exist_ok=True)
+    while not _take_build_lock(lock_path):
+        if meta is not None:
+            return {**meta, "stale": True}
+        time.sleep(0.5)
+        meta = _database_meta(path)
+        if fresh(meta):
+            return meta
+    try:
+        # Another process may have finished a build since the check above
+        meta = _database_meta(path)
+        return meta if fresh(meta) else write_database(path)
+    finally:
+        os.remove(lock_path)
+
+
 def create_sidebar(df_issues, df_date, min_date_raw, max_date_raw):
     logo_path = "assets/images/csalogo.png"
 
@@ -377,3 +1513,213 @@ def create_sidebar(df_issues, df_date, min_date_raw, max_date_raw):
         comparison_label,
         prev_custom_start,
     )
+
+
+def query_table(
+    df,
+    start,
+    stop,
+    columns=None,
+    sort_by=None,
+    ascending=True,
+    contains=None,
+    isin=None,
+):
+    """Rows `start:stop` of `df` after filtering and sorting, as one page.
+
+    `contains` maps columns to a case-insensitive substring and `isin` maps
+    columns to the allowed values; empty filters are ignored. Only the page
+    is materialized, and only its `columns`. Returns the page and the number
+    of matching rows.
+    """
+    mask = None
+    for col, text in (contains or {}).items():
+        if text:
+            hit = df[col].str.contains(text, case=False, regex=False, na=False)
+            mask = hit.to_numpy() if mask is None else mask & hit.to_numpy()
+    for col, values in (isin or {}).items():
+        if values:
+            hit = df[col].isin(values).to_numpy()
+            mask = hit if mask is None else mask & hit
+    positions = np.arange(len(df)) if mask is None else np.flatnonzero(mask)
+
+    # The issue table is already in Opening Date order
+    if sort_by is not None and not (sort_by == "Opening Date" and ascending):
+        keys = df[sort_by].iloc[positions].reset_index(drop=True)
+        order = keys.sort_values(ascending=ascending, kind="stable").index
+        positions = positions[order.to_numpy()]
+
+    page = positions[start:stop]
+    columns = list(df.columns) if columns is None else columns
+    return df.iloc[page, [df.columns.get_loc(col) for col in columns]], len(positions)
+
+
+def frame_table(df):
+    """paged_dataframe source over an in-memory frame."""
+    return {
+        "columns": list(df.columns),
+        "choices": lambda col: (
+            list(df[col].cat.categories)
+            if isinstance(df[col].dtype, pd.CategoricalDtype)
+            else sorted(df[col].dropna().unique())
+        ),
+        "query": lambda *args: query_table(df, *args),
+    }
+
+
+def database_table(table, bounds=None, path=DATABASE_PATH):
+    """paged_dataframe source over a table of the SQLite database; `bounds`
+    limits the issues table to a period."""
+    return {
+        "columns": table_columns(path, table),
+        "choices": lambda col: distinct_values(path, table, col),
+        "query": lambda *args: query_page(path, table, *args, bounds=bounds),
+    }
+
+
+def paged_dataframe(
+    source,
+    key,
+    page_sizes=RAW_PAGE_SIZES,
+    default_columns=None,
+    text_filters=(),
+    choice_filters=(),
+):
+    """Show a frame one page at a time, so only that page reaches the browser.
+
+    `source` is a frame, or a frame_table/database_table source. The user
+    picks the columns, a sort column and, for `text_filters` and
+    `choice_filters`, a substring or a set of values to keep; all of it is
+    applied on the server by the source's query (query_table for frames).
+    """
+    table = frame_table(source) if isinstance(source, pd.DataFrame) else source
+    all_columns = table["columns"]
+    columns = st.multiselect(
+        "Columns",
+        all_columns,
+        default=all_columns if default_columns is None else default_columns,
+        key=f"{key}_columns",
+    )
+
+    cols = st.columns(2 + len(text_filters) + len(choice_filters))
+    sort_by = cols[0].selectbox(
+        "Sort by",
+        [None, *all_columns],
+        format_func=lambda c: c or "—",
+        key=f"{key}_sort",
+    )
+    ascending = cols[1].radio(
+        "Order",
+        [True, False],
+        format_func=lambda a: "Asc" if a else "Desc",
+        horizontal=True,
+        key=f"{key}_ascending",
+    )
+    contains = {
+        col: cols[2 + i].text_input(f"{col} contains", key=f"{key}_{col}_contains")
+        for i, col in enumerate(text_filters)
+    }
+    isin = {
+        col: cols[2 + len(text_filters) + i].multiselect(
+            col,
+            table["choices"](col),
+            key=f"{key}_{col}_isin",
+        )
+        for i, col in enumerate(choice_filters)
+    }
+
+    cols = st.columns([1, 1, 3])
+    page_size = cols[0].selectbox("Rows per page", page_sizes, key=f"{key}_size")
+    page = st.session_state.get(f"{key}_page", 1)
+    rows, total = table["query"](
+        (page - 1) * page_size,
+        page * page_size,
+        columns,
+        sort_by,
+        ascending,
+        contains,
+        isin,
+    )
+    pages = max(1, -(-total // page_size))
+    # A new period, filter or page size can leave the remembered page out of
+    # range; fetch the last page instead
+    if page > pages:
+        page = st.session_state[f"{key}_page"] = pages
+        rows, total = table["query"](
+            (page - 1) * page_size,
+            page * page_size,
+            columns,
+            sort_by,
+            ascending,
+            contains,
+            isin,
+        )
+    cols[1].number_input(
+        f"Page (of {pages:,})", min_value=1, max_value=pages, step=1, key=f"{key}_page"
+    )
+    start = (page - 1) * page_size
+    cols[2].caption(
+        f"Rows {start + 1:,}–{start + len(rows):,} of {total:,}" if total else "No rows"
+    )
+    st.dataframe(rows, use_container_width=True)
+
+
+def profiling_enabled():
+    # $KM_PROFILE profiles every session, ?profile=1 just the one
+    return profiling_requested(st.query_params.get("profile"))
+
+
+def render_profile_panel(trace):
+    """Sidebar expander with the stage timings of this rerun."""
+    if trace is None:
+        return
+    with st.sidebar.expander("⏱️ Profile of this rerun", expanded=True):
+        st.caption(
+            f"{trace['wall_ms']:.0f} ms wall, {trace['cpu_ms']:.0f} ms CPU. "
+            "Stages inside cached loaders only show up on a cache miss."
+        )
+        st.dataframe(trace_table(trace), use_container_width=True)
+
+
+if __name__ == "__main__":
+    import argparse
+    import sys
+
+    parser = argparse.ArgumentParser(description="Kisan Mitra data maintenance")
+    commands = parser.add_subparsers(dest="command", required=True)
+    ingest_parser = commands.add_parser(
+        "ingest", help="upsert a newer ERPNext issue export into the issue store"
+    )
+    ingest_parser.add_argument("path", help="path to the Issue_<date>.csv export")
+    commands.add_parser(
+        "snapshot", help="precompute the standard scenarios for the current data"
+    )
+    commands.add_parser(
+        "database", help="build the SQLite database used with KM_BACKEND=sqlite"
+    )
+    commands.add_parser(
+        "memory", help="report the memory saved by the compact column schema"
+    )
+    args = parser.parse_args()
+
+    if args.command == "memory":
+        df_date = read_date_data()
+        frames = {
+            "Issues": read_issue_data(df_date, issue_data_version())[0],
+            "Category mapping": read_category_data(),
+            "Department mapping": read_department_data(),
+        }
+        print(memory_report(frames).to_string(index=False))
+        sys.exit()
+
+    if args.command == "ingest":
+        count = ingest_issue_export(args.path)
+        print(f"Ingested {count} new or changed cases from {args.path}")
+
+    if args.command == "database" or (args.command == "ingest" and SQL_BACKEND):
+        meta = write_database()
+        print(f"Wrote {meta['rows']:,} issue rows to {DATABASE_PATH}")
+
+    # Rebuilt after every ingest too, since the old ones no longer match
+    scenarios = write_snapshots()
+    print(f"Wrote snapshots of {', '.join(scenarios)} to {SNAPSHOT_PATH}")
@@ -0,0 +1,132 @@
+# view_cache.py
+"""In-process cache of computed views, shared by every session of the server.
+
+Entries are evicted least recently used first once there are more than
+`max_entries` of them or their estimated size exceeds `max_bytes`, and
+expire `ttl` seconds after they were stored. Keys must be cheap to hash
+(dataset versions, bounds, options), never frames, so a lookup costs a dict
+access rather than hashing the data.
+"""
+
+import os
+import sys
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+# Defaults of the shared VIEW_CACHE; the environment can override them
+VIEW_CACHE_ENTRIES = int(os.environ.get("KM_VIEW_CACHE_ENTRIES", 256))
+VIEW_CACHE_MB = float(os.environ.get("KM_VIEW_CACHE_MB", 256))
+VIEW_CACHE_TTL = float(os.environ.get("KM_VIEW_CACHE_TTL", 6 * 60 * 60))
+
+
+def estimate_size(obj, _depth=0):
+    """Rough size in bytes of a cached value (frames, arrays, figures, ...)."""
+    if isinstance(obj, (pd.DataFrame, pd.Series, pd.Index)):
+        usage = obj.memory_usage(index=True, deep=False)
+        return int(usage.sum() if isinstance(usage, pd.Series) else usage)
+    if isinstance(obj, np.ndarray):
+        return obj.nbytes
+    if hasattr(obj, "to_plotly_json"):
+        return estimate_size(obj.to_plotly_json(), _depth + 1)
+    size = sys.getsizeof(obj)
+    if _depth > 8:
+        return size
+    if isinstance(obj, dict):
+        return size + sum(
+            estimate_size(k, _depth + 1) + estimate_size(v, _depth + 1)
+            for k, v in obj.items()
+        )
+    if isinstance(obj, (list, tuple, set, frozenset)):
+        return size + sum(estimate_size(v, _depth + 1) for v in obj)
+    return size
+
+
+class BoundedCache:
+    """Thread-safe LRU cache with a TTL and a ceiling on entries and bytes."""
+
+    def __init__(self, max_entries=64, max_bytes=None, ttl=None):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._entries = OrderedDict()  # key -> (value, size, stored_at)
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = self.misses = self.evictions = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key, default=None):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and self._expired(entry):
+                self._drop(key)
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return default
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key, value, size=None):
+        size = estimate_size(value) if size is None else size
+        # Never let a single oversized value flush everything else
+        if self.max_bytes is not None and size > self.max_bytes:
+            return value
+        with self._lock:
+            if key in self._entries:
+                self._drop(key)
+            self._entries[key] = (value, size, time.monotonic())
+            self._bytes += size
+            while len(self._entries) > self.max_entries or (
+                self.max_bytes is not None and self._bytes > self.max_bytes
+            ):
+                self._drop(next(iter(self._entries)))
+                self.evictions += 1
+        return value
+
+    def get_or_compute(self, key, compute, size=None):
+        """Cached value of `key`, computing and storing it on a miss.
+
+        Concurrent misses of the same key may each compute it once; values
+        are shared between sessions, so treat them as read-only.
+        """
+        missing = object()
+        value = self.get(key, missing)
+        if value is missing:
+            value = self.put(key, compute(), size)
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self):
+        return {
+            "entries": len(self._entries),
+            "mib": round(self._bytes / 2**20, 2),
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
+
+    def _expired(self, entry):
+        return self.ttl is not None and time.monotonic() - entry[2] > self.ttl
+
+    def _drop(self, key):
+        self._bytes -= self._entries.pop(key)[1]
+
+
+# Metrics and figures of the dashboard views, keyed by dataset version,
+# period bounds and view options
+VIEW_CACHE = BoundedCache(
+    max_entries=VIEW_CACHE_ENTRIES,
+    max_bytes=int(VIEW_CACHE_MB * 2**20),
+    ttl=VIEW_CACHE_TTL,
+)